@@ -0,0 +1,186 @@
+"""
+Benchmark harness for the GCC pipeline.
+
+Generates synthetic usage/specialization reports (process.synthetic) and times
+each pipeline stage: read, normalize, filter, join, Table 4 aggregation and
+render. Results are written as JSON; with --compare, stages slower than a
+previous results file (beyond --tolerance) are reported and the exit status
+is non-zero. When polars is installed, the lazy engine (process.lazy) is
+timed end to end on the same files as 'polars_total'.
+
+    python -m benchmarks.run --rows 10000 100000 1000000 --output bench_results.json
+    python -m benchmarks.run --rows 100000 --compare bench_results.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from process.ingest import CSV_ENGINE, SPECIALIZATION_REPORT_COLUMNS, USAGE_REPORT_COLUMNS, apply_report_types, load_report_columns
+from process.lazy import HAS_POLARS, analyze_csv
+from process.pipeline import (
+    build_combined_table,
+    build_top_learner_list,
+    compute_2025_metrics,
+    filter_ai_essentials_certificates,
+    filter_specialization_certificates,
+)
+from process.render import table4_html
+from process.synthetic import write_reports
+
+STAGES = ["read", "normalize", "filter", "join", "table4", "render"]
+
+
+def run_stages(usage_path, spec_path):
+    """
+    Run the pipeline once, returning per-stage seconds and output sizes
+    """
+    timings = {}
+    clock = time.perf_counter
+
+    start = clock()
+    usage_df = load_report_columns(usage_path, USAGE_REPORT_COLUMNS)
+    spec_df = load_report_columns(spec_path, SPECIALIZATION_REPORT_COLUMNS)
+    timings["read"] = clock() - start
+
+    start = clock()
+    apply_report_types(usage_df)
+    apply_report_types(spec_df)
+    timings["normalize"] = clock() - start
+
+    start = clock()
+    filter_ai_essentials_certificates(usage_df)
+    filter_specialization_certificates(spec_df)
+    timings["filter"] = clock() - start
+
+    start = clock()
+    table3 = build_combined_table(usage_df, spec_df)
+    metrics = compute_2025_metrics(table3)
+    timings["join"] = clock() - start
+
+    start = clock()
+    table4 = build_top_learner_list(metrics["t3"], metrics["eligible_emails"], metrics["learners"])
+    timings["table4"] = clock() - start
+
+    start = clock()
+    table4_html(table4)
+    timings["render"] = clock() - start
+
+    return timings, {"table3_rows": int(len(table3)), "table4_rows": int(len(table4))}
+
+
+def time_lazy(usage_path, spec_path):
+    """
+    Seconds the lazy engine takes for the counts, Table 3, metrics, Table 4 and cube
+    """
+    start = time.perf_counter()
+    analyze_csv([usage_path], [spec_path])
+    return time.perf_counter() - start
+
+
+def benchmark(rows, spec_rows, duplicate_ratio, timezone_mix, repeat, data_dir):
+    """
+    Generate one dataset and time its stages; each stage keeps its best of `repeat` runs
+    """
+    usage_path, spec_path = write_reports(data_dir, rows, spec_rows, duplicate_ratio, timezone_mix)
+    best = {stage: float("inf") for stage in STAGES}
+    for _ in range(repeat):
+        timings, sizes = run_stages(usage_path, spec_path)
+        for stage, seconds in timings.items():
+            best[stage] = min(best[stage], seconds)
+    lazy = {}
+    if HAS_POLARS:
+        # Reading through Table 4 in one set of lazy plans; compare with 'total'
+        lazy["polars_total"] = round(min(time_lazy(usage_path, spec_path) for _ in range(repeat)), 6)
+    return {
+        "rows": rows,
+        "spec_rows": spec_rows if spec_rows is not None else max(1, rows // 10),
+        "duplicate_ratio": duplicate_ratio,
+        "timezone_mix": timezone_mix,
+        "usage_csv_bytes": usage_path.stat().st_size,
+        "stages": {stage: round(seconds, 6) for stage, seconds in best.items()},
+        "total": round(sum(best.values()), 6),
+        **lazy,
+        **sizes,
+    }
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "csv_engine": CSV_ENGINE,
+    }
+
+
+def _config_key(run):
+    return (run["rows"], run["spec_rows"], run["duplicate_ratio"], run["timezone_mix"])
+
+
+def find_regressions(results, baseline, tolerance):
+    """
+    Stages slower than the matching baseline run by more than tolerance (a fraction)
+    """
+    previous = {_config_key(run): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in results["runs"]:
+        before = previous.get(_config_key(run))
+        if before is None:
+            continue
+        for stage, seconds in run["stages"].items():
+            old = before["stages"].get(stage)
+            if old and seconds > old * (1 + tolerance):
+                regressions.append({"rows": run["rows"], "stage": stage, "baseline": old, "current": seconds})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the GCC pipeline stages on synthetic reports.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000], help="Usage report sizes to benchmark")
+    parser.add_argument("--spec-rows", type=int, help="Specialization report rows (default: rows / 10)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.8, help="Share of rows belonging to repeat learners")
+    parser.add_argument("--timezone-mix", type=float, default=0.0, help="Share of timestamps with a non-UTC offset")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best time per stage is kept")
+    parser.add_argument("--data-dir", type=Path, help="Where to write the generated CSVs (default: a temp dir)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("bench_results.json"), help="Results JSON file")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs --compare (fraction)")
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment(), "runs": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            data_dir = (args.data_dir or Path(tmp)) / f"rows_{rows}"
+            run = benchmark(rows, args.spec_rows, args.duplicate_ratio, args.timezone_mix, args.repeat, data_dir)
+            results["runs"].append(run)
+            stages = "  ".join(f"{stage}={seconds:.3f}s" for stage, seconds in run["stages"].items())
+            lazy = f"  polars_total={run['polars_total']:.3f}s" if "polars_total" in run else ""
+            print(f"rows={rows:>9}  total={run['total']:.3f}s  {stages}{lazy}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        results["regressions"] = find_regressions(results, baseline, args.tolerance)
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    for regression in results.get("regressions", []):
+        print(
+            f"REGRESSION rows={regression['rows']} {regression['stage']}: "
+            f"{regression['baseline']:.3f}s -> {regression['current']:.3f}s",
+            file=sys.stderr,
+        )
+    return 1 if results.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,187 +1,335 @@
-import streamlit as st
 import pandas as pd
+import streamlit as st
+
+from process.ai_essential import (
+    load_gcc_usage_report,
+    process_gcc_usage_report,
+    process_gcc_usage_report_streaming,
+    stream_gcc_usage_report,
+)
+from process.cache import frame_hash, parsed_cache
+from process.columnar import HAS_PYARROW, UPLOAD_TYPES, frame_bytes, is_columnar
+from process.cube import FILTER_DIMENSIONS, combine_cubes, rollup, slice_cube
+from process.export import EXPORT_FORMATS
+from process.ingest import DEFAULT_CHUNKSIZE
+from process.jobs import Job
+from process.pipeline import RULES, analyze_table3, build_combined_table, build_specialization_table
+from process.profiling import Profiler, configure_logging, stage
+from process.render import page_count, page_slice, search_rows, table4_html
+from process.specialization import load_gcc_specialization_file, process_gcc_specialization_file
+from process.rules import SPECIALIZATION, USAGE
+from process.store import STORE_PATH, SnapshotStore
+
+# Help text of the uploaders; normalized Arrow/Parquet frames skip CSV parsing entirely
+UPLOAD_HELP = (
+    "Upload a UTF-8 encoded, comma-separated CSV file, or a .parquet/.arrow/.feather file "
+    "saved from an earlier session"
+    if HAS_PYARROW else "Upload a UTF-8 encoded, comma-separated CSV file"
+)
+
+# Rows per page offered for Table 3 and Table 4; only the visible page is sent to the browser
+PAGE_SIZES = [25, 50, 100, 250, 1000]
+
+# Seconds between progress refreshes while an upload is processed in the background
+POLL_SECONDS = 0.5
+
+
+def upload_job(name, files, settings, start):
+    """
+    The background job processing an uploader's files: kept while the files and settings
+    are unchanged, cancelled and replaced by start(key) when they change, and cancelled
+    when the files are removed. Returns None without files.
+    """
+    jobs = st.session_state.setdefault('jobs', {})
+    key = (tuple(getattr(f, 'file_id', f.name) for f in files), settings) if files else None
+    job = jobs.get(name)
+    if job is not None and job.key != key:
+        job.cancel()
+        del jobs[name]
+        job = None
+    if job is None and key is not None:
+        job = jobs[name] = start(key)
+    return job
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def render_job_progress(job, label):
+    """
+    Progress bar of a running job, refreshed on its own; the whole page reruns once the job is done
+    """
+    if job.done():
+        st.rerun()
+    st.progress(job.fraction, text=f"{label} {job.message}")
 
-from process.ai_essential import process_gcc_usage_report
-from process.specialization import process_gcc_specialization_file
 
-def join_and_analyze_tables(usage_df, spec_df):
+def render_paginated_table(df, key, search_columns, render_page, cache_key=None):
     """
-    Join the filtered tables and analyze unique learners
+    Show df one page at a time with a search box: render_page() only ever receives
+    the visible slice, and the full table stays available as a CSV/XLSX/Parquet download.
+    cache_key identifies the table's contents (hashed from df when None), so the export
+    is serialized once per table and format instead of on every rerun.
+    """
+    query = st.text_input("Search", key=f"{key}_search", placeholder="Name, email or course/specialization")
+    matches = search_rows(df, query, search_columns)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+    with col2:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+    pages = page_count(len(matches), page_size)
+    page = min(int(page), pages)
+    visible = page_slice(matches, page, page_size)
+
+    if len(matches) == 0:
+        st.caption("No matching rows" + (f" for '{query}'" if query else ""))
+    else:
+        first = (page - 1) * page_size + 1
+        st.caption(f"Rows {first}–{first + len(visible) - 1} of {len(matches)} (page {page} of {pages})")
+        render_page(visible)
+
+    # Serializing the whole table is only done on request, one chunk at a time
+    col1, col2 = st.columns(2)
+    with col1:
+        export_format = st.selectbox("Export format", list(EXPORT_FORMATS), key=f"{key}_export_format")
+    with col2:
+        prepare = st.checkbox("Prepare export of the full table", key=f"{key}_export")
+    if prepare:
+        extension, mime, export = EXPORT_FORMATS[export_format]
+
+        def serialize():
+            with stage('export', table=key, format=extension, rows=len(df)):
+                return export(df)
+
+        # Searching, paging and toggles rerun the page; the bytes of an unchanged table are reused
+        table_key = cache_key if cache_key is not None else frame_hash(df)
+        data = parsed_cache.get_or_compute(('export', key, table_key, export_format), serialize)
+        st.download_button(
+            f"Download {export_format}",
+            data,
+            file_name=f"{key}.{extension}",
+            mime=mime,
+            key=f"{key}_download",
+            on_click="ignore",
+        )
+
+
+def render_metrics(total_2025_certificates, unique_2025_learners):
+    """
+    Show the 2025 metrics side by side
+    """
+    st.subheader("Additional Statistics")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.metric("2025 Certificates", total_2025_certificates)
+
+    with col2:
+        st.metric("2025 Unique Learners", unique_2025_learners)
+
+
+def render_top_learner_list(build_table4, cache_key=None):
+    """
+    Show the Top Learner List (Table 4) produced by build_table4(); cache_key identifies
+    the result it comes from (see render_paginated_table)
+    """
+    # Top Learner List: based on full table but only learners whose max Completion Time >= cutoff
+    st.subheader("Top Learner List (2025-eligible)")
+    try:
+        with stage('table4'):
+            table4 = build_table4()
+        st.write("Sorted in decreasing order by total (eligible learners only)")
+        # Option to render with wrapped lines (HTML) or as a standard dataframe
+        wrap_view = st.toggle("Wrap Courses/Specs list", value=True, key="wrap_courses_specs_list")
+
+        def render_page(rows):
+            if wrap_view:
+                # Show with newlines converted to <br> as a Markdown table
+                st.markdown(table4_html(rows), unsafe_allow_html=True)
+            else:
+                st.dataframe(rows, use_container_width=True)
+
+        with stage('render_table4', rows=len(table4), wrapped=wrap_view):
+            render_paginated_table(table4, "table4", ["Name", "Email", "Courses/Specs list"], render_page, cache_key)
+    except Exception as e:
+        st.warning(f"Could not build Table 4: {e}")
+
+
+def render_dashboard(cube):
+    """
+    Completions per month and per dimension value, answered from the pre-aggregated cube
+    (the filters and charts never rescan the report rows)
     """
     try:
         st.markdown("---")
-        st.header("Step 2: Combined Analysis")
+        st.header("Step 3: Completions Dashboard")
+        if cube.empty:
+            st.info("No completions to chart")
+            return
+        st.caption(f"{int(cube['Completions'].sum()):,} completions in {len(cube):,} cube cells")
+
+        filters = {}
+        for column, dimension in zip(st.columns(len(FILTER_DIMENSIONS)), FILTER_DIMENSIONS):
+            with column:
+                options = sorted(cube[dimension].dropna().unique())
+                filters[dimension] = st.multiselect(dimension, options, key=f"cube_{dimension}")
+        breakdown = st.selectbox("Break down by", FILTER_DIMENSIONS, index=1, key="cube_breakdown")
+
+        with stage('render_dashboard', cells=len(cube)):
+            selected = slice_cube(cube, filters)
+            st.subheader("Completions per month")
+            st.bar_chart(rollup(selected, 'Month'))
+
+            st.subheader(f"Completions per {breakdown}")
+            totals = rollup(selected, breakdown).sort_values(ascending=False)
+            totals.index = totals.index.astype(object).fillna('(blank)')
+            st.bar_chart(totals, horizontal=True)
+
+            monthly = rollup(selected, ['Month', breakdown]).unstack(fill_value=0)
+            monthly.columns = monthly.columns.astype(object).fillna('(blank)')
+            st.dataframe(monthly, use_container_width=True)
+    except Exception as e:
+        st.error(f"Error in completions dashboard: {str(e)}")
+
+
+def render_arrow_download(df, name, cache_key):
+    """
+    Offer a normalized report as an Arrow file that later uploads can use instead of the CSV;
+    the file is written once per upload (cache_key) and kept in parsed_cache
+    """
+    if HAS_PYARROW and st.checkbox(f"Prepare normalized {name} report for download (.arrow)", key=f"{name}_arrow_export"):
+        def serialize():
+            with stage('arrow_export', report=name, rows=len(df)):
+                return frame_bytes(df)
+
+        st.download_button(
+            "Download .arrow file",
+            parsed_cache.get_or_compute(('arrow_export', name, cache_key), serialize),
+            file_name=f"{name}_report.arrow",
+            mime="application/vnd.apache.arrow.file",
+            key=f"{name}_arrow_download",
+        )
+
 
-        # Create Table 1: Filtered AI Essentials (Name, Email, Course)
-        table1 = None
-        if usage_df is not None:
-            filtered_usage = usage_df.copy()
-
-            # Apply filters
-            if 'Course' in filtered_usage.columns:
-                filtered_usage = filtered_usage[filtered_usage['Course'] == 'Google AI Essentials']
-
-            # We will use unified 'Completion Time' for downstream logic
-            # Ensure 'Completion Time' exists (AI Essentials already has it)
-
-            if 'Completed' in filtered_usage.columns:
-                filtered_usage = filtered_usage[filtered_usage['Completed'] == 'Yes']
-
-            # Create Table 1 with Name, Email, Course/Specs (with completion date), Completion Time
-            if len(filtered_usage) > 0:
-                # Build Course/Specs with appended completion date if available
-                if 'Course' in filtered_usage.columns:
-                    course_specs = filtered_usage['Course'].astype(str)
-                    # Use unified 'Completion Time'
-                    comp = pd.to_datetime(filtered_usage.get('Completion Time'), errors='coerce', utc=True)
-                    comp_str = comp.dt.strftime('%d/%m/%Y')
-                    comp_str = comp_str.where(comp.notna(), '')
-                    course_specs = course_specs + comp_str.apply(lambda s: f" ({s})" if s else "")
-                    filtered_usage['Course/Specs'] = course_specs
-                # Carry unified 'Completion Time'
-                cols1 = [c for c in ['Name', 'Email', 'Course/Specs', 'Completion Time'] if c in filtered_usage.columns]
-                table1 = filtered_usage[cols1].copy()
-
-        # Create Table 2: Filtered Specialization (Name, Email, Specialization)
-        table2 = None
+def merge_snapshot(store_path, report, result):
+    """
+    Upsert an uploaded report into the snapshot store. The store records the uploads
+    it merged, so reruns skip the diff while a new or reset store still gets the rows.
+    """
+    try:
+        with stage('store_merge', report=report), SnapshotStore(store_path) as store:
+            if store.merged(report, result['cache_key']):
+                st.caption("Snapshot store: this upload is already merged")
+                return
+            summary = store.upsert_report(report, result['df'], result['cache_key'])
+        st.caption(
+            f"Snapshot store: {summary['inserted']} new and {summary['updated']} changed rows, "
+            f"{summary['learners']} learners updated"
+        )
+    except Exception as e:
+        st.error(f"Error updating the snapshot store: {str(e)}")
+
+
+def shared_result(key, compute):
+    """
+    compute() cached in the process-wide parsed_cache under key: every session showing the
+    same files and settings gets the same read-only result, computed once (or computed
+    directly when key is None)
+    """
+    if key is None:
+        return compute()
+    return parsed_cache.get_or_compute(key, compute)
+
+
+def streamed_analysis(usage_aggregator, spec_df):
+    """
+    Metrics and Table 4 of the streamed usage aggregates with the specialization rows folded in
+    """
+    with stage('join'):
+        aggregator = usage_aggregator.copy()
         if spec_df is not None:
-            filtered_spec = spec_df.copy()
-
-            # Map Specialization Completion Time -> Completion Time
-            if 'Specialization Completion Time' in filtered_spec.columns:
-                filtered_spec['Completion Time'] = filtered_spec['Specialization Completion Time']
-
-            if 'Completed' in filtered_spec.columns:
-                filtered_spec = filtered_spec[filtered_spec['Completed'] == 'Yes']
-
-            # Create Table 2 with Name, Email, Course/Specs (with completion date), Completion Time
-            if len(filtered_spec) > 0:
-                # Build Course/Specs with appended specialization completion date if available
-                if 'Specialization' in filtered_spec.columns:
-                    spec_specs = filtered_spec['Specialization'].astype(str)
-                    # Use unified 'Completion Time'
-                    scomp = pd.to_datetime(filtered_spec.get('Completion Time'), errors='coerce', utc=True)
-                    scomp_str = scomp.dt.strftime('%d/%m/%Y')
-                    scomp_str = scomp_str.where(scomp.notna(), '')
-                    spec_specs = spec_specs + scomp_str.apply(lambda s: f" ({s})" if s else "")
-                    filtered_spec['Course/Specs'] = spec_specs
-                cols2 = [c for c in ['Name', 'Email', 'Course/Specs', 'Completion Time'] if c in filtered_spec.columns]
-                table2 = filtered_spec[cols2].copy()
-        # Join Table 1 and Table 2 to create Table 3
-        table3 = pd.DataFrame()
+            aggregator.update(build_specialization_table(spec_df))
+    return {
+        'rows': aggregator.rows_seen,
+        'total_2025_certificates': aggregator.total_2025_certificates,
+        'unique_2025_learners': aggregator.unique_2025_learners,
+        'table4': aggregator.top_learner_list() if aggregator.rows_seen else None,
+    }
 
-        if table1 is not None and table2 is not None:
-            table3 = pd.concat([table1, table2], ignore_index=True)
-        elif table1 is not None:
-            table3 = table1.copy()
-        elif table2 is not None:
-            table3 = table2.copy()
+
+def join_and_analyze_tables(usage_df, spec_df, usage_aggregator=None, store_path=None, merge_identities=False,
+                            keys=None):
+    """
+    Join the filtered tables and analyze unique learners.
+    In streaming mode the usage report arrives as a LearnerAggregator instead of a DataFrame.
+    With a store_path, the metrics and Table 4 come from the snapshot store instead of the uploads.
+    With merge_identities, learners found under several emails or name spellings count as one.
+    keys, the (usage, specialization) cache keys of the inputs, lets sessions share the results.
+    """
+    try:
+        st.markdown("---")
+        st.header("Step 2: Combined Analysis")
+
+        if keys is not None:
+            # An absent input keys as None; one shown without its cache key is not shared
+            present = (usage_df is not None or usage_aggregator is not None, spec_df is not None)
+            if any(shown and key is None for shown, key in zip(present, keys)):
+                keys = None
+            else:
+                keys = tuple(key if shown else None for shown, key in zip(present, keys))
+
+        def shared_key(name, *settings):
+            # Keyed by the files, the rules and the settings the result depends on
+            return (name, *keys, RULES.fingerprint, *settings) if keys is not None else None
+
+        def shared(name, compute, *settings):
+            return shared_result(shared_key(name, *settings), compute)
+
+        if usage_aggregator is not None:
+            # Fold the specialization rows into a copy of the streamed usage aggregates
+            analysis = shared('streamed_analysis', lambda: streamed_analysis(usage_aggregator, spec_df))
+            if analysis['rows'] == 0:
+                st.warning("No data available for combined analysis")
+                return
+
+            st.subheader("Combined Table (Table 3)")
+            st.info("Streaming mode: combined rows are aggregated per learner and not retained.")
+            render_metrics(analysis['total_2025_certificates'], analysis['unique_2025_learners'])
+            render_top_learner_list(lambda: analysis['table4'], shared_key('streamed_analysis'))
+            return
+
+        # Join Table 1 and Table 2 to create Table 3
+        with stage('join'):
+            table3 = shared('table3', lambda: build_combined_table(usage_df, spec_df))
 
         # Display the combined table and analysis
         if not table3.empty:
             st.subheader("Combined Table (Table 3)")
             st.write("**Combined data with Name, Email, Course/Specs, and Completion Time:**")
-            st.dataframe(table3)
+            with stage('render_table3', rows=len(table3)):
+                render_paginated_table(table3, "table3", ["Name", "Email", "Course/Specs"], st.dataframe,
+                                       shared_key('table3'))
 
-            # Compute metrics and build downstream tables
-            t3 = table3.copy()
-            # Normalize email
-            if 'Email' in t3.columns:
-                t3['Email'] = t3['Email'].astype(str).str.strip().str.lower()
-            # Parse unified Completion Time
-            has_completion = 'Completion Time' in t3.columns
-            if has_completion:
-                t3['Completion Time'] = pd.to_datetime(t3['Completion Time'], errors='coerce', utc=True)
-                cutoff = pd.Timestamp('2025-01-01', tz='UTC')
-                # 2025-only subset for metrics (1) and (2)
-                t3_2025 = t3.dropna(subset=['Completion Time'])
-                t3_2025 = t3_2025[t3_2025['Completion Time'] >= cutoff]
-                total_2025_certificates = int(len(t3_2025))
-                unique_2025_learners = int(t3_2025['Email'].nunique())
-
-                # Eligible emails for Top Learner List: max completion time >= cutoff on full data
-                max_last = t3.groupby('Email', dropna=True)['Completion Time'].max()
-                eligible_emails = set(max_last.index[(max_last >= cutoff)].tolist())
-            else:
-                cutoff = pd.Timestamp('2025-01-01', tz='UTC')
-                t3_2025 = t3.copy()
-                total_2025_certificates = 0
-                unique_2025_learners = int(t3['Email'].nunique())
-                eligible_emails = set(t3['Email'].dropna().unique().tolist())
-
-            # Recompute totals based on combined table (no longer used for metrics)
-
-            # Show some additional statistics
-            st.subheader("Additional Statistics")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.metric("2025 Certificates", total_2025_certificates)
-
-            with col2:
-                st.metric("2025 Unique Learners", unique_2025_learners)
-
-
-            # Top Learner List: based on full table but only learners whose max Completion Time >= cutoff
-            st.subheader("Top Learner List (2025-eligible)")
-            try:
-                # Ensure email is lowercase for grouping consistency
-                t4 = t3.copy()
-                # Filter to only eligible emails for top list
-                if 'Email' in t4.columns and eligible_emails:
-                    t4 = t4[t4['Email'].isin(eligible_emails)]
-                # Derive a representative Name per email: most frequent Name, fallback to first non-null
-                if 'Name' in t4.columns:
-                    name_per_email = (
-                        t4
-                        .groupby('Email')['Name']
-                        .agg(lambda s: s.mode().iat[0] if not s.mode().empty else s.dropna().iat[0] if not s.dropna().empty else None)
-                        .reset_index()
-                    )
-                else:
-                    name_per_email = t4[['Email']].drop_duplicates().copy()
-                    name_per_email['Name'] = None
-
-                counts = (
-                    t4
-                    .groupby(["Email"], dropna=False)
-                    .size()
-                    .reset_index(name="Total course/spec number")
-                )
+            if store_path is not None:
+                # Aggregates are maintained incrementally in the store
+                st.info("Metrics and Top Learner List cover all snapshots merged into the snapshot store.")
+                with SnapshotStore(store_path) as store:
+                    with stage('metrics'):
+                        metrics = store.metrics()
+                    render_metrics(metrics['total_2025_certificates'], metrics['unique_2025_learners'])
+                    render_top_learner_list(store.top_learner_list)
+                return
 
-                # Aggregate list of courses/specs per email (distinct, preserve appearance order)
-                if 'Course/Specs' in t4.columns:
-                    courses_per_email = (
-                        t4
-                        .groupby('Email')['Course/Specs']
-                        .agg(lambda s: '\n'.join(list(dict.fromkeys([str(x) for x in s.dropna().tolist()]))))
-                        .reset_index()
-                        .rename(columns={"Course/Specs": "Courses/Specs list"})
-                    )
-                else:
-                    courses_per_email = name_per_email[['Email']].copy()
-                    courses_per_email['Courses/Specs list'] = ''
-
-                table4 = (
-                    counts
-                    .merge(name_per_email, on='Email', how='left')
-                    .merge(courses_per_email, on='Email', how='left')
-                    [["Name", "Email", "Total course/spec number", "Courses/Specs list"]]
-                    .sort_values(by="Total course/spec number", ascending=False)
-                    .reset_index(drop=True)
-                )
-                st.write("Sorted in decreasing order by total (eligible learners only)")
-                # Option to render with wrapped lines (HTML) or as a standard dataframe
-                wrap_view = st.toggle("Wrap Courses/Specs list", value=True, key="wrap_courses_specs_list")
-                if wrap_view:
-                    # Convert newlines to <br> for HTML rendering and show as Markdown table
-                    html_df = table4.copy()
-                    html_df['Courses/Specs list'] = html_df['Courses/Specs list'].astype(str).str.replace('\n', '<br>')
-                    st.markdown(html_df.to_html(escape=False, index=False), unsafe_allow_html=True)
-                else:
-                    st.dataframe(table4, use_container_width=True)
-            except Exception as e:
-                st.warning(f"Could not build Table 4: {e}")
+            # Compute metrics and build downstream tables
+            analysis = shared('analysis', lambda: analyze_table3(table3, merge_identities), merge_identities)
+            if merge_identities:
+                aliases = analysis['aliases']
+                st.caption(f"Identity resolution merged {len(aliases)} emails into other learners.")
+                if len(aliases):
+                    with st.expander("Merged emails"):
+                        st.dataframe(aliases.reset_index(), hide_index=True)
+            render_metrics(analysis['total_2025_certificates'], analysis['unique_2025_learners'])
+            render_top_learner_list(lambda: analysis['table4'], shared_key('analysis', merge_identities))
 
         else:
             st.warning("No data available for combined analysis")
@@ -189,6 +337,35 @@ def join_and_analyze_tables(usage_df, spec_df):
     except Exception as e:
         st.error(f"Error in combined analysis: {str(e)}")
 
+def render_profiling_panel(profiler, jobs=()):
+    """
+    Show the stage timings and memory peaks of the current run, and of the background
+    jobs it displays, in the sidebar
+    """
+    with st.sidebar.expander("Profiling", expanded=True):
+        job_records = [record for job in jobs for record in job.profiler.records]
+        if not profiler.records and not job_records:
+            st.caption("No pipeline stages ran yet.")
+            return
+        records = pd.DataFrame(job_records + profiler.records)
+        columns = ['stage', 'seconds']
+        if 'peak_bytes' in records.columns:
+            records['peak MB'] = (records['peak_bytes'] / 2**20).round(2)
+            columns.append('peak MB')
+        st.dataframe(records[columns], hide_index=True, use_container_width=True)
+        st.caption(f"Total {records['seconds'].sum():.3f}s · run {profiler.run_id}")
+        # tracemalloc is process-wide: one stage traces at a time and sees the others' allocations
+        busy = profiler.memory_busy or any(job.profiler.memory_busy for job in jobs)
+        if 'peak_bytes' not in records.columns:
+            if busy:
+                st.caption("Memory peaks are not shown: another session is tracing memory on this server.")
+        else:
+            st.caption("Memory peaks are process-wide and include allocations of other sessions and uploads "
+                       "running at the same time.")
+            if busy:
+                st.caption("Stages without a peak overlapped a stage traced by another session or upload.")
+
+
 def main():
     # Page configuration
     st.set_page_config(
@@ -204,69 +381,184 @@ def main():
     st.markdown("---")
     st.markdown("""
     ### File Requirements:
-    - **Format:** CSV (Comma-separated values)
+    - **Format:** CSV (Comma-separated values), or a normalized .parquet/.arrow/.feather file
     - **Encoding:** UTF-8
     - **Separator:** Comma (,)
     """)
     st.markdown("---")
+
+    # Streaming mode keeps memory bounded for usage reports larger than RAM
+    st.sidebar.header("Options")
+    streaming = st.sidebar.toggle(
+        "Streaming mode for large usage reports",
+        value=False,
+        help="Read the usage report in chunks and keep only per-learner aggregates",
+        key="streaming_mode",
+    )
+    chunksize = st.sidebar.number_input(
+        "Rows per chunk",
+        min_value=10_000,
+        value=DEFAULT_CHUNKSIZE,
+        step=50_000,
+        disabled=not streaming,
+        key="streaming_chunksize",
+    )
+    # Snapshot store: merge weekly cumulative uploads and update the aggregates incrementally
+    use_store = st.sidebar.toggle(
+        "Merge uploads into snapshot store",
+        value=False,
+        help="Keep report rows in the server's SQLite snapshot store (set with GCC_STORE); "
+             "each upload only writes new or changed rows",
+        disabled=streaming,
+        key="use_snapshot_store",
+    )
+    store_path = STORE_PATH if use_store and not streaming else None
+    # Fuzzy identity resolution needs every learner at once: not available with streaming or the store
+    merge_identities = st.sidebar.toggle(
+        "Merge duplicate learners",
+        value=False,
+        help="Count learners found under several emails or name spellings (e.g. school and personal addresses) once",
+        disabled=streaming or use_store,
+        key="merge_identities",
+    ) and not streaming and not use_store
+    show_profiling = st.sidebar.toggle(
+        "Show profiling panel",
+        value=False,
+        help="Time each pipeline stage and trace its peak memory",
+        key="show_profiling",
+    )
+    configure_logging()
+    profiler = Profiler(trace_memory=show_profiling, app="streamlit")
     
     # Initialize session state for storing results
     if 'usage_df' not in st.session_state:
         st.session_state.usage_df = None
+    if 'usage_aggregator' not in st.session_state:
+        st.session_state.usage_aggregator = None
     if 'spec_df' not in st.session_state:
         st.session_state.spec_df = None
+    # Cache keys of the uploads shown, under which sessions share their analysis
+    if 'usage_key' not in st.session_state:
+        st.session_state.usage_key = None
+    if 'spec_key' not in st.session_state:
+        st.session_state.spec_key = None
     if 'essentials_count' not in st.session_state:
         st.session_state.essentials_count = 0
     if 'specialization_count' not in st.session_state:
         st.session_state.specialization_count = 0
+    if 'usage_cube' not in st.session_state:
+        st.session_state.usage_cube = None
+    if 'spec_cube' not in st.session_state:
+        st.session_state.spec_cube = None
     
-    # Create two columns for the upload sections
-    col1, col2 = st.columns(2)
+    # Every pipeline stage of this run is timed and logged as a JSON line
+    with profiler.activate():
+        # Create two columns for the upload sections
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.header("Step 1A: Usage Report CSV")
-        st.markdown("Upload your GCC Usage Report CSV file")
+        with col1:
+            st.header("Step 1A: Usage Report CSV")
+            st.markdown("Upload your GCC Usage Report CSV files (one or more partner programs)")
         
-        usage_file = st.file_uploader(
-            "Choose Usage Report CSV file",
-            type=['csv'],
-            help="Upload a UTF-8 encoded, comma-separated CSV file",
-            key="usage_uploader"
-        )
+            usage_files = st.file_uploader(
+                "Choose Usage Report CSV files",
+                type=UPLOAD_TYPES,
+                help=UPLOAD_HELP,
+                accept_multiple_files=True,
+                key="usage_uploader"
+            )
+        
+            # Columnar files are memory-mapped, so they never need the chunked reader
+            stream_usage = streaming and not any(is_columnar(f) for f in usage_files)
+            # Parsing runs in the background, concurrently with the specialization upload
+            if stream_usage:
+                usage_job = upload_job(
+                    USAGE, usage_files, ('stream', int(chunksize)),
+                    lambda key: Job(
+                        key, stream_gcc_usage_report, usage_files, int(chunksize), trace_memory=show_profiling
+                    ),
+                )
+            else:
+                usage_job = upload_job(
+                    USAGE, usage_files, ('eager',),
+                    lambda key: Job(key, load_gcc_usage_report, usage_files, trace_memory=show_profiling),
+                )
         
-        if usage_file is not None:
-            st.success("Usage Report CSV uploaded successfully!")
-            with st.spinner("Processing GCC Usage Report..."):
-                result = process_gcc_usage_report(usage_file)
-                if result is not None:
-                    st.session_state.usage_df = result['df']
-                    st.session_state.essentials_count = result['count']
+            if usage_files:
+                st.success(f"{len(usage_files)} Usage Report file{'s' if len(usage_files) != 1 else ''} uploaded successfully!")
+                if not usage_job.done():
+                    render_job_progress(usage_job, "Processing GCC Usage Report...")
+                elif stream_usage:
+                    result = process_gcc_usage_report_streaming(usage_files, chunksize=int(chunksize), job=usage_job)
+                    if result is not None:
+                        st.session_state.usage_df = None
+                        st.session_state.usage_aggregator = result['aggregator']
+                        st.session_state.usage_key = result['cache_key']
+                        st.session_state.essentials_count = result['count']
+                        st.session_state.usage_cube = result['cube']
+                else:
+                    result = process_gcc_usage_report(usage_files, job=usage_job)
+                    if result is not None:
+                        st.session_state.usage_df = result['df']
+                        st.session_state.usage_aggregator = None
+                        st.session_state.usage_key = result['cache_key']
+                        st.session_state.essentials_count = result['count']
+                        st.session_state.usage_cube = result['cube']
+                        render_arrow_download(result['df'], USAGE, result['cache_key'])
+                        if store_path is not None:
+                            merge_snapshot(store_path, USAGE, result)
     
-    with col2:
-        st.header("Step 1B: Specialization CSV")
-        st.markdown("Upload your GCC Specialization CSV file")
+        with col2:
+            st.header("Step 1B: Specialization CSV")
+            st.markdown("Upload your GCC Specialization CSV files (one or more partner programs)")
         
-        spec_file = st.file_uploader(
-            "Choose Specialization CSV file",
-            type=['csv'],
-            help="Upload a UTF-8 encoded, comma-separated CSV file",
-            key="spec_uploader"
-        )
+            spec_files = st.file_uploader(
+                "Choose Specialization CSV files",
+                type=UPLOAD_TYPES,
+                help=UPLOAD_HELP,
+                accept_multiple_files=True,
+                key="spec_uploader"
+            )
+        
+            spec_job = upload_job(
+                SPECIALIZATION, spec_files, ('eager',),
+                lambda key: Job(key, load_gcc_specialization_file, spec_files, trace_memory=show_profiling),
+            )
         
-        if spec_file is not None:
-            st.success("Specialization CSV uploaded successfully!")
-            with st.spinner("Processing GCC Specialization file..."):
-                result = process_gcc_specialization_file(spec_file)
-                if result is not None:
-                    st.session_state.spec_df = result['df']
-                    st.session_state.specialization_count = result['count']
+            if spec_files:
+                st.success(f"{len(spec_files)} Specialization file{'s' if len(spec_files) != 1 else ''} uploaded successfully!")
+                if not spec_job.done():
+                    render_job_progress(spec_job, "Processing GCC Specialization files...")
+                else:
+                    result = process_gcc_specialization_file(spec_files, job=spec_job)
+                    if result is not None:
+                        st.session_state.spec_df = result['df']
+                        st.session_state.spec_key = result['cache_key']
+                        st.session_state.specialization_count = result['count']
+                        st.session_state.spec_cube = result['cube']
+                        render_arrow_download(result['df'], SPECIALIZATION, result['cache_key'])
+                        if store_path is not None:
+                            merge_snapshot(store_path, SPECIALIZATION, result)
     
-    # Step 2: Combined Analysis (only show if both files are processed)
-    if (st.session_state.usage_df is not None or st.session_state.spec_df is not None):
-        join_and_analyze_tables(
-            st.session_state.usage_df, 
-            st.session_state.spec_df
-        )
+        # Step 2: Combined Analysis, once no upload is still being processed
+        jobs = [job for job in (usage_job, spec_job) if job is not None]
+        if not all(job.done() for job in jobs):
+            st.markdown("---")
+            st.info("The combined analysis starts once every upload is processed.")
+        elif (st.session_state.usage_df is not None or st.session_state.spec_df is not None
+                or st.session_state.usage_aggregator is not None):
+            join_and_analyze_tables(
+                st.session_state.usage_df, 
+                st.session_state.spec_df,
+                st.session_state.usage_aggregator,
+                store_path,
+                merge_identities,
+                keys=(st.session_state.usage_key, st.session_state.spec_key),
+            )
+            render_dashboard(combine_cubes([st.session_state.usage_cube, st.session_state.spec_cube]))
+
+    if show_profiling:
+        render_profiling_panel(profiler, [job for job in jobs if job.done()])
     
     
 
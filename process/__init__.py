@@ -0,0 +1,5 @@
+import pandas as pd
+
+# Copy-on-write: projections, masks and renames share memory with their source
+# until written to, so the pipeline only materializes its output tables
+pd.set_option('mode.copy_on_write', True)
@@ -1,65 +1,40 @@
+import io
+
 import streamlit as st
-import pandas as pd
 
-def process_ai_essentials_certificates(df):
+from process.cache import content_hash, parsed_cache
+from process.ingest import DEFAULT_CHUNKSIZE
+from process.parallel import USAGE_REPORT, combined_key, filter_key, read_reports
+from process.pipeline import AI_ESSENTIALS, AI_ESSENTIALS_COLUMNS, RULES, filter_ai_essentials_certificates
+from process.profiling import stage
+from process.streaming import stream_usage_report
+
+def process_ai_essentials_certificates(df, cache_key=None):
     """
-    Process and filter AI Essentials certificates based on specific criteria:
-    - Course = "Google AI Essentials"
-    - Completed = Yes
+    Process and filter AI Essentials certificates based on the rules in process/rules.toml
+    (by default Course = "Google AI Essentials", Enrollment Time >= 2025-01-01, Completed = Yes).
+    When cache_key is given, the filtered rows are reused across reruns.
     """
     try:
-        # Make a copy to avoid modifying the original dataframe
-        filtered_df = df.copy()
-        
-        # Filter 1: Course = "Google AI Essentials"
-        if 'Course' in filtered_df.columns:
-            course_filter = filtered_df['Course'] == 'Google AI Essentials'
-            filtered_df = filtered_df[course_filter]
-        else:
-            st.warning("'Course' column not found in the data")
-            return 0
-        
-        # Filter 2: Enrollment Time >= Jan 01 2025
-        if 'Enrollment Time' in filtered_df.columns:
-            # Convert enrollment time to datetime
-            filtered_df = filtered_df.copy()  # Avoid SettingWithCopyWarning
-            filtered_df['Enrollment Time'] = pd.to_datetime(filtered_df['Enrollment Time'], errors='coerce')
-            
-            # Create cutoff date - start with naive datetime
-            cutoff_date = pd.Timestamp('2024-01-01')
-            
-            # Handle timezone compatibility
-            try:
-                # First, try the comparison as-is (works if both are naive or both have same timezone)
-                date_filter = filtered_df['Enrollment Time'] >= cutoff_date
-                filtered_df = filtered_df[date_filter]
-            except TypeError:
-                # If comparison fails, try to make them compatible
-                if filtered_df['Enrollment Time'].dt.tz is not None:
-                    # Data is timezone-aware, make cutoff timezone-aware
-                    cutoff_date = cutoff_date.tz_localize('UTC')
-                else:
-                    # Data is timezone-naive, ensure cutoff is also naive
-                    cutoff_date = cutoff_date.tz_localize(None) if cutoff_date.tz is not None else cutoff_date
-                
-                date_filter = filtered_df['Enrollment Time'] >= cutoff_date
-                filtered_df = filtered_df[date_filter]
-        else:
-            st.warning("'Enrollment Time' column not found in the data")
-            return 0
-        
-        # Filter 3: Completed = "Yes"
-        if 'Completed' in filtered_df.columns:
-            completed_filter = filtered_df['Completed'] == 'Yes'
-            filtered_df = filtered_df[completed_filter]
-        else:
-            st.warning("'Completed' column not found in the data")
-            return 0
-        
+        for column in AI_ESSENTIALS_COLUMNS:
+            if column not in df.columns:
+                st.warning(f"'{column}' column not found in the data")
+                return 0
+
+        with stage('filter_ai_essentials', rows=len(df)):
+            if cache_key is not None:
+                filtered_df = parsed_cache.get_or_compute(
+                    filter_key('ai_essentials', cache_key),
+                    lambda: filter_ai_essentials_certificates(df),
+                )
+            else:
+                filtered_df = filter_ai_essentials_certificates(df)
+
         # Final count
         total_certificates = len(filtered_df)
         
         # Display result
+        st.caption("Criteria: " + " | ".join(RULES.describe(AI_ESSENTIALS)))
         st.success(f"**Total {total_certificates} AI Essentials certificate{'s' if total_certificates != 1 else ''}**")
         
         # Show filtered data if any results
@@ -69,7 +44,8 @@ def process_ai_essentials_certificates(df):
             # Display relevant columns
             display_columns = ['Name', 'Email', 'Course', 'Enrollment Time', 'Completed', 'Completion Time']
             available_columns = [col for col in display_columns if col in filtered_df.columns]
-            st.dataframe(filtered_df[available_columns])
+            with stage('render_ai_essentials', rows=total_certificates):
+                st.dataframe(filtered_df[available_columns])
             
         return total_certificates
         
@@ -77,27 +53,80 @@ def process_ai_essentials_certificates(df):
         st.error(f"Error processing AI Essentials certificates: {str(e)}")
         return 0
 
-def process_gcc_usage_report(uploaded_file):
+def load_gcc_usage_report(uploaded_files, progress=None):
     """
-    Process GCC Usage Report file (Type A)
+    Parse and filter GCC Usage Report files without rendering anything, so it can run as a
+    background job. Several files are parsed in parallel and concatenated.
+    """
+    files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+    # Reuse the frames of files seen before (in this session, or in an earlier one
+    # through the on-disk Arrow cache)
+    with stage('read_usage', files=len(files)):
+        return read_reports(USAGE_REPORT, files, progress=progress)
+
+def stream_gcc_usage_report(uploaded_files, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Stream GCC Usage Report files chunk by chunk without rendering anything, so it can run
+    as a background job
+    """
+    files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+    with stage('stream_usage', files=len(files), chunksize=chunksize):
+        cache_key = combined_key([content_hash(f) for f in files])
+        # Private readers: a replaced job may still be reading the same uploads
+        sources = [io.BytesIO(f.getvalue()) if hasattr(f, 'getvalue') else f for f in files]
+        streamed = parsed_cache.get_or_compute(
+            ('usage_report_stream', cache_key),
+            lambda: stream_usage_report(sources, chunksize=chunksize, progress=progress),
+        )
+        return {**streamed, 'cache_key': cache_key}
+
+def process_gcc_usage_report(uploaded_files, job=None):
+    """
+    Process GCC Usage Report files (Type A); several files are parsed in parallel and concatenated.
+    With a job (running load_gcc_usage_report), its result is shown instead of reading the files here.
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(uploaded_file, encoding='utf-8')
-        # Normalize emails early to avoid case-sensitivity issues
-        if 'Email' in df.columns:
-            df['Email'] = df['Email'].astype(str).str.strip().str.lower()
+        files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+        report = job.result() if job is not None else load_gcc_usage_report(files)
+        df = report['df']
+        cache_key = report['cache_key']
         
-        st.success(f"Successfully loaded GCC Usage Report file with {len(df)} rows and {len(df.columns)} columns")
+        source = "file" if len(files) == 1 else f"files ({len(files)})"
+        st.success(f"Successfully loaded GCC Usage Report {source} with {len(df)} rows and {len(df.columns)} columns")
         
         # AI Essentials Certificate Processing
         st.subheader("AI Essentials Certificate Analysis")
         
         # Filter for AI Essentials certificates
-        count = process_ai_essentials_certificates(df)
+        count = process_ai_essentials_certificates(df, cache_key=cache_key)
         
-        return {"df": df, "count": count}
+        return {"df": df, "count": count, "cache_key": cache_key, "cube": report['cube']}
         
     except Exception as e:
         st.error(f"Error processing GCC Usage Report file: {str(e)}")
         return None
+
+def process_gcc_usage_report_streaming(uploaded_files, chunksize=DEFAULT_CHUNKSIZE, job=None):
+    """
+    Process GCC Usage Report files (Type A) chunk by chunk, one file after the other,
+    keeping only per-learner aggregates. With a job (running stream_gcc_usage_report),
+    its result is shown instead of reading the files here.
+    """
+    try:
+        files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+        result = job.result() if job is not None else stream_gcc_usage_report(files, chunksize)
+
+        source = "file" if len(files) == 1 else f"files ({len(files)})"
+        st.success(f"Successfully streamed GCC Usage Report {source} with {result['rows']} rows")
+
+        # AI Essentials Certificate Processing
+        st.subheader("AI Essentials Certificate Analysis")
+        count = result['count']
+        st.success(f"**Total {count} AI Essentials certificate{'s' if count != 1 else ''}**")
+        st.caption("Streaming mode: filtered rows are aggregated per learner and not displayed.")
+
+        return {"aggregator": result['aggregator'], "count": count, "cube": result['cube'], "cache_key": result['cache_key']}
+
+    except Exception as e:
+        st.error(f"Error processing GCC Usage Report file: {str(e)}")
+        return None
@@ -0,0 +1,163 @@
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+# Default bounds for the parsed-upload cache (entries of every session together)
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GiB
+
+
+def content_hash(uploaded_file):
+    """
+    Return a SHA-256 hex digest of an uploaded file's bytes.
+    Accepts raw bytes, a Streamlit UploadedFile (or any object with getvalue())
+    or a readable file object, which is rewound afterwards.
+    """
+    digest = hashlib.sha256()
+    if isinstance(uploaded_file, (bytes, bytearray, memoryview)):
+        digest.update(uploaded_file)
+    elif hasattr(uploaded_file, 'getvalue'):
+        digest.update(uploaded_file.getvalue())
+    else:
+        position = uploaded_file.tell()
+        for block in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+            digest.update(block)
+        uploaded_file.seek(position)
+    return digest.hexdigest()
+
+
+def frame_hash(df):
+    """
+    Return a SHA-256 hex digest of a DataFrame's values, for tables without a content-hash key
+    """
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def estimate_size(value):
+    """
+    Estimate the memory footprint of a cached value in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if callable(getattr(value, 'memory_usage', None)):
+        # Objects holding frames (LearnerAggregator) report their own size
+        return sys.getsizeof(value) + int(value.memory_usage())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and total size.
+    A missing key is computed by one caller at a time: concurrent callers (other
+    sessions opening the same file) wait for its value instead of computing it again.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            # Values that can never fit are not cached at all
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+
+    def claim(self, key):
+        """
+        Whether the caller should compute key: True when it is neither cached nor being
+        computed by another caller. A successful claim must be ended with release(key).
+        """
+        with self._lock:
+            if key in self._entries or key in self._pending:
+                return False
+            self._pending[key] = threading.Event()
+            return True
+
+    def release(self, key):
+        """
+        End a claim (after put(), or after the computation failed), waking up the waiters
+        """
+        with self._lock:
+            pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.set()
+
+    def wait(self, key, default=None):
+        """
+        The value of key once the computation claimed by another caller ends; default
+        when that computation failed or its value could not be cached
+        """
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            pending.wait()
+        return self.get(key, default)
+
+    def get_or_compute(self, key, compute):
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            if self.claim(key):
+                break
+            # Computed elsewhere; if that failed, the next round claims it
+            value = self.wait(key)
+            if value is not None:
+                return value
+        try:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+            return value
+        finally:
+            self.release(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.total_bytes -= size
+
+
+# Process-wide cache of parsed/normalized uploads, their filter results and analyses,
+# keyed by (kind, content hash, ...) so Streamlit reruns on unchanged bytes skip parsing.
+# Every session of the server shares it: cached frames are read-only (copy-on-write
+# is enabled in process/__init__.py, and callers never modify them in place).
+parsed_cache = LRUCache()
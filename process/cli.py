@@ -0,0 +1,261 @@
+"""
+Headless entry point: run the full GCC pipeline without Streamlit.
+
+    gcc-quick-process --usage usage.csv --spec spec.csv --output out/
+    gcc-quick-process --usage program_*/usage.csv --spec program_*/spec.csv --output out/
+
+Writes metrics.json, table3.csv, table4.csv and cube.csv (completions per month,
+course/specialization, Program Name, University and Location City) into the
+output directory.
+Several files per report are parsed in parallel and analyzed together.
+With --chunksize the usage report is streamed in chunks (bounded memory).
+With --store the reports are merged into a persistent snapshot store and the
+2025 metrics and table4.csv cover every snapshot merged so far.
+Certificates are counted by the rules in process/rules.toml (or the file
+named by the GCC_RULES environment variable).
+With --resolve-identities learners found under several emails or name
+spellings are merged (fuzzy matching) before the metrics and table4.csv, and
+the merged emails are listed in identities.csv.
+With --engine polars the CSVs are analyzed by lazy Polars query plans
+(process.lazy) instead of the pandas pipeline, with the same outputs.
+With --profile each pipeline stage is logged to stderr as a JSON line with
+its duration and tracemalloc peak.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from process.columnar import is_columnar
+from process.cube import build_cube, combine_cubes
+from process.lazy import ENGINES, HAS_POLARS, PANDAS, POLARS, analyze_csv
+from process.parallel import SPECIALIZATION_REPORT, USAGE_REPORT, read_reports
+from process.pipeline import (
+    AI_ESSENTIALS,
+    SPECIALIZATIONS,
+    analyze,
+    build_combined_table,
+    build_specialization_table,
+    certificate_counts,
+)
+from process.profiling import Profiler, configure_logging, stage
+from process.rules import SPECIALIZATION, USAGE
+from process.store import SnapshotStore
+from process.streaming import stream_usage_report
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="gcc-quick-process",
+        description="Process GCC usage and specialization reports without the Streamlit UI.",
+    )
+    parser.add_argument(
+        "--usage", type=Path, nargs="+", help="GCC Usage Report CSVs (or normalized .parquet/.arrow/.feather files)"
+    )
+    parser.add_argument(
+        "--spec", type=Path, nargs="+", help="GCC Specialization CSVs (or normalized .parquet/.arrow/.feather files)"
+    )
+    parser.add_argument("-o", "--output", type=Path, default=Path("."), help="Output directory (default: current directory)")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        help="Stream the usage report in chunks of this many rows (bounded memory for very large exports)",
+    )
+    parser.add_argument(
+        "--store",
+        type=Path,
+        help="SQLite snapshot store to merge the reports into; metrics and table4.csv then cover all merged snapshots",
+    )
+    parser.add_argument(
+        "--resolve-identities",
+        action="store_true",
+        help="Merge learners found under several emails or name spellings before computing the metrics and table4.csv",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=PANDAS,
+        help="Analysis engine: the pandas pipeline (default) or lazy Polars query plans over the CSVs",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Log per-stage timings and memory peaks to stderr as JSON lines",
+    )
+    return parser
+
+
+def as_paths(paths):
+    """
+    A list of paths from a path, a list of paths or None
+    """
+    if not paths:
+        return []
+    return paths if isinstance(paths, list) else [paths]
+
+
+def read_input(paths, kind):
+    """
+    Typed report from one or more CSV or Parquet/Arrow/Feather files, concatenated
+    (None without paths); several files are parsed in parallel
+    """
+    paths = as_paths(paths)
+    if not paths:
+        return None
+    return read_reports(kind, paths, use_disk_cache=False)["df"]
+
+
+def analyze_with_store(usage_df, spec_df, store_path):
+    """
+    Merge the reports into the snapshot store; Table 3 comes from the reports,
+    the 2025 metrics and Table 4 from everything in the store
+    """
+    with stage("join"):
+        table3 = build_combined_table(usage_df, spec_df)
+    with SnapshotStore(store_path) as store:
+        for report, df in ((USAGE, usage_df), (SPECIALIZATION, spec_df)):
+            if df is not None:
+                with stage("store_merge", report=report):
+                    summary = store.upsert_report(report, df)
+                print(
+                    f"Snapshot store ({report}): {summary['inserted']} new and {summary['updated']} changed rows, "
+                    f"{summary['learners']} learners updated",
+                    file=sys.stderr,
+                )
+        with stage("metrics"):
+            metrics = store.metrics()
+        with stage("table4"):
+            table4 = store.top_learner_list()
+    return {"table3": table3, **metrics, "table4": table4 if not table4.empty else None}
+
+
+def run(usage_paths, spec_paths, output_dir, store_path=None, merge_identities=False, engine=PANDAS):
+    """
+    Run the pipeline on the given files (a path or a list of paths per report)
+    and write the results to output_dir. Returns the metrics dict.
+    """
+    if engine == POLARS:
+        # Reading, filtering and the analysis are one set of lazy plans
+        with stage("lazy_analysis"):
+            result = analyze_csv(as_paths(usage_paths), as_paths(spec_paths))
+        counts, cube = result["counts"], result["cube"]
+    else:
+        with stage("read_usage"):
+            usage_df = read_input(usage_paths, USAGE_REPORT)
+        with stage("read_specialization"):
+            spec_df = read_input(spec_paths, SPECIALIZATION_REPORT)
+
+        with stage("filter"):
+            counts = {**certificate_counts(usage_df, USAGE), **certificate_counts(spec_df, SPECIALIZATION)}
+        with stage("cube"):
+            cube = combine_cubes([build_cube(usage_df, USAGE), build_cube(spec_df, SPECIALIZATION)])
+        if store_path is not None:
+            result = analyze_with_store(usage_df, spec_df, store_path)
+        else:
+            result = analyze(usage_df, spec_df, merge_identities)
+            if merge_identities:
+                print(f"Identity resolution: {len(result['aliases'])} emails merged into other learners", file=sys.stderr)
+    metrics = {
+        "ai_essentials_certificates": counts.get(AI_ESSENTIALS, 0),
+        "specialization_certificates": counts.get(SPECIALIZATIONS, 0),
+        "certificates": counts,
+        "total_2025_certificates": result["total_2025_certificates"],
+        "unique_2025_learners": result["unique_2025_learners"],
+    }
+
+    with stage("write"):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / "metrics.json").write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+        result["table3"].to_csv(output_dir / "table3.csv", index=False, encoding="utf-8")
+        cube.to_csv(output_dir / "cube.csv", index=False, encoding="utf-8")
+        if result["table4"] is not None:
+            result["table4"].to_csv(output_dir / "table4.csv", index=False, encoding="utf-8")
+        if merge_identities:
+            result["aliases"].rename_axis("Email").rename("Canonical Email").to_csv(
+                output_dir / "identities.csv", encoding="utf-8"
+            )
+    return metrics
+
+
+def run_streaming(usage_paths, spec_paths, output_dir, chunksize):
+    """
+    Streaming variant of run(): the usage report is read chunk by chunk and
+    Table 3 is appended to disk as it is produced. Returns the metrics dict.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    table3_path = output_dir / "table3.csv"
+    table3_path.unlink(missing_ok=True)
+
+    def append_table3(rows):
+        rows.to_csv(table3_path, mode="a", header=not table3_path.exists(), index=False, encoding="utf-8")
+
+    with stage("stream_usage", chunksize=chunksize):
+        streamed = stream_usage_report(usage_paths, chunksize=chunksize, table_sink=append_table3)
+    aggregator = streamed["aggregator"]
+
+    with stage("read_specialization"):
+        spec_df = read_input(spec_paths, SPECIALIZATION_REPORT)
+    if spec_df is not None:
+        with stage("join"):
+            table2 = build_specialization_table(spec_df)
+            if table2 is not None:
+                aggregator.update(table2)
+                append_table3(table2)
+
+    counts = {**streamed["counts"], **certificate_counts(spec_df, SPECIALIZATION)}
+    cube = combine_cubes([streamed["cube"], build_cube(spec_df, SPECIALIZATION)])
+    metrics = {
+        "ai_essentials_certificates": counts.get(AI_ESSENTIALS, 0),
+        "specialization_certificates": counts.get(SPECIALIZATIONS, 0),
+        "certificates": counts,
+        "total_2025_certificates": aggregator.total_2025_certificates,
+        "unique_2025_learners": aggregator.unique_2025_learners if aggregator.rows_seen else 0,
+    }
+
+    (output_dir / "metrics.json").write_text(json.dumps(metrics, indent=2), encoding="utf-8")
+    cube.to_csv(output_dir / "cube.csv", index=False, encoding="utf-8")
+    if aggregator.rows_seen:
+        with stage("table4"):
+            table4 = aggregator.top_learner_list()
+        table4.to_csv(output_dir / "table4.csv", index=False, encoding="utf-8")
+    return metrics
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.usage is None and args.spec is None:
+        parser.error("at least one of --usage or --spec is required")
+    if args.store is not None and args.chunksize:
+        parser.error("--store cannot be combined with --chunksize")
+    if args.resolve_identities and (args.store is not None or args.chunksize):
+        parser.error("--resolve-identities cannot be combined with --store or --chunksize")
+    if args.engine == POLARS:
+        if not HAS_POLARS:
+            parser.error("--engine polars needs the polars package")
+        if args.store is not None or args.chunksize or args.resolve_identities:
+            parser.error("--engine polars cannot be combined with --store, --chunksize or --resolve-identities")
+        if any(is_columnar(path) for path in (args.usage or []) + (args.spec or [])):
+            parser.error("--engine polars reads CSV files only")
+
+    if args.profile:
+        configure_logging()
+    profiler = Profiler(trace_memory=args.profile, emit_logs=args.profile, app="cli")
+
+    try:
+        with profiler.activate():
+            if args.chunksize and args.usage and not any(is_columnar(path) for path in args.usage):
+                metrics = run_streaming(args.usage, args.spec, args.output, args.chunksize)
+            else:
+                metrics = run(args.usage, args.spec, args.output, args.store, args.resolve_identities, args.engine)
+    except Exception as e:
+        print(f"Error processing GCC reports: {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(metrics))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Columnar (Arrow/Parquet) storage of normalized report frames.
+
+Parsed and normalized reports are saved as uncompressed Arrow IPC (Feather v2)
+files in a local cache directory, keyed by the upload's content hash. Later
+sessions read them back instead of parsing the CSV again: there is no text
+parsing, type inference or timestamp conversion. Only the parsing is saved, not
+memory: converting to pandas copies every column, and the dictionary-encoded
+Name/Email columns (which keep the files small) are decoded to object columns.
+The least recently used files beyond DEFAULT_MAX_FILES are removed.
+
+Parquet, Arrow and Feather files are also accepted as uploads in place of the
+CSV reports. Requires pyarrow; without it every read falls back to the CSV path.
+"""
+
+import hashlib
+import io
+import os
+from pathlib import Path
+
+from process.ingest import apply_report_types
+from process.timestamps import NORMALIZED_ATTR
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Where normalized frames are cached between sessions
+DEFAULT_CACHE_DIR = Path(os.environ.get('GCC_CACHE_DIR', '.gcc_cache'))
+# Least recently used cached frames beyond this count are removed
+DEFAULT_MAX_FILES = 16
+
+COLUMNAR_EXTENSIONS = ('.parquet', '.arrow', '.feather')
+UPLOAD_TYPES = ['csv', 'parquet', 'arrow', 'feather'] if HAS_PYARROW else ['csv']
+
+# Text columns stored dictionary-encoded and restored as object columns
+DICTIONARY_COLUMNS = ['Name', 'Email']
+
+
+def is_columnar(uploaded_file):
+    """
+    True for uploads named like a Parquet/Arrow/Feather file
+    """
+    name = str(getattr(uploaded_file, 'name', uploaded_file)).lower()
+    return name.endswith(COLUMNAR_EXTENSIONS)
+
+
+def _source(uploaded_file):
+    if hasattr(uploaded_file, 'getvalue'):
+        return pa.BufferReader(uploaded_file.getvalue())
+    return uploaded_file
+
+
+def read_columnar_report(uploaded_file, columns):
+    """
+    Read the given columns of a Parquet/Arrow/Feather report, typed and normalized.
+    Columns missing from the file are simply absent from the result.
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to read Parquet/Arrow/Feather files")
+    name = str(getattr(uploaded_file, 'name', uploaded_file)).lower()
+    source = _source(uploaded_file)
+    if name.endswith('.parquet'):
+        available = pq.read_schema(source).names
+        usecols = [c for c in columns if c in available]
+        table = pq.read_table(source, columns=usecols)
+    else:
+        table = feather.read_table(source, memory_map=isinstance(source, (str, Path)))
+        usecols = [c for c in columns if c in table.column_names]
+        table = table.select(usecols)
+    return apply_report_types(_to_frame(table))
+
+
+def _to_frame(table):
+    df = table.to_pandas()
+    encoded = [c for c in DICTIONARY_COLUMNS if c in df.columns and df[c].dtype == 'category']
+    if encoded:
+        df = df.astype({c: object for c in encoded})
+    return df
+
+
+def _dictionary_encoded(df):
+    return df.astype({c: 'category' for c in DICTIONARY_COLUMNS if c in df.columns})
+
+
+def save_frame(df, path):
+    """
+    Write a normalized frame as an uncompressed Arrow IPC file (atomically)
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to write Arrow files")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(path.suffix + '.partial')
+    feather.write_feather(_dictionary_encoded(df), partial, compression='uncompressed')
+    os.replace(partial, path)
+
+
+def load_frame(path):
+    """
+    Read back a frame written by save_frame; it is already normalized
+    """
+    df = _to_frame(feather.read_table(path, memory_map=True))
+    df.attrs[NORMALIZED_ATTR] = True
+    return df
+
+
+def frame_bytes(df):
+    """
+    A normalized frame as Arrow IPC bytes, for download
+    """
+    buffer = io.BytesIO()
+    feather.write_feather(_dictionary_encoded(df), buffer, compression='uncompressed')
+    return buffer.getvalue()
+
+
+def read_report_upload(uploaded_file, cache_key, kind, columns, read_csv):
+    """
+    Normalized frame of an uploaded report: Parquet/Arrow/Feather uploads are read
+    directly, CSV uploads go through the on-disk frame cache
+    """
+    if is_columnar(uploaded_file):
+        return read_columnar_report(uploaded_file, columns)
+    # Frames cached with a different column selection are not reused
+    columns_tag = hashlib.sha256('|'.join(columns).encode()).hexdigest()[:8]
+    return cached_report(kind, f"{cache_key}-{columns_tag}", lambda: read_csv(uploaded_file))
+
+
+def _prune(cache_dir, max_files):
+    # Files are touched when they are read, so the oldest mtimes are the least recently used
+    files = sorted(cache_dir.glob('*.arrow'), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[max_files:]:
+        stale.unlink(missing_ok=True)
+
+
+def cached_report(kind, cache_key, read, cache_dir=None, max_files=DEFAULT_MAX_FILES):
+    """
+    The normalized frame for (kind, cache_key): read from the cache directory when it
+    was saved before, otherwise produced by read() and saved for later sessions
+    """
+    if not HAS_PYARROW:
+        return read()
+    cache_dir = Path(cache_dir) if cache_dir is not None else DEFAULT_CACHE_DIR
+    path = cache_dir / f"{kind}-{cache_key}.arrow"
+    if path.exists():
+        try:
+            df = load_frame(path)
+        except (OSError, pa.ArrowException):
+            # Truncated or foreign file: parse again and overwrite it
+            path.unlink(missing_ok=True)
+        else:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return df
+    df = read()
+    try:
+        save_frame(df, path)
+        _prune(cache_dir, max_files)
+    except OSError:
+        # A read-only or full disk only costs the next session a re-parse
+        pass
+    return df
@@ -0,0 +1,96 @@
+"""
+Pre-aggregated completion counts for the dashboard.
+
+build_cube() reduces a report to its completions per month, course or
+specialization, Program Name, University and Location City in one grouped
+pass over the categorical columns. Cubes are additive: the cubes of several
+files or of the chunks of a streamed report are combined by summing, and the
+dashboard's charts and filters are answered from the cube (one row per
+non-empty cell) without going back to the row-level reports.
+"""
+
+import numpy as np
+import pandas as pd
+
+from process.ingest import completed_flag, concat_reports
+from process.rules import REPORT_COLUMNS
+from process.timestamps import to_utc
+
+# Cell coordinates of the cube; Report is the report a completion comes from
+CUBE_DIMENSIONS = ['Month', 'Report', 'Course/Specs', 'Program Name', 'University', 'Location City']
+
+# Dimensions the dashboard filters on
+FILTER_DIMENSIONS = ['Report', 'Course/Specs', 'Program Name', 'University', 'Location City']
+
+
+def empty_cube():
+    return pd.DataFrame({
+        **{d: pd.Series(dtype='category') for d in CUBE_DIMENSIONS if d != 'Month'},
+        'Month': pd.Series(dtype='datetime64[ns]'),
+        'Completions': pd.Series(dtype='int64'),
+    })[CUBE_DIMENSIONS + ['Completions']]
+
+
+def build_cube(df, report):
+    """
+    Completions of a report (completed rows with a completion time) per cell: a frame with
+    the CUBE_DIMENSIONS and 'Completions'. Months are UTC calendar months; dimensions missing
+    from the report are left empty.
+    """
+    columns = REPORT_COLUMNS[report]
+    if df is None or columns['completion'] not in df.columns:
+        return empty_cube()
+    completion = to_utc(df[columns['completion']])
+    mask = completion.notna().to_numpy(copy=True)
+    if columns['completed'] in df.columns:
+        mask &= completed_flag(df[columns['completed']]).to_numpy()
+    if not mask.any():
+        return empty_cube()
+
+    rows = int(mask.sum())
+    nanoseconds = completion.dt.as_unit('ns').array.asi8[mask]
+    keys = pd.DataFrame({
+        'Month': nanoseconds.astype('datetime64[ns]').astype('datetime64[M]').astype('datetime64[ns]'),
+        'Report': pd.Categorical.from_codes(np.zeros(rows, dtype='int8'), [report]),
+    })
+    sources = {'Course/Specs': columns['courses'], 'Program Name': 'Program Name',
+               'University': 'University', 'Location City': 'Location City'}
+    for dimension, column in sources.items():
+        if column in df.columns:
+            # Categorical columns keep their codes; others are factorized once here
+            keys[dimension] = pd.Categorical(df[column][mask].array)
+        else:
+            keys[dimension] = pd.Categorical.from_codes(np.full(rows, -1, dtype='int8'), [])
+    cube = keys[CUBE_DIMENSIONS].groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False).size()
+    return cube.rename('Completions').reset_index()
+
+
+def combine_cubes(cubes):
+    """
+    One cube from several (of different files, reports or chunks), summing shared cells
+    """
+    cubes = [cube for cube in cubes if cube is not None and not cube.empty]
+    if not cubes:
+        return empty_cube()
+    if len(cubes) == 1:
+        return cubes[0]
+    cube = concat_reports(cubes).groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)['Completions'].sum()
+    return cube.reset_index()
+
+
+def slice_cube(cube, filters):
+    """
+    Cells whose dimension values are in the selected values of each filtered dimension
+    (an empty selection keeps every value)
+    """
+    for dimension, values in filters.items():
+        if values:
+            cube = cube[cube[dimension].isin(values)]
+    return cube
+
+
+def rollup(cube, by):
+    """
+    Completions summed over every dimension but `by` (a dimension or a list of them)
+    """
+    return cube.groupby(by, observed=True, dropna=False)['Completions'].sum()
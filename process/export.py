@@ -0,0 +1,151 @@
+"""
+Chunked export of the result tables to CSV, XLSX and Parquet.
+
+Each exporter writes the table slice by slice into an in-memory buffer: only
+one chunk at a time is converted to text, cell values or Arrow arrays, and no
+HTML or whole-table string copy is built. XLSX needs xlsxwriter and Parquet
+needs pyarrow; formats whose library is missing are not offered.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+    HAS_XLSXWRITER = True
+except ImportError:
+    HAS_XLSXWRITER = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Rows converted at a time
+EXPORT_CHUNKSIZE = 100_000
+
+# Rows per worksheet in Excel, header included; longer tables continue on further sheets
+XLSX_MAX_ROWS = 1_048_576
+
+# Day 0 of Excel's serial dates
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+
+def _chunks(df, chunksize):
+    # An empty table is still written once, for its header/schema
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def _iso_timestamps(column):
+    """
+    UTC timestamps as ISO 8601 strings in the GCC export layout ('' for missing values).
+    Formatted by NumPy in one call: pandas formats timezone-aware values one by one.
+    """
+    values = column.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy('datetime64[ms]')
+    strings = np.datetime_as_string(values, unit='ms', timezone='UTC').astype(object)
+    strings[np.isnat(values)] = ''
+    return strings
+
+
+def export_csv(df, chunksize=EXPORT_CHUNKSIZE):
+    """
+    UTF-8 CSV bytes of df, written one chunk at a time; timestamps are written
+    like the GCC exports (2025-01-15T10:30:00.000Z)
+    """
+    buffer = io.BytesIO()
+    times = [c for c in df.columns if isinstance(df[c].dtype, pd.DatetimeTZDtype)]
+    for i, chunk in enumerate(_chunks(df, chunksize)):
+        if times:
+            chunk = chunk.assign(**{c: _iso_timestamps(chunk[c]) for c in times})
+        chunk.to_csv(buffer, header=i == 0, index=False, encoding='utf-8')
+    return buffer.getvalue()
+
+
+def _cell_values(column):
+    """
+    (kind, values) of a column as xlsxwriter cells, None for missing values.
+    Timestamps become Excel serial day numbers (UTC), converted in one vectorized step.
+    """
+    missing = column.isna().to_numpy()
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        column = column.dt.tz_convert('UTC').dt.tz_localize(None)
+    if pd.api.types.is_datetime64_dtype(column.dtype):
+        kind, values = 'datetime', ((column - EXCEL_EPOCH) / pd.Timedelta(days=1)).astype(object)
+    elif pd.api.types.is_bool_dtype(column.dtype):
+        kind, values = 'boolean', column.astype(object)
+    elif pd.api.types.is_numeric_dtype(column.dtype):
+        kind, values = 'number', column.astype(object)
+    else:
+        kind, values = 'string', column.astype(str).astype(object)
+    values = values.to_numpy(copy=True)
+    values[missing] = None
+    return kind, values.tolist()
+
+
+def export_xlsx(df, sheet_name='Sheet1', chunksize=EXPORT_CHUNKSIZE, max_rows=XLSX_MAX_ROWS):
+    """
+    XLSX bytes of df. Rows are streamed to the workbook (constant_memory mode keeps
+    only the current row in memory) with the typed cell writers; tables longer than
+    a worksheet continue on further sheets.
+    """
+    if not HAS_XLSXWRITER:
+        raise ImportError("xlsxwriter is required to export XLSX files")
+    buffer = io.BytesIO()
+    workbook = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    date_format = workbook.add_format({'num_format': 'yyyy-mm-dd hh:mm:ss'})
+    header = [str(c) for c in df.columns]
+    sheet = None
+    sheets = 0
+    row = max_rows
+    for chunk in _chunks(df, chunksize):
+        kinds, columns = zip(*(_cell_values(chunk[c]) for c in chunk.columns)) if len(chunk) else ((), ())
+        for values in zip(*columns):
+            if row == max_rows:
+                sheets += 1
+                sheet = workbook.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name} ({sheets})")
+                sheet.write_row(0, 0, header)
+                row = 1
+                # Typed writers skip write()'s per-cell type detection (and never turn text into formulas or links)
+                writers = {
+                    'datetime': lambda r, c, v, write=sheet.write_number: write(r, c, v, date_format),
+                    'boolean': sheet.write_boolean,
+                    'number': sheet.write_number,
+                    'string': sheet.write_string,
+                }
+                cell_writers = [writers[kind] for kind in kinds]
+            for col, value in enumerate(values):
+                if value is not None:
+                    cell_writers[col](row, col, value)
+            row += 1
+    if sheet is None:
+        workbook.add_worksheet(sheet_name).write_row(0, 0, header)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def export_parquet(df, chunksize=EXPORT_CHUNKSIZE):
+    """
+    Parquet bytes of df, one row group per chunk
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow is required to export Parquet files")
+    buffer = io.BytesIO()
+    # Types inferred over the whole table, so a chunk of missing values cannot change them
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(buffer, schema) as writer:
+        for chunk in _chunks(df, chunksize):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return buffer.getvalue()
+
+
+# Label -> (file extension, MIME type, exporter) of the formats available here
+EXPORT_FORMATS = {'CSV': ('csv', 'text/csv', export_csv)}
+if HAS_XLSXWRITER:
+    EXPORT_FORMATS['XLSX'] = ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', export_xlsx)
+if HAS_PYARROW:
+    EXPORT_FORMATS['Parquet'] = ('parquet', 'application/vnd.apache.parquet', export_parquet)
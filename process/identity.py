@@ -0,0 +1,241 @@
+"""
+Fuzzy learner identity resolution.
+
+The same learner can appear under several emails (school and personal
+addresses) and with inconsistent Vietnamese diacritics across the usage and
+specialization reports. resolve_identities() merges such duplicates before the
+2025 metrics and the Top Learner List are computed.
+
+Candidates are generated by blocking instead of comparing every pair of
+learners: learners are grouped by their normalized name and by their email
+local part, and only learners sharing a block are compared. Blocks larger than
+MAX_BLOCK_SIZE (very common names) are skipped, so the number of comparisons
+grows linearly with the number of learners. Two addresses on the same domain
+are never merged: schools hand out near-identical student-ID addresses
+(hat22080256@, hat22080257@) to different people. Matches are not chained:
+a learner only joins a cluster whose canonical email (its most frequent one)
+it matches directly, and a cluster holds one email per domain. String
+similarity uses rapidfuzz when it is installed and difflib otherwise.
+"""
+
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+try:
+    from rapidfuzz.distance import Indel
+    HAS_RAPIDFUZZ = True
+except ImportError:
+    HAS_RAPIDFUZZ = False
+
+# Blocks with more learners than this are not compared pairwise
+MAX_BLOCK_SIZE = 50
+
+# Same normalized name: email local parts (digits removed) at least this similar are the same learner
+EMAIL_SIMILARITY = 0.8
+
+# Same email local part at another domain: names at least this similar are the same learner
+NAME_SIMILARITY = 0.85
+
+# Shorter local parts (info@, hr@, or the letters of hat22080256@) say too little about who owns the address
+MIN_LOCAL_LENGTH = 4
+
+
+def similarity(a, b):
+    """
+    Normalized similarity of two strings between 0 and 1 (1 - normalized Indel distance)
+    """
+    if a == b:
+        return 1.0
+    if HAS_RAPIDFUZZ:
+        return Indel.normalized_similarity(a, b)
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def name_keys(names):
+    """
+    Blocking key of each name: diacritics removed (đ becomes d), lowercased, punctuation
+    dropped and the words sorted, so 'Phạm Thị Minh Thư' and 'THU Pham Thi Minh' share a key.
+    Each distinct name is normalized once; missing names get ''.
+    """
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object))
+    keys = (
+        pd.Series(uniques, dtype=object).astype(str)
+        .str.replace('đ', 'd').str.replace('Đ', 'D')
+        .str.normalize('NFKD').str.replace(r'[\u0300-\u036f]', '', regex=True)
+        .str.lower().str.replace(r'[^a-z0-9]+', ' ', regex=True)
+        .str.split().map(sorted).str.join(' ')
+        .to_numpy(dtype=object)
+    )
+    return np.where(codes >= 0, np.append(keys, '')[codes], '')
+
+
+def local_parts(emails):
+    """
+    Email local parts without '+tag' suffixes and without '.', '_' and '-' separators
+    """
+    # One pass drops the domain, the tag and the separators
+    local = pd.Series(emails, dtype=object).astype(str).str.replace(r'@.*$|\+[^@]*|[._-]', '', regex=True)
+    return local.to_numpy(dtype=object)
+
+
+def domains(emails):
+    """
+    Email domains ('' for addresses without one)
+    """
+    domain = pd.Series(emails, dtype=object).astype(str).str.extract(r'@(.*)$', expand=False)
+    return domain.fillna('').to_numpy(dtype=object)
+
+
+def letters(local):
+    """
+    Letters of a local part, without the digits of student IDs and years
+    """
+    return re.sub(r'[^a-z]', '', local)
+
+
+def spelled_from_name(local, key):
+    """
+    Whether an email local part (digits ignored) is written with the words and initials of
+    a normalized name, using at least one whole word: 'thupham' or 'ptmthu99' for 'minh pham thi thu'
+    """
+    spelled = letters(local)
+    words = key.split()
+    if not spelled or not words:
+        return False
+    initials = {word[0] for word in words}
+    # reached[i]: spelled[:i] can be written, and whether a whole word was used
+    reached = {0: False}
+    for i in range(len(spelled)):
+        if i not in reached:
+            continue
+        for word in words:
+            if spelled.startswith(word, i):
+                reached[i + len(word)] = True
+        if spelled[i] in initials:
+            reached[i + 1] = reached.get(i + 1, False) or reached[i]
+    return reached.get(len(spelled), False)
+
+
+def _learners(table3):
+    """
+    One row per distinct email: its most frequent Name, row count, name key and local part
+    """
+    emails = table3['Email']
+    counts = emails.value_counts(sort=False)
+    learners = pd.DataFrame({'Email': counts.index.astype(object), 'rows': counts.to_numpy(dtype='int64')})
+    if 'Name' in table3.columns:
+        names = pd.DataFrame({'Email': emails, 'Name': table3['Name']}).dropna().value_counts()
+        # value_counts sorts by count, so the first Name per email is its most frequent
+        names = names.reset_index().drop_duplicates('Email').set_index('Email')['Name']
+        learners['Name'] = learners['Email'].map(names)
+    else:
+        learners['Name'] = None
+    learners['name_key'] = name_keys(learners['Name'])
+    learners['local'] = local_parts(learners['Email'])
+    learners['domain'] = domains(learners['Email'])
+    return learners
+
+
+def _blocks(keys, skip=()):
+    """
+    Positions of the learners sharing each key, for blocks of 2 to MAX_BLOCK_SIZE learners
+    """
+    positions = pd.Series(np.arange(len(keys))).groupby(keys, sort=False).indices
+    for key, block in positions.items():
+        if key not in skip and 2 <= len(block) <= MAX_BLOCK_SIZE:
+            yield key, block
+
+
+def candidate_matches(learners):
+    """
+    Pairs of learner positions judged to be the same person, compared inside blocks only.
+    Addresses on the same domain never match.
+    """
+    name_key = learners['name_key'].to_numpy(dtype=object)
+    local = learners['local'].to_numpy(dtype=object)
+    domain = learners['domain'].to_numpy(dtype=object)
+    spelled = np.array([letters(part) for part in local], dtype=object)
+    matches = []
+
+    # Same normalized name: the email local parts must agree too, digits aside
+    for key, block in _blocks(name_key, skip=('',)):
+        from_name = [spelled_from_name(local[i], key) for i in block]
+        for a in range(len(block)):
+            for b in range(a + 1, len(block)):
+                i, j = block[a], block[b]
+                if domain[i] == domain[j]:
+                    continue
+                if (from_name[a] and from_name[b]) or (
+                    min(len(spelled[i]), len(spelled[j])) >= MIN_LOCAL_LENGTH
+                    and similarity(spelled[i], spelled[j]) >= EMAIL_SIMILARITY
+                ):
+                    matches.append((i, j))
+
+    # Same local part at another domain: the names must agree too
+    long_enough = np.array([len(part) >= MIN_LOCAL_LENGTH for part in spelled], dtype=bool)
+    for _, block in _blocks(np.where(long_enough, local, ''), skip=('',)):
+        for a in range(len(block)):
+            for b in range(a + 1, len(block)):
+                i, j = block[a], block[b]
+                if domain[i] == domain[j]:
+                    continue
+                if name_key[i] and name_key[j] and similarity(name_key[i], name_key[j]) >= NAME_SIMILARITY:
+                    matches.append((i, j))
+    return matches
+
+
+def _canonical(learners, matches):
+    """
+    Position of each learner's canonical learner. Learners are taken from the most rows down
+    (ties: the smallest email); each one not yet clustered becomes a canonical learner and
+    takes in the unclustered learners it matches directly, at most one email per domain.
+    Matches are never chained through another member.
+    """
+    neighbours = {}
+    for i, j in matches:
+        neighbours.setdefault(i, []).append(j)
+        neighbours.setdefault(j, []).append(i)
+    order = learners.sort_values(['rows', 'Email'], ascending=[False, True]).index.to_numpy()
+    rank = np.empty(len(learners), dtype='int64')
+    rank[order] = np.arange(len(learners))
+    domain = learners['domain'].to_numpy(dtype=object)
+
+    canonical = np.arange(len(learners))
+    clustered = np.zeros(len(learners), dtype=bool)
+    for head in sorted(neighbours, key=rank.__getitem__):
+        if clustered[head]:
+            continue
+        clustered[head] = True
+        taken = {domain[head]}
+        for member in sorted(neighbours[head], key=rank.__getitem__):
+            if not clustered[member] and domain[member] not in taken:
+                clustered[member] = True
+                canonical[member] = head
+                taken.add(domain[member])
+    return canonical
+
+
+def resolve_identities(table3):
+    """
+    Merge the emails of learners that are the same person. Returns (table3 with every merged
+    email replaced by its cluster's canonical email, Series alias email -> canonical email).
+    The canonical email is the cluster's email with the most rows (ties: the smallest email),
+    and every other email of the cluster matches it directly.
+    """
+    if table3.empty or 'Email' not in table3.columns:
+        return table3, pd.Series(dtype=object)
+    learners = _learners(table3)
+    matches = candidate_matches(learners)
+    if not matches:
+        return table3, pd.Series(dtype=object)
+
+    learners['canonical'] = learners['Email'].to_numpy(dtype=object)[_canonical(learners, matches)]
+    aliases = learners[learners['Email'] != learners['canonical']].set_index('Email')['canonical']
+    aliases.index.name, aliases.name = 'Email', 'Canonical Email'
+
+    emails = table3['Email']
+    resolved = emails.map(aliases)
+    return table3.assign(Email=resolved.where(resolved.notna(), emails)), aliases
@@ -0,0 +1,200 @@
+"""
+Typed, column-pruned CSV ingestion for the GCC reports.
+
+Only the columns the pipeline uses are read (usecols), with explicit dtypes:
+categoricals for low-cardinality text, a bool Completed flag and UTC datetimes
+parsed once at load. The pyarrow CSV engine is used when it is installed.
+"""
+
+import io
+import os
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from process.timestamps import NORMALIZED_ATTR, normalize_timestamps
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Columns read from each report; anything else in the export is skipped
+USAGE_REPORT_COLUMNS = [
+    'Name', 'Email', 'Course', 'Program Name', 'University', 'Location City', 'Enrollment Time', 'Completed',
+    'Completion Time',
+]
+SPECIALIZATION_REPORT_COLUMNS = [
+    'Name', 'Email', 'Specialization', 'Program Name', 'University', 'Location City', 'Enrollment Time', 'Completed',
+    'Specialization Completion Time',
+]
+
+# Explicit dtypes; Completed is read as a categorical and converted to bool after load
+REPORT_DTYPES = {
+    'Name': 'object',
+    'Email': 'object',
+    'Course': 'category',
+    'Specialization': 'category',
+    'Program Name': 'category',
+    'University': 'category',
+    'Location City': 'category',
+    'Completed': 'category',
+}
+
+# Rows per chunk in streaming mode
+DEFAULT_CHUNKSIZE = 200_000
+
+
+def read_header(source):
+    """
+    Return the column names of a CSV without reading its rows (file objects are rewound)
+    """
+    position = source.tell() if hasattr(source, 'tell') else None
+    columns = pd.read_csv(source, encoding='utf-8', nrows=0).columns.tolist()
+    if position is not None:
+        source.seek(position)
+    return columns
+
+
+def completed_flag(completed):
+    """
+    Boolean Completed flag from either a bool column or the raw "Yes"/"No" values
+    """
+    if completed.dtype == bool:
+        return completed
+    return completed.eq('Yes').astype(bool)
+
+
+def normalize_emails(emails):
+    """
+    Lowercase and strip emails; each distinct value is normalized only once
+    """
+    codes, uniques = pd.factorize(emails, use_na_sentinel=False)
+    normalized = pd.Index(uniques).astype(str).str.strip().str.lower()
+    return pd.Series(normalized.take(codes), index=emails.index, name=emails.name)
+
+
+def apply_report_types(df):
+    """
+    Convert the loaded columns in place: bool Completed, UTC datetimes, normalized emails
+    """
+    if 'Completed' in df.columns:
+        df['Completed'] = completed_flag(df['Completed'])
+    normalize_timestamps(df)
+    # Normalize emails early to avoid case-sensitivity issues
+    if 'Email' in df.columns:
+        df['Email'] = normalize_emails(df['Email'])
+    return df
+
+
+def concat_reports(frames):
+    """
+    Concatenate typed report frames; categorical columns stay categorical
+    (over the union of the categories) instead of falling back to object
+    """
+    frames = list(frames)
+    if len(frames) == 1:
+        return frames[0]
+    for column in frames[0].columns:
+        values = [f[column] for f in frames if column in f.columns]
+        if all(isinstance(v.dtype, pd.CategoricalDtype) for v in values):
+            categories = union_categoricals(values).categories
+            frames = [
+                f.assign(**{column: f[column].cat.set_categories(categories)}) if column in f.columns else f
+                for f in frames
+            ]
+    df = pd.concat(frames, ignore_index=True)
+    if all(f.attrs.get(NORMALIZED_ATTR) for f in frames):
+        df.attrs[NORMALIZED_ATTR] = True
+    return df
+
+
+class _ProgressFile(io.RawIOBase):
+    """
+    Binary file wrapper calling progress(fraction of the bytes read) as the CSV parser
+    reads each block. An exception raised by progress ends the file early instead of
+    propagating into the parser's threads; read_report re-raises it once the parser returns.
+    """
+
+    def __init__(self, raw, progress):
+        self.raw = raw
+        self.progress = progress
+        self.error = None
+        self.start = raw.tell()
+        self.size = raw.seek(0, os.SEEK_END) - self.start
+        raw.seek(self.start)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.raw.seek(offset, whence)
+
+    def tell(self):
+        return self.raw.tell()
+
+    def readinto(self, buffer):
+        if self.error is not None:
+            return 0
+        count = self.raw.readinto(buffer)
+        try:
+            self.progress((self.raw.tell() - self.start) / self.size if self.size else 1.0)
+        except Exception as e:
+            self.error = e
+            return 0
+        return count
+
+
+def load_report_columns(source, columns, engine=CSV_ENGINE):
+    """
+    Read only the given columns of a GCC report CSV with explicit dtypes, without
+    further conversion. Columns missing from the file are simply absent from the result.
+    """
+    available = read_header(source)
+    usecols = [c for c in columns if c in available]
+    dtype = {c: t for c, t in REPORT_DTYPES.items() if c in usecols}
+    df = pd.read_csv(source, encoding='utf-8', usecols=usecols, dtype=dtype, engine=engine)
+    # Keep the canonical column order regardless of the file's layout
+    return df[usecols]
+
+
+def read_report(source, columns, engine=CSV_ENGINE, progress=None):
+    """
+    Read only the given columns of a GCC report CSV, typed and normalized.
+    progress, if given, is called with the fraction of the file read after each block
+    the parser reads; an exception it raises (a cancelled job) stops the read.
+    """
+    if progress is None:
+        return apply_report_types(load_report_columns(source, columns, engine))
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return read_report(f, columns, engine, progress)
+    source = _ProgressFile(source, progress)
+    try:
+        df = load_report_columns(source, columns, engine)
+    except Exception:
+        # The parse failed because the read was stopped
+        if source.error is not None:
+            raise source.error
+        raise
+    if source.error is not None:
+        raise source.error
+    return apply_report_types(df)
+
+
+def iter_report_chunks(source, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Yield typed chunks of a GCC report CSV, reading only the given columns.
+    Memory stays bounded by chunksize; the pyarrow engine has no chunked mode,
+    so the C engine is used here.
+    """
+    available = read_header(source)
+    usecols = [c for c in columns if c in available]
+    dtype = {c: t for c, t in REPORT_DTYPES.items() if c in usecols}
+    with pd.read_csv(source, encoding='utf-8', usecols=usecols, dtype=dtype, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_report_types(chunk[usecols])
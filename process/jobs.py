@@ -0,0 +1,90 @@
+"""
+Background jobs for the Streamlit app.
+
+Parsing and filtering an upload runs in a shared thread pool, so the script run
+that submits it is not blocked and the jobs of both uploaders run at the same
+time (the CSV parser and NumPy release the GIL, and multi-file reports still
+fan out to the process pool). A job is handed a progress callback that the
+readers call between files and chunks; that is also where a cancelled job
+stops, by raising JobCancelled. Each job times its pipeline stages on its own
+Profiler, since it outlives the script run that started it, and traces memory
+when the session that started it does.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from process.profiling import Profiler
+
+# Concurrent jobs across all sessions (two uploaders per session)
+JOB_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job that was cancelled, at its next progress report
+    """
+
+
+def get_job_executor():
+    """
+    The shared thread pool background jobs run in
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='gcc-job')
+        return _executor
+
+
+class Job:
+    """
+    A function running in the background, called with a progress= keyword argument.
+    key identifies the inputs the job was started for; trace_memory turns on the
+    tracemalloc peaks of its stages.
+    """
+
+    def __init__(self, key, fn, *args, trace_memory=False, **kwargs):
+        self.key = key
+        self.fraction = 0.0
+        self.message = 'Queued'
+        self.profiler = Profiler(trace_memory=trace_memory, app="job")
+        self._cancelled = threading.Event()
+        self.future = get_job_executor().submit(self._run, fn, args, kwargs)
+
+    def _run(self, fn, args, kwargs):
+        with self.profiler.activate():
+            return fn(*args, progress=self.report, **kwargs)
+
+    def report(self, fraction, message=None):
+        """
+        Progress callback for the job's function; raises JobCancelled once the job is cancelled
+        """
+        if self._cancelled.is_set():
+            raise JobCancelled()
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """
+        Stop the job: a queued job never starts, a running one stops at its next progress report
+        """
+        self._cancelled.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """
+        The function's return value (waiting for it); re-raises the exception it failed with
+        """
+        return self.future.result(timeout)
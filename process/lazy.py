@@ -0,0 +1,279 @@
+"""
+Lazy query engine for the headless pipeline (optional, needs polars).
+
+The pandas pipeline (process.pipeline) is the reference implementation: it
+reads each report into a frame and runs filter, concat, label, groupby and
+merge steps eagerly, materializing every intermediate. analyze_csv() expresses
+the same certificate counts, Table 3, 2025 metrics, Table 4 and completions
+cube as Polars LazyFrame plans over the CSV files and collects them together:
+the CSV scans only read the columns the plans use, the filters are pushed into
+the scans, the shared scan and Table 3 subplans are computed once, and the
+plans run multi-threaded. Only CSV inputs are supported; the Arrow/Parquet
+files of the app's cache are already normalized pandas frames.
+"""
+
+import importlib.util
+
+import pandas as pd
+
+from process.cube import CUBE_DIMENSIONS, empty_cube
+from process.ingest import SPECIALIZATION_REPORT_COLUMNS, USAGE_REPORT_COLUMNS, read_header
+from process.pipeline import COMPLETION_CUTOFF, RULES, TABLE4_COLUMNS
+from process.rules import CONDITIONS, REPORT_COLUMNS, SPECIALIZATION, USAGE
+from process.timestamps import TIME_COLUMNS
+
+# polars is only imported once a plan is built, so the CLI's default pandas engine
+# does not pay for importing it
+HAS_POLARS = importlib.util.find_spec('polars') is not None
+
+# Analysis engines of the CLI; pandas is the reference
+PANDAS = 'pandas'
+POLARS = 'polars'
+ENGINES = [PANDAS, POLARS]
+
+# Layout of the timestamps in GCC exports, with a Z or +hh:mm offset
+GCC_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%.f%#z'
+
+# Columns each report needs for Table 3
+TABLE_COLUMNS = {
+    USAGE: ['Name', 'Email', 'Course', 'Completed', 'Completion Time'],
+    SPECIALIZATION: ['Name', 'Email', 'Specialization', 'Completed', 'Specialization Completion Time'],
+}
+
+REPORT_FILE_COLUMNS = {USAGE: USAGE_REPORT_COLUMNS, SPECIALIZATION: SPECIALIZATION_REPORT_COLUMNS}
+
+
+def utc_times(frame, columns):
+    """
+    frame with the given text columns parsed to UTC datetimes in nanoseconds, like to_utc:
+    the GCC layout first, then the layout polars infers for the values it did not parse
+    (times without an offset are taken as UTC); unparsable values are null
+    """
+    import polars as pl
+
+    parsed = {column: f'{column} (UTC)' for column in columns}
+    frame = frame.with_columns(
+        pl.col(column).str.strip_chars()
+        .str.to_datetime(GCC_TIME_FORMAT, time_unit='ns', time_zone='UTC', strict=False).alias(name)
+        for column, name in parsed.items()
+    )
+    # Only the values the GCC layout left null reach the fallback
+    return frame.with_columns(
+        pl.coalesce([
+            pl.col(name),
+            pl.when(pl.col(name).is_null()).then(pl.col(column).str.strip_chars())
+            .str.to_datetime(time_unit='ns', time_zone='UTC', strict=False),
+        ]).alias(column)
+        for column, name in parsed.items()
+    ).drop(list(parsed.values()))
+
+
+def scan_reports(paths, report):
+    """
+    Typed LazyFrame over the CSV files of one report, concatenated, with the same conversions
+    as the pandas ingest: bool Completed, UTC times and stripped lowercase emails (missing
+    ones read 'nan', as in normalize_emails). Returns (frame, columns present in any file).
+    """
+    import polars as pl
+
+    wanted = REPORT_FILE_COLUMNS[report]
+    frames, present = [], []
+    for path in paths:
+        available = read_header(path)
+        usecols = [c for c in wanted if c in available]
+        present.extend(c for c in usecols if c not in present)
+        # Every column is read as text; the scan only parses the columns a plan selects
+        frames.append(pl.scan_csv(path, infer_schema=False).select(usecols))
+    present = [c for c in wanted if c in present]
+    missing = [c for c in TABLE_COLUMNS[report] if c not in present]
+    if missing:
+        raise ValueError(f"The {report} report lacks the columns the lazy engine needs: {', '.join(missing)}")
+
+    frame = pl.concat(frames, how='diagonal').with_columns(
+        (pl.col('Completed') == 'Yes').fill_null(False),
+        pl.col('Email').str.strip_chars().str.to_lowercase().fill_null('nan'),
+    )
+    frame = utc_times(frame, [c for c in TIME_COLUMNS if c in present])
+    # Cached: the plans of analyze_csv share one scan of each report
+    return frame.cache(), present
+
+
+def _condition(columns, key, value):
+    """
+    Expression of one rule condition; missing values never match (as with the NumPy masks)
+    """
+    import polars as pl
+
+    column = pl.col(columns[CONDITIONS[key]])
+    if key in ('courses', 'programs'):
+        return column.is_in(list(value)).fill_null(False)
+    if key == 'completed':
+        return column if value else ~column
+    if key.endswith('_from'):
+        return (column >= value.to_pydatetime()).fill_null(False)
+    return (column < value.to_pydatetime()).fill_null(False)
+
+
+def certificate_expression(name):
+    """
+    Boolean expression of the rows that are certificates of the given type (RuleSet.mask)
+    """
+    import polars as pl
+
+    certificate = RULES.certificates[name]
+    columns = REPORT_COLUMNS[certificate['report']]
+    expression = None
+    for conditions, excluded in certificate['clauses']:
+        clause = pl.lit(True)
+        for key, value in conditions.items():
+            clause = clause & _condition(columns, key, value)
+        if excluded:
+            clause = clause & ~_condition(columns, 'programs', excluded)
+        expression = clause if expression is None else expression | clause
+    return expression
+
+
+def counts_plan(frame, present, report):
+    """
+    One-row plan with the number of certificates of each type of the report
+    (0 for certificates whose columns the files lack)
+    """
+    import polars as pl
+
+    counts = []
+    for name in RULES.names(report):
+        if all(c in present for c in RULES.required_columns(name)):
+            counts.append(certificate_expression(name).sum().cast(pl.Int64).alias(name))
+        else:
+            counts.append(pl.lit(0, dtype=pl.Int64).alias(name))
+    return frame.select(counts)
+
+
+def table_plan(frame, report):
+    """
+    Table 1 (usage) or Table 2 (specialization): completed rows of the report's certificate
+    courses with Name, Email, Course/Specs (label and completion date) and Completion Time
+    """
+    import polars as pl
+
+    columns = REPORT_COLUMNS[report]
+    label, completion = pl.col(columns['courses']), pl.col(columns['completion'])
+    selected = pl.col(columns['completed'])
+    courses = RULES.courses(report)
+    if courses is not None:
+        selected = selected & label.is_in(courses).fill_null(False)
+    # Missing labels read 'nan' and missing dates add nothing, as in _with_completion_date
+    date = completion.dt.strftime(' (%d/%m/%Y)').fill_null('')
+    return frame.filter(selected).select(
+        'Name',
+        'Email',
+        pl.concat_str([label.fill_null('nan'), date]).alias('Course/Specs'),
+        completion.alias('Completion Time'),
+    )
+
+
+def metrics_plan(table3):
+    """
+    One-row plan with the 2025 metrics of Table 3
+    """
+    import polars as pl
+
+    in_2025 = pl.col('Completion Time') >= COMPLETION_CUTOFF.to_pydatetime()
+    return table3.select(
+        in_2025.sum().cast(pl.Int64).alias('total_2025_certificates'),
+        pl.col('Email').filter(in_2025).n_unique().cast(pl.Int64).alias('unique_2025_learners'),
+    )
+
+
+def top_learner_plan(table3):
+    """
+    Table 4 of Table 3, as build_top_learner_list: learners whose latest completion is on or
+    after the cutoff (every learner when there is none), their row count, most frequent Name
+    (ties: the smallest) and distinct Course/Specs in appearance order
+    """
+    import polars as pl
+
+    latest = pl.col('Completion Time').max().over('Email')
+    eligible = (latest >= COMPLETION_CUTOFF.to_pydatetime()).fill_null(False)
+    rows = table3.filter(eligible | ~eligible.any())
+
+    names = (
+        rows.filter(pl.col('Name').is_not_null())
+        .group_by('Email', 'Name').len()
+        .sort(['Email', 'len', 'Name'], descending=[False, True, False])
+        .unique('Email', keep='first')
+        .select('Email', 'Name')
+    )
+    learners = rows.group_by('Email').agg(
+        pl.len().cast(pl.Int64).alias('Total course/spec number'),
+        pl.col('Course/Specs').unique(maintain_order=True).str.join('\n').alias('Courses/Specs list'),
+    )
+    return (
+        learners.join(names, on='Email', how='left')
+        .sort(['Total course/spec number', 'Email'], descending=[True, False])
+        .select(TABLE4_COLUMNS)
+    )
+
+
+def cube_plan(frame, present, report):
+    """
+    Completions cube of the report (build_cube): completed rows with a completion time
+    counted per month and dimension values, cells in order of first appearance
+    """
+    import polars as pl
+
+    columns = REPORT_COLUMNS[report]
+    completion = pl.col(columns['completion'])
+    sources = {'Course/Specs': columns['courses'], 'Program Name': 'Program Name',
+               'University': 'University', 'Location City': 'Location City'}
+    keys = {
+        'Month': completion.dt.truncate('1mo').dt.replace_time_zone(None),
+        'Report': pl.lit(report),
+        **{d: pl.col(c) if c in present else pl.lit(None, dtype=pl.String) for d, c in sources.items()},
+    }
+    return (
+        frame.filter(completion.is_not_null() & pl.col(columns['completed']))
+        .select(**keys)
+        .group_by(CUBE_DIMENSIONS, maintain_order=True).len(name='Completions')
+        .with_columns(pl.col('Completions').cast(pl.Int64))
+    )
+
+
+def analyze_csv(usage_paths=None, spec_paths=None):
+    """
+    The certificate 'counts', completions 'cube', 'table3', 2025 metrics and 'table4' (None
+    when Table 3 is empty) of the usage and specialization CSVs, from one set of lazy plans.
+    The tables are returned as pandas frames with the reference pipeline's columns.
+    """
+    if not HAS_POLARS:
+        raise RuntimeError("The polars engine needs the polars package (pip install '.[polars]')")
+    import polars as pl
+
+    reports = [(report, paths) for report, paths in ((USAGE, usage_paths), (SPECIALIZATION, spec_paths)) if paths]
+    counts = {name: 0 for report in (USAGE, SPECIALIZATION) for name in RULES.names(report)}
+    if not reports:
+        return {"counts": counts, "cube": empty_cube(), "table3": pd.DataFrame(), "total_2025_certificates": 0,
+                "unique_2025_learners": 0, "table4": None}
+
+    scans = [(report, *scan_reports(paths, report)) for report, paths in reports]
+    table3 = pl.concat([table_plan(frame, report) for report, frame, _ in scans])
+    plans = [counts_plan(frame, present, report) for report, frame, present in scans]
+    plans += [
+        pl.concat([cube_plan(frame, present, report) for report, frame, present in scans]),
+        table3,
+        metrics_plan(table3),
+        top_learner_plan(table3),
+    ]
+    *count_frames, cube, table3, metrics, table4 = pl.collect_all(plans)
+
+    for frame in count_frames:
+        counts.update(frame.row(0, named=True))
+    metrics = metrics.row(0, named=True)
+    return {
+        "counts": counts,
+        "cube": cube.to_pandas(),
+        "table3": table3.to_pandas() if table3.height else pd.DataFrame(),
+        "total_2025_certificates": metrics['total_2025_certificates'],
+        "unique_2025_learners": metrics['unique_2025_learners'],
+        "table4": table4.to_pandas() if table4.height else None,
+    }
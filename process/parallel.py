@@ -0,0 +1,225 @@
+"""
+Parallel parsing of many uploaded reports.
+
+Each file is parsed, normalized and filtered in a worker process (one per
+core), and the per-file frames are concatenated for the combined analysis.
+Files parsed before (same content hash) are taken from the in-process cache
+and never sent to the pool; a file another session is parsing right now is
+waited for instead of being parsed twice. Workers are started with 'spawn', so they are safe
+to create from Streamlit's script threads; the pool is created once and reused
+across reruns.
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from process.cache import content_hash, parsed_cache
+from process.columnar import is_columnar, read_columnar_report, read_report_upload
+from process.cube import build_cube
+from process.ingest import SPECIALIZATION_REPORT_COLUMNS, USAGE_REPORT_COLUMNS, concat_reports
+from process.pipeline import (
+    AI_ESSENTIALS_COLUMNS,
+    RULES,
+    SPECIALIZATION_COLUMNS,
+    filter_ai_essentials_certificates,
+    filter_specialization_certificates,
+    read_specialization_report,
+    read_usage_report,
+)
+from process.rules import SPECIALIZATION, USAGE
+
+USAGE_REPORT = 'usage_report'
+SPECIALIZATION_REPORT = 'specialization_report'
+
+# Per report kind: columns read, CSV reader, certificate filter, its required columns
+# and the parsed_cache kind of the filtered rows
+REPORTS = {
+    USAGE_REPORT: (
+        USAGE_REPORT_COLUMNS, read_usage_report, filter_ai_essentials_certificates, AI_ESSENTIALS_COLUMNS, 'ai_essentials',
+    ),
+    SPECIALIZATION_REPORT: (
+        SPECIALIZATION_REPORT_COLUMNS, read_specialization_report, filter_specialization_certificates,
+        SPECIALIZATION_COLUMNS, 'specializations',
+    ),
+}
+
+# Report whose rules/columns each report kind's completions cube is built with
+CUBE_REPORTS = {USAGE_REPORT: USAGE, SPECIALIZATION_REPORT: SPECIALIZATION}
+
+# One worker per core available to this process
+WORKERS = os.process_cpu_count() or 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    The shared process pool, one worker per core
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def filter_key(filter_kind, key):
+    """
+    parsed_cache key of certificate rows: the file(s) they come from and the rules they were filtered with
+    """
+    return (filter_kind, key, RULES.fingerprint)
+
+
+def parse_report(kind, source, name, cache_key, use_disk_cache=True, progress=None):
+    """
+    Parse one report (bytes or a path) and filter its certificate rows.
+    Returns (normalized frame, certificate rows or None when a required column is missing).
+    progress, if given, is called with the fraction of a CSV parsed so far (see read_report).
+    """
+    columns, read_csv, certificate_filter, required, _ = REPORTS[kind]
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+        source.name = name
+    if use_disk_cache:
+        df = read_report_upload(source, cache_key, kind, columns, lambda upload: read_csv(upload, progress))
+    elif is_columnar(name):
+        df = read_columnar_report(source, columns)
+    else:
+        df = read_csv(source, progress)
+    filtered = certificate_filter(df) if all(c in df.columns for c in required) else None
+    return df, filtered
+
+
+def _describe(upload):
+    """
+    (source, name, content hash) of an uploaded file or a path
+    """
+    if isinstance(upload, (str, Path)):
+        with open(upload, 'rb') as f:
+            return str(upload), str(upload), content_hash(f)
+    return upload.getvalue(), upload.name, content_hash(upload)
+
+
+def combined_key(keys):
+    """
+    Cache key for a set of files (the file's own key for a single file)
+    """
+    if len(keys) == 1:
+        return keys[0]
+    return hashlib.sha256('|'.join(keys).encode()).hexdigest()
+
+
+def _parse_all(kind, described, indices, use_disk_cache, parallel, store, file_progress):
+    """
+    Parse the files at the given indices, in the process pool when there are several
+    (and several cores), handing each result to store(i, result) as soon as it is ready.
+    Files parsed here report their progress to file_progress(i) while they are read;
+    files in the pool only report once they are done.
+    """
+    if len(indices) == 1 or not parallel or WORKERS == 1:
+        for i in indices:
+            store(i, parse_report(kind, *described[i], use_disk_cache, progress=file_progress(i)))
+    elif indices:
+        executor = get_executor()
+        futures = {executor.submit(parse_report, kind, *described[i], use_disk_cache): i for i in indices}
+        try:
+            for future in as_completed(futures):
+                store(futures[future], future.result())
+        except BrokenProcessPool:
+            # A crashed worker breaks the pool; start a fresh one next time
+            _reset_executor()
+            raise
+        finally:
+            # Files not started yet when this fails (or is cancelled) are dropped
+            for future in futures:
+                future.cancel()
+
+
+def read_reports(kind, uploads, use_disk_cache=True, parallel=True, progress=None):
+    """
+    Parse and filter many reports (uploaded files or paths) of one kind, in parallel
+    when more than one needs parsing and there is more than one core. Returns a dict with the concatenated frame 'df',
+    its certificate rows 'filtered', its completions 'cube', the number of 'files' and their combined 'cache_key'.
+    progress, if given, is called with the fraction parsed and a message after each file,
+    and while a file parsed in this process is read (after each block). Raising there
+    (a cancelled job) stops the read; files parsed before stay cached.
+    """
+    _, _, certificate_filter, required, filter_kind = REPORTS[kind]
+    described = [_describe(upload) for upload in uploads]
+    keys = [key for _, _, key in described]
+    frames = [parsed_cache.get((kind, key)) for key in keys]
+    filtered = [parsed_cache.get(filter_key(filter_kind, key)) for key in keys]
+    missing = [i for i, df in enumerate(frames) if df is None]
+    remaining = len(missing)
+
+    def store(i, result):
+        # Cached as soon as parsed, so a cancelled read keeps the files it finished
+        nonlocal remaining
+        df, rows = result
+        parsed_cache.put((kind, keys[i]), df)
+        if rows is not None:
+            parsed_cache.put(filter_key(filter_kind, keys[i]), rows)
+        parsed_cache.release((kind, keys[i]))
+        frames[i], filtered[i] = df, rows
+        remaining -= 1
+        if progress is not None:
+            progress(1 - remaining / len(uploads), f"Parsed {described[i][1]}")
+
+    def file_progress(i):
+        if progress is None:
+            return None
+        return lambda fraction: progress(
+            (len(uploads) - remaining + fraction) / len(uploads), f"Parsing {described[i][1]}"
+        )
+
+    if progress is not None:
+        progress(1 - remaining / len(uploads), f"Parsing {remaining} of {len(uploads)} files")
+    while missing:
+        # Files already being parsed for another session are waited for below
+        claimed = [i for i in missing if parsed_cache.claim((kind, keys[i]))]
+        try:
+            _parse_all(kind, described, claimed, use_disk_cache, parallel, store, file_progress)
+        finally:
+            # Claims of files not parsed (failure or cancellation) are handed back
+            for i in claimed:
+                parsed_cache.release((kind, keys[i]))
+        for i in missing:
+            if frames[i] is None:
+                frames[i] = parsed_cache.wait((kind, keys[i]))
+                filtered[i] = parsed_cache.get(filter_key(filter_kind, keys[i]))
+                if frames[i] is not None:
+                    remaining -= 1
+                    if progress is not None:
+                        progress(1 - remaining / len(uploads), f"Parsed {described[i][1]}")
+        # Parsed elsewhere but not cached (too large, or that parse failed): parse it here
+        missing = [i for i in missing if frames[i] is None]
+
+    # Frames whose certificate rows were evicted from the cache
+    for i, df in enumerate(frames):
+        if filtered[i] is None and all(c in df.columns for c in required):
+            filtered[i] = parsed_cache.get_or_compute(filter_key(filter_kind, keys[i]), lambda: certificate_filter(df))
+
+    key = combined_key(keys)
+    df = parsed_cache.get_or_compute((kind, key), lambda: concat_reports(frames))
+    if all(rows is not None for rows in filtered):
+        filtered = parsed_cache.get_or_compute(filter_key(filter_kind, key), lambda: concat_reports(filtered))
+    else:
+        filtered = None
+    # Cached next to the frame, so the dashboard never rescans the rows
+    cube = parsed_cache.get_or_compute((f'{kind}_cube', key), lambda: build_cube(df, CUBE_REPORTS[kind]))
+    return {"df": df, "filtered": filtered, "cube": cube, "files": len(uploads), "cache_key": key}
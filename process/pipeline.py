@@ -0,0 +1,390 @@
+"""
+Pure-computation core of the GCC pipeline.
+
+Nothing in this module imports Streamlit, so it can be used from the
+headless CLI (process.cli) as well as from the Streamlit app.
+"""
+
+import numpy as np
+import pandas as pd
+
+from process.identity import resolve_identities
+from process.ingest import SPECIALIZATION_REPORT_COLUMNS, USAGE_REPORT_COLUMNS, completed_flag, concat_reports, read_report
+from process.profiling import stage
+from process.rules import AI_ESSENTIALS, NAT, SPECIALIZATION, SPECIALIZATIONS, USAGE, load_rules
+from process.timestamps import day_codes, to_utc
+
+# Certificate rules (process/rules.toml, or the file named by GCC_RULES)
+RULES = load_rules()
+
+# Completion cutoff used for the 2025 metrics and the Top Learner List
+COMPLETION_CUTOFF = RULES.completion_cutoff
+
+# Columns the rules of the certificates shown by the app's processors require
+AI_ESSENTIALS_COLUMNS = RULES.required_columns(AI_ESSENTIALS)
+SPECIALIZATION_COLUMNS = RULES.required_columns(SPECIALIZATIONS)
+
+TABLE4_COLUMNS = ["Name", "Email", "Total course/spec number", "Courses/Specs list"]
+
+
+def read_usage_report(source, progress=None):
+    """
+    Read the columns of a GCC Usage Report CSV the pipeline uses, typed and with normalized emails
+    (progress: see read_report)
+    """
+    return read_report(source, USAGE_REPORT_COLUMNS, progress=progress)
+
+
+def read_specialization_report(source, progress=None):
+    """
+    Read the columns of a GCC Specialization CSV the pipeline uses, typed and with normalized emails
+    (progress: see read_report)
+    """
+    return read_report(source, SPECIALIZATION_REPORT_COLUMNS, progress=progress)
+
+
+def filter_ai_essentials_certificates(df):
+    """
+    Return the rows of df matching the AI Essentials rules. By default:
+    - Course = "Google AI Essentials"
+    - Enrollment Time >= 2025-01-01
+    - Completed = Yes
+    """
+    return df[RULES.mask(df, AI_ESSENTIALS)]
+
+
+def filter_specialization_certificates(df):
+    """
+    Return the rows of df matching the Specialization rules. By default:
+    - Enrollment Time >= 2025-01-01
+    - Completed = Yes
+    """
+    return df[RULES.mask(df, SPECIALIZATIONS)]
+
+
+def certificate_counts(df, report):
+    """
+    Number of rows of each certificate type counted from the report, from one pass
+    over df (0 for certificates whose columns df lacks, or when df is None)
+    """
+    names = RULES.names(report)
+    if df is None:
+        return dict.fromkeys(names, 0)
+    available = [n for n in names if all(c in df.columns for c in RULES.required_columns(n))]
+    masks = RULES.masks(df, report, available)
+    return {name: int(masks[name].sum()) if name in masks else 0 for name in names}
+
+
+def _table_mask(df, report):
+    """
+    Completed rows of the courses/specializations the report's certificates cover
+    """
+    mask = np.ones(len(df), dtype=bool)
+    courses = RULES.courses(report)
+    course_column = 'Course' if report == USAGE else 'Specialization'
+    if courses is not None and course_column in df.columns:
+        mask &= df[course_column].isin(courses).to_numpy()
+    if 'Completed' in df.columns:
+        mask &= completed_flag(df['Completed']).to_numpy()
+    return mask
+
+
+def label_codes(labels):
+    """
+    (codes, label strings) of a label column, -1 for missing labels.
+    Categorical columns are used through their codes without hashing the values.
+    """
+    if isinstance(labels.dtype, pd.CategoricalDtype):
+        return labels.cat.codes.to_numpy(), labels.cat.categories.astype(str).to_numpy(dtype=object)
+    codes, uniques = pd.factorize(labels)
+    return codes, pd.Index(uniques).astype(str).to_numpy(dtype=object)
+
+
+def _with_completion_date(labels, completion_time):
+    """
+    Course/Specs: each label with " (dd/mm/YYYY)" appended when a completion date is available,
+    as a categorical over the distinct (label, completion day) pairs. The display string of
+    each pair is built once; the rows only hold its code.
+    """
+    codes, strings = label_codes(labels)
+    # Missing labels read 'nan', like str() of the value
+    strings = np.append(strings, 'nan')
+    if completion_time is None:
+        days, dates = np.full(len(codes), -1), np.array([''], dtype=object)
+    else:
+        days, dates = day_codes(completion_time, ' (%d/%m/%Y)')
+        dates = np.append(dates, '')
+    # Code -1 picks the appended 'nan' / '' entries
+    pairs, distinct = pd.factorize(np.where(codes < 0, len(strings) - 1, codes).astype('int64') * len(dates)
+                                   + np.where(days < 0, len(dates) - 1, days))
+    # Distinct pairs can still spell the same string; the categories must be unique
+    spelled, categories = pd.factorize(strings[distinct // len(dates)] + dates[distinct % len(dates)])
+    return pd.Series(pd.Categorical.from_codes(spelled[pairs], categories), index=labels.index)
+
+
+def _certificate_table(df, mask, label_column, completion_column):
+    """
+    Name, Email, Course/Specs and Completion Time of the masked rows.
+    Only the projected columns of the selected rows are materialized.
+    """
+    if not mask.any():
+        return None
+    columns = [c for c in ['Name', 'Email', label_column, completion_column] if c in df.columns]
+    selected = df[columns][mask]
+
+    table = {c: selected[c] for c in ['Name', 'Email'] if c in selected.columns}
+    completion = selected[completion_column] if completion_column in selected.columns else None
+    # Build Course/Specs with appended completion date if available
+    if label_column in selected.columns:
+        table['Course/Specs'] = _with_completion_date(selected[label_column], completion)
+    if completion is not None:
+        table['Completion Time'] = completion
+    return pd.DataFrame(table)
+
+
+def build_usage_table(usage_df):
+    """
+    Table 1: completed rows of the usage certificates' courses (AI Essentials by default)
+    with Name, Email, Course/Specs and Completion Time
+    """
+    return _certificate_table(usage_df, _table_mask(usage_df, USAGE), 'Course', 'Completion Time')
+
+
+def build_specialization_table(spec_df):
+    """
+    Table 2: completed Specialization rows with Name, Email, Course/Specs and Completion Time
+    """
+    mask = _table_mask(spec_df, SPECIALIZATION)
+    # Specialization Completion Time is the unified Completion Time
+    completion_column = (
+        'Specialization Completion Time' if 'Specialization Completion Time' in spec_df.columns else 'Completion Time'
+    )
+    table2 = _certificate_table(spec_df, mask, 'Specialization', completion_column)
+    if table2 is not None and completion_column in table2.columns:
+        table2 = table2.rename(columns={completion_column: 'Completion Time'})
+    return table2
+
+
+def build_combined_table(usage_df, spec_df):
+    """
+    Table 3: concatenation of Table 1 and Table 2 (empty DataFrame if neither has rows)
+    """
+    table1 = build_usage_table(usage_df) if usage_df is not None else None
+    table2 = build_specialization_table(spec_df) if spec_df is not None else None
+
+    if table1 is not None and table2 is not None:
+        # Course/Specs stays categorical over the labels of both tables
+        return concat_reports([table1, table2])
+    if table1 is not None:
+        return table1
+    if table2 is not None:
+        return table2
+    return pd.DataFrame()
+
+
+def compute_2025_metrics(table3):
+    """
+    Compute the 2025 metrics on Table 3 (emails are already normalized at ingest).
+    Returns a dict with the table with UTC completion times ('t3'), 'total_2025_certificates',
+    'unique_2025_learners', the 'eligible_emails' for the Top Learner List and the
+    'learners' factorization of the emails for build_top_learner_list.
+    """
+    t3 = table3
+    learners = learner_ids(t3['Email'])
+    ids, emails = learners
+    # Learner ids with a real email (a missing email is not a learner)
+    known = pd.notna(emails)
+    if 'Completion Time' in t3.columns:
+        completion = to_utc(t3['Completion Time'])
+        if completion is not t3['Completion Time']:
+            t3 = t3.assign(**{'Completion Time': completion})
+        # 2025-only rows for metrics (1) and (2); NaT compares False
+        in_2025 = (completion >= COMPLETION_CUTOFF).to_numpy()
+        total_2025_certificates = int(in_2025.sum())
+        learners_2025 = np.bincount(ids[in_2025], minlength=len(emails)) > 0
+        unique_2025_learners = int((learners_2025 & known).sum())
+
+        # Eligible emails for Top Learner List: max completion time >= cutoff on full data
+        latest = np.full(len(emails), NAT)
+        np.maximum.at(latest, ids, completion.dt.as_unit('ns').array.asi8)
+        eligible = (latest >= COMPLETION_CUTOFF.value) & known
+    else:
+        total_2025_certificates = 0
+        unique_2025_learners = int(known.sum())
+        eligible = known
+    eligible_emails = set(emails[eligible].tolist())
+
+    return {
+        "t3": t3,
+        "total_2025_certificates": total_2025_certificates,
+        "unique_2025_learners": unique_2025_learners,
+        "eligible_emails": eligible_emails,
+        "learners": learners,
+    }
+
+
+def learner_ids(emails):
+    """
+    (ids, emails) factorization of an Email column: each row's integer learner id
+    indexes its email; a missing email gets an id of its own
+    """
+    ids, uniques = pd.factorize(emails, use_na_sentinel=False)
+    return ids, np.asarray(uniques, dtype=object)
+
+
+def representative_names(name_counts):
+    """
+    Most frequent Name per email from (Email, Name) -> count, ties broken by the
+    smallest Name (the same pick as Series.mode().iat[0])
+    """
+    if name_counts.empty:
+        return pd.Series(dtype=object)
+    ranked = name_counts.rename('n').reset_index().sort_values(
+        ['Email', 'n', 'Name'], ascending=[True, False, True]
+    )
+    return ranked.drop_duplicates('Email').set_index('Email')['Name']
+
+
+def _representative_name_ids(learners, names):
+    """
+    representative_names on learner ids: (learner, name) pairs are counted as integers and
+    the most frequent pair per learner wins, ties going to the smallest Name (its sort rank)
+    """
+    ids, emails = learners
+    codes, names = pd.factorize(names)
+    # Rows without an email have no representative name
+    named = (codes >= 0) & pd.notna(emails)[ids]
+    if not named.any():
+        return pd.Series(dtype=object)
+    pairs, pair_counts = np.unique(ids[named].astype('int64') * len(names) + codes[named], return_counts=True)
+    learner, name = pairs // len(names), pairs % len(names)
+    rank = np.argsort(np.argsort(names, kind='stable'))
+    best = np.lexsort((rank[name], -pair_counts, learner))
+    best = best[np.r_[True, learner[best][1:] != learner[best][:-1]]]
+    return pd.Series(names[name[best]], index=emails[learner[best]], dtype=object)
+
+
+def join_labels(emails, labels):
+    """
+    Distinct labels per email, joined with newlines in first-appearance order.
+    Rows must be in appearance order.
+    """
+    return _join_label_codes(learner_ids(emails), *label_codes(labels))
+
+
+def _join_label_codes(learners, codes, strings):
+    """
+    join_labels on learner ids and label codes: duplicates are dropped on the integer
+    (learner, label) pairs, and label strings are only looked up for the distinct pairs
+    that make up the output, joined in a single np.add.reduceat pass
+    """
+    ids, emails = learners
+    present = codes >= 0
+    ids, codes = ids[present], codes[present].astype('int64')
+    if len(ids) == 0:
+        return pd.Series(dtype=object)
+    _, first = np.unique(ids.astype('int64') * len(strings) + codes, return_index=True)
+    # Appearance order, then a stable sort groups the learners while keeping it inside each group
+    first.sort()
+    first = first[np.argsort(ids[first], kind='stable')]
+    grouped = ids[first]
+    starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]])
+    pieces = strings[codes[first]]
+    is_start = np.zeros(len(pieces), dtype=bool)
+    is_start[starts] = True
+    pieces = np.where(is_start, pieces, '\n' + pieces)
+    return pd.Series(np.add.reduceat(pieces, starts), index=emails[grouped[starts]])
+
+
+def assemble_top_learner_list(counts, names, courses):
+    """
+    Table 4 from per-email counts, representative names and joined course lists,
+    sorted in decreasing order by total (ties by email)
+    """
+    counts = counts.sort_index()
+    table4 = pd.DataFrame({
+        'Email': counts.index.astype(object),
+        'Total course/spec number': counts.to_numpy(dtype='int64'),
+    })
+    # Learners without any non-null Name get None, as in the per-group implementation
+    name = table4['Email'].map(names).astype(object)
+    table4['Name'] = name.where(name.notna(), None)
+    table4['Courses/Specs list'] = table4['Email'].map(courses).fillna('')
+    # Stable sort: learners with the same total stay in email order
+    return (
+        table4[TABLE4_COLUMNS]
+        .sort_values(by="Total course/spec number", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def build_top_learner_list(t3, eligible_emails, learners=None):
+    """
+    Table 4: per-learner totals and course/spec lists, restricted to eligible emails,
+    sorted in decreasing order by total. Counting, name picking and label dedup run on
+    integer learner ids (learners, the learner_ids of t3's emails, when already computed);
+    strings are only materialized for the output rows.
+    """
+    ids, emails = learners if learners is not None else learner_ids(t3['Email'])
+    # Filter to only eligible emails for top list
+    rows = pd.Index(emails).isin(eligible_emails)[ids] if eligible_emails else np.ones(len(ids), dtype=bool)
+    ids = ids[rows]
+
+    totals = np.bincount(ids, minlength=len(emails))
+    present = np.flatnonzero(totals)
+    counts = pd.Series(totals[present], index=emails[present])
+
+    # Representative Name per email: most frequent non-null Name
+    if 'Name' in t3.columns:
+        names = _representative_name_ids((ids, emails), t3['Name'].to_numpy()[rows])
+    else:
+        names = pd.Series(dtype=object)
+
+    # List of courses/specs per email (distinct, preserve appearance order)
+    if 'Course/Specs' in t3.columns:
+        codes, strings = label_codes(t3['Course/Specs'])
+        courses = _join_label_codes((ids, emails), codes[rows], strings)
+    else:
+        courses = pd.Series(dtype=object)
+
+    return assemble_top_learner_list(counts, names, courses)
+
+
+def analyze(usage_df, spec_df, merge_identities=False):
+    """
+    Run the full combined analysis.
+    Returns a dict with 'table3', the 2025 metrics, 'table4' (None when Table 3 is empty)
+    and the 'aliases' merged into other learners' emails. With merge_identities, learners
+    found under several emails or name spellings count as one for the metrics and Table 4.
+    """
+    with stage("join"):
+        table3 = build_combined_table(usage_df, spec_df)
+    if table3.empty:
+        return {
+            "table3": table3,
+            "total_2025_certificates": 0,
+            "unique_2025_learners": 0,
+            "table4": None,
+            "aliases": pd.Series(dtype=object),
+        }
+    return {"table3": table3, **analyze_table3(table3, merge_identities)}
+
+
+def analyze_table3(table3, merge_identities=False):
+    """
+    The 2025 metrics, 'table4' and identity 'aliases' of a non-empty Table 3 (see analyze)
+    """
+    resolved, aliases = table3, pd.Series(dtype=object)
+    if merge_identities:
+        with stage("identity"):
+            resolved, aliases = resolve_identities(table3)
+    with stage("metrics"):
+        metrics = compute_2025_metrics(resolved)
+    with stage("table4"):
+        table4 = build_top_learner_list(metrics["t3"], metrics["eligible_emails"], metrics["learners"])
+    return {
+        "total_2025_certificates": metrics["total_2025_certificates"],
+        "unique_2025_learners": metrics["unique_2025_learners"],
+        "table4": table4,
+        "aliases": aliases,
+    }
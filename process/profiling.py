@@ -0,0 +1,145 @@
+"""
+Stage-level timing and memory instrumentation.
+
+Call sites wrap each pipeline step in `with stage("read_usage"):`. While a
+Profiler is active (see Profiler.activate) every stage is timed, optionally
+gets its tracemalloc peak, is kept in Profiler.records and is logged as one
+JSON line. Without an active profiler stage() is a no-op.
+
+tracemalloc is process-wide, so only one profiler at a time owns it: a
+profiler with trace_memory starts it for each of its top-level stages when no
+other profiler holds it, and stops it when the stage ends. Stages that overlap
+another profiler's traced stage (another session, or a background job) record
+timings only.
+"""
+
+import contextvars
+import json
+import logging
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger("gcc_quick_process.profiling")
+
+_active_profiler = contextvars.ContextVar("gcc_active_profiler", default=None)
+
+# Profiler that started tracemalloc and alone may reset its peak
+_memory_owner = None
+_memory_lock = threading.Lock()
+
+
+def configure_logging(level=logging.INFO):
+    """
+    Send the JSON stage logs to stderr, one line per record (idempotent)
+    """
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+class Profiler:
+    """
+    Collects one record per stage: name, seconds, tracemalloc peak (when
+    trace_memory is on) and any extra fields given to stage()
+    """
+
+    def __init__(self, trace_memory=False, emit_logs=True, **context):
+        self.run_id = uuid.uuid4().hex[:12]
+        self.trace_memory = trace_memory
+        self.emit_logs = emit_logs
+        self.context = context
+        self.records = []
+        self._stack = []
+        # Whether this profiler holds tracemalloc, and whether a stage found another one holding it
+        self.tracing_memory = False
+        self.memory_busy = False
+
+    @contextmanager
+    def activate(self):
+        """
+        Make this profiler the target of stage() for the duration of the block
+        """
+        token = _active_profiler.set(self)
+        try:
+            yield self
+        finally:
+            _active_profiler.reset(token)
+
+    def _acquire_memory(self):
+        """
+        Start tracemalloc for this profiler; False when another profiler (or other code) traces
+        """
+        global _memory_owner
+        if not self.trace_memory:
+            return False
+        with _memory_lock:
+            if _memory_owner is None and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _memory_owner = self
+                self.tracing_memory = True
+                return True
+        self.memory_busy = True
+        return False
+
+    def _release_memory(self):
+        global _memory_owner
+        with _memory_lock:
+            self.tracing_memory = False
+            tracemalloc.stop()
+            _memory_owner = None
+
+    @contextmanager
+    def stage(self, name, **fields):
+        # Only top-level stages take tracemalloc, nested ones share it
+        owns_memory = not self._stack and self._acquire_memory()
+        tracing = self.tracing_memory
+        frame = {"max_peak": 0, "base": 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the enclosing stage's peak before resetting it for this one
+            if self._stack:
+                self._stack[-1]["max_peak"] = max(self._stack[-1]["max_peak"], peak)
+            tracemalloc.reset_peak()
+            frame["base"] = current
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            record = {"stage": name, "seconds": round(seconds, 6)}
+            if tracing:
+                peak = max(frame["max_peak"], tracemalloc.get_traced_memory()[1])
+                record["peak_bytes"] = max(0, peak - frame["base"])
+                if self._stack:
+                    self._stack[-1]["max_peak"] = max(self._stack[-1]["max_peak"], peak)
+            if owns_memory:
+                self._release_memory()
+            record.update(fields)
+            self.records.append(record)
+            if self.emit_logs:
+                logger.info(json.dumps({"event": "pipeline_stage", "run_id": self.run_id, **self.context, **record}, default=str))
+
+    def total_seconds(self):
+        return sum(record["seconds"] for record in self.records)
+
+
+@contextmanager
+def stage(name, **fields):
+    """
+    Time the enclosed block as a pipeline stage on the active profiler, if any
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, **fields):
+        yield
@@ -0,0 +1,41 @@
+"""
+Presentation helpers shared by the Streamlit app and the benchmarks.
+"""
+
+import numpy as np
+
+
+def table4_html(table4):
+    """
+    HTML for the wrapped Top Learner List view: one line per course/spec in each cell
+    """
+    # Convert newlines to <br> for HTML rendering
+    html_df = table4.assign(**{'Courses/Specs list': table4['Courses/Specs list'].astype(str).str.replace('\n', '<br>')})
+    return html_df.to_html(escape=False, index=False)
+
+
+def search_rows(df, query, columns):
+    """
+    Rows of df where any of the given text columns contains query (case-insensitive, literal match)
+    """
+    query = (query or '').strip()
+    if not query:
+        return df
+    mask = np.zeros(len(df), dtype=bool)
+    for column in columns:
+        if column in df.columns:
+            mask |= df[column].str.contains(query, case=False, regex=False, na=False).to_numpy(dtype=bool)
+    return df[mask]
+
+
+def page_count(total_rows, page_size):
+    return max(1, -(-total_rows // page_size))
+
+
+def page_slice(df, page, page_size):
+    """
+    Rows of the 1-based page of df; out-of-range pages are clamped to the first/last page
+    """
+    page = min(max(1, int(page)), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
@@ -0,0 +1,280 @@
+"""
+Declarative certificate filters.
+
+The certificate criteria (course sets, enrollment and completion date windows,
+the Completed flag and per-program overrides) are read from a TOML file,
+process/rules.toml unless GCC_RULES names another one, and compiled once into
+clauses. A frame is evaluated in a single pass: every column the rules refer to
+is turned into a NumPy array once (course and program membership through the
+categorical codes, times as UTC nanoseconds) and each certificate's boolean
+mask is combined from those shared arrays, so adding certificate types does
+not add passes over the report.
+"""
+
+import hashlib
+import json
+import os
+import tomllib
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from process.ingest import completed_flag
+from process.timestamps import to_utc
+
+DEFAULT_RULES_PATH = Path(__file__).with_name('rules.toml')
+# Rules used by the app and the CLI
+RULES_PATH = Path(os.environ.get('GCC_RULES', DEFAULT_RULES_PATH))
+
+USAGE = 'usage'
+SPECIALIZATION = 'specialization'
+
+# Certificates the app and the CLI show, and the report each one must be counted from
+AI_ESSENTIALS = 'ai_essentials'
+SPECIALIZATIONS = 'specializations'
+REQUIRED_CERTIFICATES = {AI_ESSENTIALS: USAGE, SPECIALIZATIONS: SPECIALIZATION}
+
+# Report column behind each kind of condition, per report
+REPORT_COLUMNS = {
+    USAGE: {
+        'courses': 'Course',
+        'programs': 'Program Name',
+        'enrolled': 'Enrollment Time',
+        'completion': 'Completion Time',
+        'completed': 'Completed',
+    },
+    SPECIALIZATION: {
+        'courses': 'Specialization',
+        'programs': 'Program Name',
+        'enrolled': 'Enrollment Time',
+        'completion': 'Specialization Completion Time',
+        'completed': 'Completed',
+    },
+}
+
+# Condition keys and the kind of column each one reads
+CONDITIONS = {
+    'courses': 'courses',
+    'programs': 'programs',
+    'enrolled_from': 'enrolled',
+    'enrolled_before': 'enrolled',
+    'completed_from': 'completion',
+    'completed_before': 'completion',
+    'completed': 'completed',
+}
+
+# NaT as UTC nanoseconds
+NAT = np.iinfo('int64').min
+
+
+def _timestamp(value, where):
+    if isinstance(value, bool) or not isinstance(value, (date, str)):
+        raise ValueError(f"{where} must be a date, got {value!r}")
+    ts = pd.Timestamp(value)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+def _conditions(table, report, where):
+    """
+    Validated conditions of one rule table, with dates as UTC timestamps
+    """
+    conditions = {}
+    for key, value in table.items():
+        if key not in CONDITIONS:
+            raise ValueError(f"Unknown condition '{key}' in {where}")
+        if CONDITIONS[key] not in REPORT_COLUMNS[report]:
+            raise ValueError(f"'{key}' does not apply to the {report} report ({where})")
+        if key in ('courses', 'programs'):
+            if isinstance(value, str) or not all(isinstance(v, str) for v in value):
+                raise ValueError(f"'{key}' in {where} must be a list of names")
+            conditions[key] = tuple(value)
+        elif key == 'completed':
+            if not isinstance(value, bool):
+                raise ValueError(f"'completed' in {where} must be true or false")
+            conditions[key] = value
+        else:
+            conditions[key] = _timestamp(value, f"'{key}' in {where}")
+    # Cheap membership tests first, in a stable order
+    return {key: conditions[key] for key in CONDITIONS if key in conditions}
+
+
+class _Columns:
+    """
+    NumPy arrays of the report columns the rules read, each computed once per frame
+    """
+
+    def __init__(self, df, columns):
+        self.df = df
+        self.columns = columns
+        self.arrays = {}
+
+    def _cached(self, key, compute):
+        if key not in self.arrays:
+            self.arrays[key] = compute()
+        return self.arrays[key]
+
+    def member(self, kind, values):
+        def compute():
+            column = self.df[self.columns[kind]]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # Look up each category once; code -1 (missing) picks the trailing False
+                hits = np.append(column.cat.categories.isin(values), False)
+                return hits[column.cat.codes.to_numpy()]
+            return column.isin(values).to_numpy()
+        return self._cached(('member', kind, values), compute)
+
+    def nanoseconds(self, kind):
+        return self._cached(
+            ('times', kind),
+            lambda: to_utc(self.df[self.columns[kind]]).dt.as_unit('ns').array.asi8,
+        )
+
+    def completed(self):
+        return self._cached('completed', lambda: completed_flag(self.df[self.columns['completed']]).to_numpy())
+
+    def condition(self, key, value):
+        if key in ('courses', 'programs'):
+            return self.member(key, value)
+        if key == 'completed':
+            return self.completed() if value else ~self.completed()
+        times = self.nanoseconds(CONDITIONS[key])
+        if key.endswith('_from'):
+            return times >= value.value
+        return (times < value.value) & (times != NAT)
+
+
+class RuleSet:
+    """
+    Certificate rules compiled from a parsed rules file
+    """
+
+    def __init__(self, config, source=None):
+        self.source = source
+        # Identifies the rules for caches and stores built with them
+        self.fingerprint = hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        metrics = config.get('metrics', {})
+        self.completion_cutoff = _timestamp(metrics.get('completed_from', '2025-01-01'), "metrics 'completed_from'")
+        defaults = config.get('defaults', {})
+
+        self.certificates = {}
+        for entry in config.get('certificate', []):
+            entry = dict(entry)
+            name = entry.pop('name', None)
+            title = entry.pop('title', name)
+            report = entry.pop('report', None)
+            overrides = entry.pop('program', [])
+            if not name or name in self.certificates:
+                raise ValueError(f"Every certificate needs a unique name (got {name!r})")
+            if report not in REPORT_COLUMNS:
+                raise ValueError(f"Certificate '{name}' has an unknown report {report!r}")
+
+            # (conditions, programs excluded) pairs; a row matching any clause is a certificate
+            base = {**defaults, **entry}
+            clauses = []
+            overridden = []
+            for i, override in enumerate(overrides, start=1):
+                if 'programs' not in override:
+                    raise ValueError(f"Program rule {i} of certificate '{name}' lists no programs")
+                conditions = _conditions({**base, **override}, report, f"program rule {i} of '{name}'")
+                clauses.append((conditions, ()))
+                overridden.extend(conditions['programs'])
+            clauses.insert(0, (_conditions(base, report, f"certificate '{name}'"), tuple(overridden)))
+            self.certificates[name] = {'title': title, 'report': report, 'clauses': clauses}
+
+    def names(self, report):
+        """
+        Certificates counted from the given report, in file order
+        """
+        return [name for name, certificate in self.certificates.items() if certificate['report'] == report]
+
+    def title(self, name):
+        return self.certificates[name]['title']
+
+    def required_columns(self, name):
+        """
+        Report columns the rules of a certificate read
+        """
+        certificate = self.certificates[name]
+        kinds = set()
+        for conditions, excluded in certificate['clauses']:
+            kinds.update(CONDITIONS[key] for key in conditions)
+            if excluded:
+                kinds.add('programs')
+        return [column for kind, column in REPORT_COLUMNS[certificate['report']].items() if kind in kinds]
+
+    def masks(self, df, report, names=None):
+        """
+        Boolean NumPy mask of each certificate of the report (all of them unless names are given),
+        evaluated together over one set of column arrays
+        """
+        columns = _Columns(df, REPORT_COLUMNS[report])
+        masks = {}
+        for name in names if names is not None else self.names(report):
+            mask = None
+            for conditions, excluded in self.certificates[name]['clauses']:
+                clause = np.ones(len(df), dtype=bool)
+                for key, value in conditions.items():
+                    clause &= columns.condition(key, value)
+                if excluded:
+                    clause &= ~columns.member('programs', excluded)
+                mask = clause if mask is None else mask | clause
+            masks[name] = mask
+        return masks
+
+    def mask(self, df, name):
+        """
+        Boolean NumPy mask of the rows of df that are certificates of the given type
+        """
+        return self.masks(df, self.certificates[name]['report'], [name])[name]
+
+    def courses(self, report):
+        """
+        Courses/Specializations any certificate of the report may be for (None when unrestricted)
+        """
+        courses = []
+        for name in self.names(report):
+            for conditions, _ in self.certificates[name]['clauses']:
+                if 'courses' not in conditions:
+                    return None
+                courses.extend(c for c in conditions['courses'] if c not in courses)
+        return courses or None
+
+    def describe(self, name):
+        """
+        Human-readable conditions of a certificate, one line per clause
+        """
+        labels = REPORT_COLUMNS[self.certificates[name]['report']]
+        lines = []
+        for conditions, excluded in self.certificates[name]['clauses']:
+            parts = []
+            for key, value in conditions.items():
+                column = labels[CONDITIONS[key]]
+                if key in ('courses', 'programs'):
+                    parts.append(f"{column} in {', '.join(value)}")
+                elif key == 'completed':
+                    parts.append(f"{column} = {'Yes' if value else 'No'}")
+                else:
+                    parts.append(f"{column} {'>=' if key.endswith('_from') else '<'} {value:%Y-%m-%d}")
+            if excluded:
+                parts.append(f"{labels['programs']} not in {', '.join(excluded)}")
+            lines.append(', '.join(parts))
+        return lines
+
+
+def load_rules(path=None, required=REQUIRED_CERTIFICATES):
+    """
+    Parse and compile a rules file (RULES_PATH by default), which must define the
+    required certificates for their reports
+    """
+    path = Path(path) if path is not None else RULES_PATH
+    with open(path, 'rb') as f:
+        rules = RuleSet(tomllib.load(f), source=str(path))
+    missing = [name for name in required if name not in rules.certificates]
+    if missing:
+        raise ValueError(f"The rules file {path} lacks the certificates {', '.join(missing)}")
+    for name, report in required.items():
+        if rules.certificates[name]['report'] != report:
+            raise ValueError(f"Certificate '{name}' in {path} must be counted from the {report} report")
+    return rules
@@ -1,57 +1,36 @@
 import streamlit as st
-import pandas as pd
 
-def process_specialization_certificates(df):
+from process.cache import parsed_cache
+from process.parallel import SPECIALIZATION_REPORT, filter_key, read_reports
+from process.pipeline import RULES, SPECIALIZATION_COLUMNS, SPECIALIZATIONS, filter_specialization_certificates
+from process.profiling import stage
+
+def process_specialization_certificates(df, cache_key=None):
     """
-    Process and filter Specialization certificates based on specific criteria:
-    - Completed = Yes
+    Process and filter Specialization certificates based on the rules in process/rules.toml
+    (by default Enrollment Time >= 2025-01-01, Completed = Yes).
+    When cache_key is given, the filtered rows are reused across reruns.
     """
     try:
-        # Make a copy to avoid modifying the original dataframe
-        filtered_df = df.copy()
+        for column in SPECIALIZATION_COLUMNS:
+            if column not in df.columns:
+                st.warning(f"'{column}' column not found in the data")
+                return 0
+
+        with stage('filter_specializations', rows=len(df)):
+            if cache_key is not None:
+                filtered_df = parsed_cache.get_or_compute(
+                    filter_key('specializations', cache_key),
+                    lambda: filter_specialization_certificates(df),
+                )
+            else:
+                filtered_df = filter_specialization_certificates(df)
 
-        
-        # Filter 1: Enrollment Time >= Jan 01 2025
-        if 'Enrollment Time' in filtered_df.columns:
-            # Convert enrollment time to datetime
-            filtered_df = filtered_df.copy()  # Avoid SettingWithCopyWarning
-            filtered_df['Enrollment Time'] = pd.to_datetime(filtered_df['Enrollment Time'], errors='coerce')
-            
-            # Create cutoff date - start with naive datetime
-            cutoff_date = pd.Timestamp('2024-01-01')
-            
-            # Handle timezone compatibility
-            try:
-                # First, try the comparison as-is (works if both are naive or both have same timezone)
-                date_filter = filtered_df['Enrollment Time'] >= cutoff_date
-                filtered_df = filtered_df[date_filter]
-            except TypeError:
-                # If comparison fails, try to make them compatible
-                if filtered_df['Enrollment Time'].dt.tz is not None:
-                    # Data is timezone-aware, make cutoff timezone-aware
-                    cutoff_date = cutoff_date.tz_localize('UTC')
-                else:
-                    # Data is timezone-naive, ensure cutoff is also naive
-                    cutoff_date = cutoff_date.tz_localize(None) if cutoff_date.tz is not None else cutoff_date
-                
-                date_filter = filtered_df['Enrollment Time'] >= cutoff_date
-                filtered_df = filtered_df[date_filter]
-        else:
-            st.warning("'Enrollment Time' column not found in the data")
-            return 0
-        
-        # Filter 2: Completed = "Yes"
-        if 'Completed' in filtered_df.columns:
-            completed_filter = filtered_df['Completed'] == 'Yes'
-            filtered_df = filtered_df[completed_filter]
-        else:
-            st.warning("'Completed' column not found in the data")
-            return 0
-        
         # Final count
         total_certificates = len(filtered_df)
         
         # Display result
+        st.caption("Criteria: " + " | ".join(RULES.describe(SPECIALIZATIONS)))
         st.success(f"**Total {total_certificates} Specialization certificate{'s' if total_certificates != 1 else ''}**")
         
         # Show filtered data if any results
@@ -61,7 +40,8 @@ def process_specialization_certificates(df):
             # Display relevant columns
             display_columns = ['Name', 'Email', 'Specialization', 'University', 'Enrollment Time', 'Completed', 'Specialization Completion Time']
             available_columns = [col for col in display_columns if col in filtered_df.columns]
-            st.dataframe(filtered_df[available_columns])
+            with stage('render_specializations', rows=total_certificates):
+                st.dataframe(filtered_df[available_columns])
             
         return total_certificates
         
@@ -69,26 +49,38 @@ def process_specialization_certificates(df):
         st.error(f"Error processing Specialization certificates: {str(e)}")
         return 0
 
-def process_gcc_specialization_file(uploaded_file):
+def load_gcc_specialization_file(uploaded_files, progress=None):
+    """
+    Parse and filter GCC Specialization files without rendering anything, so it can run as a
+    background job. Several files are parsed in parallel and concatenated.
+    """
+    files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+    # Reuse the frames of files seen before (in this session, or in an earlier one
+    # through the on-disk Arrow cache)
+    with stage('read_specialization', files=len(files)):
+        return read_reports(SPECIALIZATION_REPORT, files, progress=progress)
+
+def process_gcc_specialization_file(uploaded_files, job=None):
     """
-    Process GCC Specialization file (Type B)
+    Process GCC Specialization files (Type B); several files are parsed in parallel and concatenated.
+    With a job (running load_gcc_specialization_file), its result is shown instead of reading the files here.
     """
     try:
-        # Read the CSV file
-        df = pd.read_csv(uploaded_file, encoding='utf-8')
-        # Normalize emails early to avoid case-sensitivity issues
-        if 'Email' in df.columns:
-            df['Email'] = df['Email'].astype(str).str.strip().str.lower()
+        files = uploaded_files if isinstance(uploaded_files, list) else [uploaded_files]
+        report = job.result() if job is not None else load_gcc_specialization_file(files)
+        df = report['df']
+        cache_key = report['cache_key']
         
-        st.success(f"Successfully loaded GCC Specialization file with {len(df)} rows and {len(df.columns)} columns")
+        source = "file" if len(files) == 1 else f"files ({len(files)})"
+        st.success(f"Successfully loaded GCC Specialization {source} with {len(df)} rows and {len(df.columns)} columns")
         
         # Specialization Certificate Processing
         st.subheader("🎓 Specialization Certificate Analysis")
         
         # Filter for Specialization certificates
-        count = process_specialization_certificates(df)
+        count = process_specialization_certificates(df, cache_key=cache_key)
         
-        return {"df": df, "count": count}
+        return {"df": df, "count": count, "cache_key": cache_key, "cube": report['cube']}
         
     except Exception as e:
         st.error(f"Error processing GCC Specialization file: {str(e)}")
@@ -0,0 +1,313 @@
+"""
+Persistent snapshot store for successive cumulative GCC reports.
+
+Report rows are kept in a local SQLite database keyed by (report, Email,
+Course/Specialization, Enrollment Time). Each upload is diffed against the
+store through per-row key and value hashes, and only new or changed rows are
+written; the per-learner
+aggregates behind the 2025 metrics and the Top Learner List are then rebuilt
+for the affected emails only.
+
+Rows keep the position they had when first stored, so course/spec lists follow
+the order in which rows first appeared across snapshots. Rows that disappear
+from a later snapshot are kept (the reports are cumulative).
+"""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from process import pipeline
+from process.ingest import completed_flag
+from process.rules import NAT, REPORT_COLUMNS, SPECIALIZATION, USAGE
+from process.timestamps import NORMALIZED_ATTR, to_utc
+
+DEFAULT_STORE_PATH = 'gcc_snapshots.sqlite'
+# Store used by the app; set on the server (GCC_STORE), never by its users
+STORE_PATH = os.environ.get('GCC_STORE', DEFAULT_STORE_PATH)
+
+KEY_FIELDS = ['email', 'item', 'enrolled']
+VALUE_FIELDS = ['name', 'completed', 'completion', 'university']
+
+# Timestamps are stored as UTC nanoseconds; NaT is stored as NAT, its int64 value
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_rows (
+    report TEXT NOT NULL,
+    email TEXT NOT NULL,
+    item TEXT NOT NULL,
+    enrolled INTEGER NOT NULL,
+    name TEXT,
+    completed INTEGER NOT NULL,
+    completion INTEGER NOT NULL,
+    university TEXT,
+    seq INTEGER NOT NULL,
+    key_hash INTEGER NOT NULL,
+    row_hash INTEGER NOT NULL,
+    PRIMARY KEY (report, email, item, enrolled)
+);
+CREATE INDEX IF NOT EXISTS report_rows_email ON report_rows (email);
+-- Covering index for the upload diff, which only reads the hashes
+CREATE INDEX IF NOT EXISTS report_rows_hashes ON report_rows (report, key_hash, row_hash);
+CREATE TABLE IF NOT EXISTS learners (
+    email TEXT PRIMARY KEY,
+    name TEXT,
+    total INTEGER NOT NULL,
+    courses TEXT NOT NULL,
+    max_completion INTEGER NOT NULL,
+    certificates_2025 INTEGER NOT NULL
+);
+-- Content keys of the uploads merged so far, so that re-uploading one skips the diff
+CREATE TABLE IF NOT EXISTS merged_uploads (
+    report TEXT NOT NULL,
+    content_key TEXT NOT NULL,
+    PRIMARY KEY (report, content_key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _nanoseconds(times):
+    return to_utc(times).dt.as_unit('ns').array.asi8
+
+
+def _timestamps(nanoseconds):
+    return pd.to_datetime(pd.Series(nanoseconds, dtype='int64'), unit='ns', utc=True)
+
+
+def _hash(rows):
+    # SQLite integers are signed 64-bit
+    return pd.util.hash_pandas_object(rows, index=False).to_numpy().view('int64')
+
+
+def report_rows(report, df):
+    """
+    Store rows for a typed report frame with their key and value hashes:
+    one row per key (the last one wins), rows without an email are skipped
+    """
+    n = len(df)
+
+    def column(name, default=None):
+        return df[name] if name in df.columns else pd.Series(default, index=df.index, dtype=object)
+
+    completion_column = REPORT_COLUMNS[report]['completion']
+    rows = pd.DataFrame({
+        'email': column('Email').astype(object),
+        'item': column(REPORT_COLUMNS[report]['courses'], '').astype(object).fillna(''),
+        'enrolled': _nanoseconds(df['Enrollment Time']) if 'Enrollment Time' in df.columns else np.full(n, NAT),
+        'name': column('Name').astype(object),
+        'completed': completed_flag(df['Completed']).to_numpy(dtype='int64') if 'Completed' in df.columns else np.zeros(n, dtype='int64'),
+        'completion': _nanoseconds(df[completion_column]) if completion_column in df.columns else np.full(n, NAT),
+        'university': column('University').astype(object),
+    })
+    rows = rows[rows['email'].notna()]
+    rows = rows.drop_duplicates(KEY_FIELDS, keep='last').reset_index(drop=True)
+    rows['key_hash'] = _hash(rows[KEY_FIELDS])
+    rows['row_hash'] = _hash(rows[VALUE_FIELDS])
+    return rows
+
+
+class SnapshotStore:
+    """
+    SQLite-backed store of report rows and per-learner aggregates
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = str(path)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._check_rules()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _check_rules(self):
+        """
+        Rebuild the learner aggregates when the certificate rules (courses, 2025 cutoff)
+        differ from the ones they were built with
+        """
+        fingerprint = pipeline.RULES.fingerprint
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'rules'").fetchone()
+        if stored is not None and stored[0] == fingerprint:
+            return
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('rules', ?)", (fingerprint,))
+        if stored is not None:
+            self.rebuild()
+
+    def merged(self, report, content_key):
+        """
+        Whether an upload with this content key was already merged into this store
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM merged_uploads WHERE report = ? AND content_key = ?", (report, content_key)
+        ).fetchone()
+        return row is not None
+
+    def upsert_report(self, report, df, content_key=None):
+        """
+        Diff a typed report frame against the store and upsert the new and changed rows,
+        recording content_key (if given) as merged. Returns a dict with the 'rows' considered,
+        'inserted' and 'updated' row counts and the number of 'learners' whose aggregates
+        were rebuilt.
+        """
+        rows = report_rows(report, df)
+        stored = np.array(
+            self.connection.execute("SELECT key_hash, row_hash FROM report_rows WHERE report = ?", (report,)).fetchall(),
+            dtype='int64',
+        ).reshape(-1, 2)
+        position = pd.Index(stored[:, 0]).get_indexer(rows['key_hash'])
+        is_new = position < 0
+        is_changed = np.zeros(len(rows), dtype=bool)
+        is_changed[~is_new] = stored[position[~is_new], 1] != rows['row_hash'].to_numpy()[~is_new]
+        changed = rows[is_new | is_changed].copy()
+
+        next_seq = self.connection.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM report_rows").fetchone()[0]
+        # New rows are positioned after everything stored so far, in upload order;
+        # changed rows keep their stored position (seq is not updated on conflict)
+        changed['seq'] = next_seq + np.arange(len(changed))
+        changed['report'] = report
+        fields = ['report', *KEY_FIELDS, *VALUE_FIELDS, 'seq', 'key_hash', 'row_hash']
+        # Key order keeps the index inserts sequential; None instead of NaN so that SQLite stores NULL
+        values = changed[fields].sort_values(KEY_FIELDS)
+        values = values.astype(object).where(values.notna(), None)
+
+        cursor = self.connection.cursor()
+        with self.connection:
+            cursor.executemany(
+                f"""
+                INSERT INTO report_rows ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})
+                ON CONFLICT (report, email, item, enrolled) DO UPDATE SET
+                    name = excluded.name, completed = excluded.completed, completion = excluded.completion,
+                    university = excluded.university, row_hash = excluded.row_hash
+                """,
+                zip(*(values[field].tolist() for field in fields)),
+            )
+            cursor.execute("DROP TABLE IF EXISTS temp.affected")
+            cursor.execute("CREATE TEMP TABLE affected (email TEXT PRIMARY KEY)")
+            cursor.executemany("INSERT INTO affected VALUES (?)", ((email,) for email in changed['email'].unique()))
+            learners = self._refresh_affected(cursor)
+            if content_key is not None:
+                cursor.execute("INSERT OR IGNORE INTO merged_uploads VALUES (?, ?)", (report, content_key))
+        return {
+            "rows": len(rows),
+            "inserted": int(is_new.sum()),
+            "updated": int(is_changed.sum()),
+            "learners": learners,
+        }
+
+    def rebuild(self):
+        """
+        Recompute the aggregates of every stored learner
+        """
+        cursor = self.connection.cursor()
+        with self.connection:
+            cursor.execute("DROP TABLE IF EXISTS temp.affected")
+            cursor.execute("CREATE TEMP TABLE affected AS SELECT DISTINCT email FROM report_rows")
+            return self._refresh_affected(cursor)
+
+    def _affected_reports(self):
+        """
+        Stored usage and specialization frames for the emails in temp.affected, in stored order
+        """
+        frames = {}
+        for report in (USAGE, SPECIALIZATION):
+            rows = pd.read_sql_query(
+                "SELECT r.* FROM report_rows r JOIN affected a ON a.email = r.email "
+                "WHERE r.report = ? ORDER BY r.seq",
+                self.connection,
+                params=(report,),
+            )
+            if rows.empty:
+                frames[report] = None
+                continue
+            df = pd.DataFrame({
+                'Name': rows['name'].astype(object),
+                'Email': rows['email'].astype(object),
+                REPORT_COLUMNS[report]['courses']: rows['item'].replace('', np.nan).astype('category'),
+                'Enrollment Time': _timestamps(rows['enrolled']),
+                'Completed': rows['completed'].astype(bool),
+                REPORT_COLUMNS[report]['completion']: _timestamps(rows['completion']),
+            })
+            if report == SPECIALIZATION:
+                df['University'] = rows['university'].astype('category')
+            df.attrs[NORMALIZED_ATTR] = True
+            frames[report] = df
+        return frames
+
+    def _refresh_affected(self, cursor):
+        """
+        Replace the learner aggregates of the emails in temp.affected
+        """
+        affected = cursor.execute("SELECT COUNT(*) FROM affected").fetchone()[0]
+        if affected == 0:
+            return 0
+        frames = self._affected_reports()
+        table3 = pipeline.build_combined_table(frames[USAGE], frames[SPECIALIZATION])
+        cursor.execute("DELETE FROM learners WHERE email IN (SELECT email FROM affected)")
+        if table3.empty:
+            return affected
+
+        emails = table3['Email']
+        completion = to_utc(table3['Completion Time'])
+        counts = emails.value_counts(sort=False)
+        names = pd.DataFrame({'Email': emails, 'Name': table3['Name']}).dropna(subset=['Name'])
+        names = pipeline.representative_names(names.value_counts(sort=False))
+        courses = pipeline.join_labels(emails, table3['Course/Specs'])
+        max_completion = completion.groupby(emails).max()
+        certificates_2025 = (completion >= pipeline.COMPLETION_CUTOFF).groupby(emails).sum()
+
+        learners = pd.DataFrame({'email': counts.index.astype(object), 'total': counts.to_numpy(dtype='int64')})
+        learners['name'] = learners['email'].map(names)
+        learners['courses'] = learners['email'].map(courses).fillna('')
+        learners['max_completion'] = _nanoseconds(learners['email'].map(max_completion))
+        learners['certificates_2025'] = learners['email'].map(certificates_2025).to_numpy(dtype='int64')
+        learners = learners.astype(object).where(learners.notna(), None)
+        cursor.executemany(
+            "INSERT INTO learners (email, name, total, courses, max_completion, certificates_2025) VALUES (?, ?, ?, ?, ?, ?)",
+            learners[['email', 'name', 'total', 'courses', 'max_completion', 'certificates_2025']].itertuples(index=False),
+        )
+        return affected
+
+    def row_count(self, report=None):
+        if report is None:
+            return self.connection.execute("SELECT COUNT(*) FROM report_rows").fetchone()[0]
+        return self.connection.execute("SELECT COUNT(*) FROM report_rows WHERE report = ?", (report,)).fetchone()[0]
+
+    def metrics(self):
+        """
+        2025 metrics over everything in the store
+        """
+        total, unique = self.connection.execute(
+            "SELECT COALESCE(SUM(certificates_2025), 0), COALESCE(SUM(certificates_2025 > 0), 0) FROM learners"
+        ).fetchone()
+        return {"total_2025_certificates": int(total), "unique_2025_learners": int(unique)}
+
+    def top_learner_list(self):
+        """
+        Table 4 over everything in the store, identical to pipeline.build_top_learner_list
+        on the combined snapshots
+        """
+        learners = pd.read_sql_query("SELECT * FROM learners", self.connection)
+        # Learners whose max Completion Time >= cutoff; everyone when nobody qualifies
+        cutoff = pipeline.COMPLETION_CUTOFF.value
+        eligible = learners[learners['max_completion'] >= cutoff]
+        if not eligible.empty:
+            learners = eligible
+        counts = pd.Series(learners['total'].to_numpy(dtype='int64'), index=learners['email'].astype(object))
+        names = learners.set_index('email')['name'].dropna()
+        courses = learners.set_index('email')['courses']
+        return pipeline.assemble_top_learner_list(counts, names, courses)
@@ -0,0 +1,165 @@
+"""
+Streaming (chunked) processing for usage reports larger than memory.
+
+The usage CSV is read in chunks; each chunk goes through the same AI Essentials
+filters and Table 1 construction as the eager pipeline, and is folded into
+per-email aggregates. Memory is bounded by the chunk size plus the number of
+distinct learners, and the 2025 metrics and Top Learner List come out identical
+to process.pipeline.analyze.
+"""
+
+import numpy as np
+import pandas as pd
+
+from process.cube import build_cube, combine_cubes
+from process.ingest import DEFAULT_CHUNKSIZE, USAGE_REPORT_COLUMNS, iter_report_chunks
+from process.pipeline import (
+    AI_ESSENTIALS,
+    COMPLETION_CUTOFF,
+    assemble_top_learner_list,
+    build_usage_table,
+    certificate_counts,
+    join_labels,
+    representative_names,
+)
+from process.rules import USAGE
+from process.timestamps import to_utc
+
+
+class LearnerAggregator:
+    """
+    Incremental per-email aggregates over Table 3 shaped rows
+    (Name, Email, Course/Specs, Completion Time), fed in order
+    """
+
+    def __init__(self):
+        self.rows_seen = 0
+        self.has_name = False
+        self.has_completion = False
+        self.total_2025_certificates = 0
+        self.counts = pd.Series(dtype='int64')
+        self.max_completion = pd.Series(dtype='datetime64[ns, UTC]')
+        self.name_counts = pd.Series(dtype='int64', index=pd.MultiIndex.from_tuples([], names=['Email', 'Name']))
+        self.courses = pd.DataFrame({'Email': pd.Series(dtype=object), 'label': pd.Series(dtype=object), 'seq': pd.Series(dtype='int64')})
+        self.emails_2025 = pd.Index([], dtype=object)
+
+    def memory_usage(self):
+        """
+        Bytes held by the aggregates, so caches can bound streamed results by size
+        """
+        frames = [self.counts, self.max_completion, self.name_counts, self.courses]
+        total = sum(int(np.sum(frame.memory_usage(index=True, deep=True))) for frame in frames)
+        return total + int(self.emails_2025.memory_usage(deep=True))
+
+    def copy(self):
+        other = LearnerAggregator()
+        other.__dict__.update(self.__dict__)
+        return other
+
+    def update(self, table):
+        """
+        Fold one chunk of Table 3 rows into the aggregates
+        """
+        if table is None or table.empty:
+            return self
+        # Emails are already normalized at ingest
+        emails = table['Email']
+
+        self.counts = _combine(self.counts, emails.value_counts(sort=False), 'sum')
+
+        if 'Completion Time' in table.columns:
+            self.has_completion = True
+            completion = to_utc(table['Completion Time'])
+            self.max_completion = _combine(self.max_completion, completion.groupby(emails).max(), 'max')
+            in_2025 = (completion >= COMPLETION_CUTOFF).to_numpy()
+            self.total_2025_certificates += int(in_2025.sum())
+            self.emails_2025 = self.emails_2025.union(pd.Index(emails[in_2025].unique()), sort=False)
+
+        if 'Name' in table.columns:
+            self.has_name = True
+            names = pd.DataFrame({'Email': emails, 'Name': table['Name']}).dropna(subset=['Name'])
+            self.name_counts = _combine(self.name_counts, names.value_counts(sort=False), 'sum')
+
+        if 'Course/Specs' in table.columns:
+            labels = pd.DataFrame({
+                'Email': emails,
+                'label': table['Course/Specs'],
+                'seq': self.rows_seen + np.arange(len(table)),
+            }).dropna(subset=['label'])
+            labels['label'] = labels['label'].astype(str)
+            # Earlier rows come first, so keep='first' preserves first-appearance order
+            self.courses = pd.concat([self.courses, labels], ignore_index=True).drop_duplicates(['Email', 'label'])
+
+        self.rows_seen += len(table)
+        return self
+
+    @property
+    def unique_2025_learners(self):
+        if not self.has_completion:
+            return int(len(self.counts))
+        return int(len(self.emails_2025))
+
+    def eligible_emails(self):
+        """
+        Learners whose max Completion Time >= cutoff (all learners without completion times)
+        """
+        if not self.has_completion:
+            return set(self.counts.index)
+        return set(self.max_completion.index[self.max_completion >= COMPLETION_CUTOFF])
+
+    def top_learner_list(self):
+        """
+        Table 4 built from the aggregates, identical to pipeline.build_top_learner_list
+        """
+        counts = self.counts
+        eligible = self.eligible_emails()
+        if eligible:
+            counts = counts[counts.index.isin(eligible)]
+
+        names = representative_names(self.name_counts) if self.has_name else pd.Series(dtype=object)
+        ordered = self.courses.sort_values('seq', kind='stable')
+        courses = join_labels(ordered['Email'], ordered['label'])
+        return assemble_top_learner_list(counts, names, courses)
+
+
+def _combine(current, update, how):
+    """
+    Merge per-key partial aggregates (sum or max) from a new chunk into the running ones
+    """
+    if current.empty:
+        return update
+    combined = pd.concat([current, update])
+    grouped = combined.groupby(level=list(range(combined.index.nlevels)), sort=False)
+    return grouped.sum() if how == 'sum' else grouped.max()
+
+
+def stream_usage_report(source, chunksize=DEFAULT_CHUNKSIZE, table_sink=None, progress=None):
+    """
+    Process a usage report (or a list of them, one after the other) chunk by chunk.
+    Returns a dict with the AI Essentials certificate 'count', the count of every usage
+    certificate type ('counts'), the number of 'rows' read, the LearnerAggregator
+    holding the Table 1 aggregates and the completions 'cube' (summed over the chunks). table_sink, if given, is called with each chunk's
+    Table 1 rows (e.g. to append them to a file); progress, if given, with the fraction
+    of files done and the rows read so far after each chunk.
+    """
+    aggregator = LearnerAggregator()
+    counts = certificate_counts(None, USAGE)
+    cube = build_cube(None, USAGE)
+    rows = 0
+    sources = source if isinstance(source, list) else [source]
+    for done, report in enumerate(sources):
+        for chunk in iter_report_chunks(report, USAGE_REPORT_COLUMNS, chunksize):
+            rows += len(chunk)
+            for name, count in certificate_counts(chunk, USAGE).items():
+                counts[name] += count
+            cube = combine_cubes([cube, build_cube(chunk, USAGE)])
+            table1 = build_usage_table(chunk)
+            if table1 is not None:
+                aggregator.update(table1)
+                if table_sink is not None:
+                    table_sink(table1)
+            if progress is not None:
+                progress(done / len(sources), f"{rows:,} rows read")
+    return {
+        "count": counts.get(AI_ESSENTIALS, 0), "counts": counts, "rows": rows, "aggregator": aggregator, "cube": cube,
+    }
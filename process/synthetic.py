@@ -0,0 +1,186 @@
+"""
+Synthetic GCC report generator for benchmarks and tests.
+
+Produces usage and specialization CSVs with the real export column layout,
+a configurable number of rows, share of rows belonging to repeat learners
+(with case/whitespace variants of their email) and share of timestamps
+written with a non-UTC offset.
+
+    python -m process.synthetic --rows 1000000 --output data/
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Full column layout of a GCC usage report export
+USAGE_REPORT_LAYOUT = [
+    "Name", "Email", "External Id", "Course", "Course ID", "Course Slug", "University", "Enrollment Time",
+    "Class Start Time", "Class End Time", "Last Course Activity Time", "Overall Progress", "Estimated Learning Hours",
+    "Completed", "Removed From Program", "Program Slug", "Program Name", "Enrollment Source", "Completion Time",
+    "Course Grade", "Course Certificate URL", "Course Type", "Job Title", "Job Type", "Business Unit",
+    "Business Unit 2", "Location City",
+]
+
+# Column layout of a GCC specialization report export
+SPECIALIZATION_REPORT_LAYOUT = [
+    "Name", "Email", "External Id", "Specialization", "Specialization Slug", "University", "Enrollment Time",
+    "Completed", "Removed From Program", "Program Slug", "Program Name", "Enrollment Source",
+    "Specialization Completion Time", "Specialization Certificate URL", "Job Title", "Job Type", "Business Unit",
+    "Business Unit 2", "Location City",
+]
+
+COURSES = [
+    "Google AI Essentials",
+    "Foundations of Digital Marketing and E-commerce",
+    "Foundations of Cybersecurity",
+    "Foundations: Data, Data, Everywhere",
+    "Foundations of Project Management",
+    "Satisfaction Guaranteed: Develop Customer Loyalty Online",
+]
+
+SPECIALIZATIONS = [
+    "Google Data Analytics",
+    "Google Project Management",
+    "Google Cybersecurity",
+    "Google UX Design",
+    "Google Digital Marketing & E-commerce",
+    "Google IT Support",
+]
+
+FAMILY_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Vũ", "Đặng", "Bùi", "Smith", "Johnson"]
+GIVEN_NAMES = ["Văn An", "Thị Minh Thư", "Trang Nhung", "Quốc Huy", "Thu Hà", "Đức Minh", "John", "Jane", "Mike"]
+PROGRAMS = ["Google x NIC x HUFLIT", "Google AI Program 2025", "Archived_Không sử dụng", "Google Career Certificates"]
+CITIES = ["Hà Nội", "TP.HCM", "Đà Nẵng", "Cần Thơ", "San Francisco", "New York"]
+
+# Offsets used for the non-UTC share of timestamps
+TIMEZONE_OFFSETS = ["+07:00", "-05:00", "+09:00", "+05:30"]
+
+# Filler for export columns the pipeline never reads
+FILLER = "unused-gcc-export-field-value"
+
+
+def _learners(rows, duplicate_ratio, rng):
+    """
+    Learner index per row: about rows * (1 - duplicate_ratio) distinct learners
+    """
+    distinct = max(1, int(round(rows * (1 - duplicate_ratio))))
+    learner = np.arange(rows) % distinct
+    rng.shuffle(learner)
+    return learner
+
+
+def _emails(learner, rng):
+    """
+    Emails per learner; repeat rows sometimes carry case or whitespace variants
+    """
+    emails = pd.Series(learner).astype(str).radd("learner").add("@example.edu.vn")
+    variant = rng.random(len(learner))
+    emails = emails.where(variant >= 0.05, emails.str.upper())
+    emails = emails.where((variant < 0.05) | (variant >= 0.08), " " + emails + " ")
+    return emails
+
+
+def _names(learner):
+    family = np.array(FAMILY_NAMES, dtype=object)[learner % len(FAMILY_NAMES)]
+    given = np.array(GIVEN_NAMES, dtype=object)[(learner // len(FAMILY_NAMES)) % len(GIVEN_NAMES)]
+    return family + " " + given
+
+
+def _timestamps(times, timezone_mix, rng):
+    """
+    Format UTC timestamps like the GCC export ('...000Z'); a timezone_mix share of
+    them is written as the same instant with a non-UTC offset
+    """
+    wall = times.tz_localize(None).to_numpy()
+    text = pd.Series(np.char.add(np.datetime_as_string(wall, unit="ms"), "Z"), dtype=object)
+    offset_choice = np.where(rng.random(len(times)) < timezone_mix, rng.integers(0, len(TIMEZONE_OFFSETS), len(times)), -1)
+    for i, offset in enumerate(TIMEZONE_OFFSETS):
+        shifted = offset_choice == i
+        if shifted.any():
+            # Same instant written as local wall time plus offset
+            local = wall[shifted] + pd.Timedelta(offset.replace(":", "h") + "m").to_timedelta64()
+            text[shifted] = np.char.add(np.datetime_as_string(local, unit="ms"), offset)
+    return text
+
+
+def _common_columns(rows, duplicate_ratio, timezone_mix, rng):
+    learner = _learners(rows, duplicate_ratio, rng)
+    enrolled = pd.Timestamp("2023-06-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 900 * 86400, rows), unit="s")
+    completion = enrolled + pd.to_timedelta(rng.integers(86400, 180 * 86400, rows), unit="s")
+    completed = rng.random(rows) < 0.45
+    return {
+        "Name": _names(learner),
+        "Email": _emails(learner, rng),
+        "External Id": learner,
+        "University": "Google",
+        "Enrollment Time": _timestamps(enrolled, timezone_mix, rng),
+        "Completed": np.where(completed, "Yes", "No"),
+        "completion": np.where(completed, _timestamps(completion, timezone_mix, rng), ""),
+        "Program Name": np.array(PROGRAMS, dtype=object)[learner % len(PROGRAMS)],
+        "Location City": np.array(CITIES, dtype=object)[learner % len(CITIES)],
+    }
+
+
+def generate_usage_report(rows, duplicate_ratio=0.8, timezone_mix=0.0, seed=0):
+    """
+    Synthetic usage report DataFrame with the full export layout (all values as text)
+    """
+    rng = np.random.default_rng(seed)
+    common = _common_columns(rows, duplicate_ratio, timezone_mix, rng)
+    df = pd.DataFrame({column: FILLER for column in USAGE_REPORT_LAYOUT}, index=range(rows))
+    for column, values in common.items():
+        if column in df.columns:
+            df[column] = values
+    df["Course"] = np.array(COURSES, dtype=object)[rng.integers(0, len(COURSES), rows)]
+    df["Completion Time"] = common["completion"]
+    df["Overall Progress"] = np.where(df["Completed"] == "Yes", 100.0, np.round(rng.random(rows) * 100, 2))
+    return df
+
+
+def generate_specialization_report(rows, duplicate_ratio=0.8, timezone_mix=0.0, seed=1):
+    """
+    Synthetic specialization report DataFrame with the export layout (all values as text)
+    """
+    rng = np.random.default_rng(seed)
+    common = _common_columns(rows, duplicate_ratio, timezone_mix, rng)
+    df = pd.DataFrame({column: FILLER for column in SPECIALIZATION_REPORT_LAYOUT}, index=range(rows))
+    for column, values in common.items():
+        if column in df.columns:
+            df[column] = values
+    df["Specialization"] = np.array(SPECIALIZATIONS, dtype=object)[rng.integers(0, len(SPECIALIZATIONS), rows)]
+    df["Specialization Completion Time"] = common["completion"]
+    return df
+
+
+def write_reports(output_dir, rows, spec_rows=None, duplicate_ratio=0.8, timezone_mix=0.0, seed=0):
+    """
+    Write usage.csv and specialization.csv into output_dir and return their paths
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    spec_rows = max(1, rows // 10) if spec_rows is None else spec_rows
+    usage_path = output_dir / "usage.csv"
+    spec_path = output_dir / "specialization.csv"
+    generate_usage_report(rows, duplicate_ratio, timezone_mix, seed).to_csv(usage_path, index=False)
+    generate_specialization_report(spec_rows, duplicate_ratio, timezone_mix, seed + 1).to_csv(spec_path, index=False)
+    return usage_path, spec_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic GCC usage and specialization reports.")
+    parser.add_argument("--rows", type=int, default=100_000, help="Usage report rows")
+    parser.add_argument("--spec-rows", type=int, help="Specialization report rows (default: rows / 10)")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.8, help="Share of rows belonging to repeat learners")
+    parser.add_argument("--timezone-mix", type=float, default=0.0, help="Share of timestamps with a non-UTC offset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", type=Path, default=Path("."), help="Output directory")
+    args = parser.parse_args(argv)
+    for path in write_reports(args.output, args.rows, args.spec_rows, args.duplicate_ratio, args.timezone_mix, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
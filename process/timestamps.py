@@ -0,0 +1,70 @@
+"""
+Shared timestamp normalization.
+
+Every time column is converted to UTC datetime64 exactly once, when a report
+is loaded. Downstream filters, cutoff comparisons and the Course/Specs label
+builder call to_utc(), which passes already-normalized columns straight
+through instead of re-parsing them.
+"""
+
+import pandas as pd
+
+# Layout of the timestamps in GCC exports, e.g. 2025-01-15T10:30:00.000Z
+GCC_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%S.%f%z'
+
+TIME_COLUMNS = ['Enrollment Time', 'Completion Time', 'Specialization Completion Time']
+
+# Marker stored in DataFrame.attrs once a frame's time columns are normalized
+NORMALIZED_ATTR = 'utc_timestamps'
+
+
+def to_utc(values):
+    """
+    Return values as a UTC datetime64 Series.
+    Already-normalized columns are returned as-is; strings take the exact GCC
+    format fast path and fall back to ISO 8601 inference (invalid values -> NaT).
+    """
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    dtype = values.dtype
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        return values if str(dtype.tz) == 'UTC' else values.dt.tz_convert('UTC')
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return values.dt.tz_localize('UTC')
+    try:
+        return pd.to_datetime(values, format=GCC_TIMESTAMP_FORMAT, utc=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(values, format='ISO8601', errors='coerce', utc=True)
+
+
+def normalize_timestamps(df, columns=TIME_COLUMNS):
+    """
+    Convert the time columns of df to UTC datetime64 in place and mark the frame
+    """
+    if df.attrs.get(NORMALIZED_ATTR):
+        return df
+    for column in columns:
+        if column in df.columns:
+            df[column] = to_utc(df[column])
+    df.attrs[NORMALIZED_ATTR] = True
+    return df
+
+
+def day_codes(times, date_format='%d/%m/%Y'):
+    """
+    (codes, labels) of the UTC calendar days of timestamps: each row's code indexes
+    its formatted day in labels, -1 for missing values
+    """
+    codes, days = pd.factorize(to_utc(times).dt.floor('D'))
+    return codes, pd.DatetimeIndex(days).strftime(date_format).to_numpy(dtype=object)
+
+
+def format_dates(times, date_format='%d/%m/%Y'):
+    """
+    Format UTC timestamps as date strings ('' for missing values).
+    Each distinct day is formatted once instead of once per row.
+    """
+    codes, labels = day_codes(times, date_format)
+    if len(labels) == 0:
+        return pd.Series('', index=times.index, dtype=object)
+    formatted = pd.Series(labels[codes], index=times.index, dtype=object)
+    return formatted.where(codes >= 0, '')
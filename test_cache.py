@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the parsed-upload cache
+"""
+
+import io
+
+from process.cache import LRUCache, content_hash, estimate_size
+
+
+def test_evicts_least_recently_used_by_entry_count():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+
+    assert "a" not in cache
+    assert cache.get("b") == 2 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_evicts_least_recently_used_by_bytes():
+    value = b"x" * 1000
+    size = estimate_size(value)
+    cache = LRUCache(max_bytes=2 * size)
+    cache.put("a", value)
+    cache.put("b", value)
+    cache.put("c", value)
+
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.total_bytes == 2 * size
+
+
+def test_get_marks_entries_as_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "a" in cache and "b" not in cache and "c" in cache
+
+
+def test_values_larger_than_max_bytes_are_not_cached():
+    small, large = b"x" * 10, b"x" * 1000
+    cache = LRUCache(max_bytes=estimate_size(small) * 2)
+    cache.put("small", small)
+    cache.put("large", large)
+
+    assert "large" not in cache
+    assert cache.get("small") == small
+    assert cache.total_bytes == estimate_size(small)
+
+    # Replacing a cached value with one that cannot fit drops the old value
+    cache.put("small", large)
+    assert "small" not in cache and cache.total_bytes == 0
+
+
+def test_content_hash_rewinds_file_objects():
+    data = b"Name,Email\nAnn,ann@x.com\n" * 100000
+    file = io.BufferedReader(io.BytesIO(data))
+    file.read(5)
+
+    digest = content_hash(file)
+
+    assert file.tell() == 5
+    assert digest == content_hash(data[5:])
+    assert content_hash(io.BytesIO(data)) == content_hash(data)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the Arrow/Parquet frame cache and columnar uploads
+"""
+
+import io
+import json
+import os
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from process import cli
+from process.columnar import cached_report, frame_bytes, read_columnar_report
+from process.ingest import SPECIALIZATION_REPORT_COLUMNS, USAGE_REPORT_COLUMNS
+from process.pipeline import analyze
+from process.timestamps import NORMALIZED_ATTR
+from test_pipeline import SPEC_CSV, USAGE_CSV, load_samples
+
+
+def test_cached_report_roundtrip(tmp_path):
+    usage_df, _ = load_samples()
+    calls = []
+
+    def read():
+        calls.append(1)
+        return usage_df
+
+    first = cached_report('usage_report', 'abc', read, cache_dir=tmp_path)
+    second = cached_report('usage_report', 'abc', read, cache_dir=tmp_path)
+
+    assert len(calls) == 1
+    assert first is usage_df
+    assert second.attrs[NORMALIZED_ATTR]
+    pd.testing.assert_frame_equal(second, usage_df)
+
+
+def test_cached_report_prunes_least_recently_used(tmp_path):
+    usage_df, _ = load_samples()
+    for i, key in enumerate(['a', 'b']):
+        cached_report('usage_report', key, lambda: usage_df, cache_dir=tmp_path, max_files=2)
+        # Distinct write times, oldest first
+        os.utime(tmp_path / f'usage_report-{key}.arrow', (1_000_000 + i, 1_000_000 + i))
+
+    # Reading 'a' makes 'b' the least recently used file
+    cached_report('usage_report', 'a', lambda: None, cache_dir=tmp_path, max_files=2)
+    cached_report('usage_report', 'c', lambda: usage_df, cache_dir=tmp_path, max_files=2)
+
+    assert sorted(p.name for p in tmp_path.glob('*.arrow')) == ['usage_report-a.arrow', 'usage_report-c.arrow']
+
+
+def test_cached_report_recovers_from_corrupt_file(tmp_path):
+    usage_df, _ = load_samples()
+    (tmp_path / 'usage_report-abc.arrow').write_bytes(b'not an arrow file')
+
+    df = cached_report('usage_report', 'abc', lambda: usage_df, cache_dir=tmp_path)
+
+    assert df is usage_df
+    pd.testing.assert_frame_equal(cached_report('usage_report', 'abc', lambda: None, cache_dir=tmp_path), usage_df)
+
+
+def test_columnar_uploads_match_csv(tmp_path):
+    usage_df, spec_df = load_samples()
+    expected = analyze(usage_df, spec_df)
+
+    # A Streamlit upload of the downloaded Arrow frame, and a raw-text Parquet export
+    upload = io.BytesIO(frame_bytes(usage_df))
+    upload.name = 'usage_report.arrow'
+    parquet_path = tmp_path / 'spec.parquet'
+    pd.read_csv(io.StringIO(SPEC_CSV)).to_parquet(parquet_path)
+
+    result = analyze(
+        read_columnar_report(upload, USAGE_REPORT_COLUMNS),
+        read_columnar_report(parquet_path, SPECIALIZATION_REPORT_COLUMNS),
+    )
+
+    pd.testing.assert_frame_equal(result["table3"], expected["table3"])
+    pd.testing.assert_frame_equal(result["table4"], expected["table4"])
+
+
+def test_cli_reads_arrow_input(tmp_path):
+    usage_df, _ = load_samples()
+    usage_path = tmp_path / "usage.arrow"
+    usage_path.write_bytes(frame_bytes(usage_df))
+    spec_path = tmp_path / "spec.csv"
+    spec_path.write_text(SPEC_CSV, encoding="utf-8")
+    csv_path = tmp_path / "usage.csv"
+    csv_path.write_text(USAGE_CSV, encoding="utf-8")
+
+    assert cli.main(["--usage", str(usage_path), "--spec", str(spec_path), "-o", str(tmp_path / "arrow")]) == 0
+    assert cli.main(["--usage", str(csv_path), "--spec", str(spec_path), "-o", str(tmp_path / "csv")]) == 0
+
+    for name in ["metrics.json", "table3.csv", "table4.csv"]:
+        assert (tmp_path / "arrow" / name).read_text(encoding="utf-8") == (tmp_path / "csv" / name).read_text(encoding="utf-8")
+    assert json.loads((tmp_path / "arrow" / "metrics.json").read_text(encoding="utf-8"))["ai_essentials_certificates"] == 1
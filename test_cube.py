@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-aggregated completions cube
+"""
+
+import io
+
+import pandas as pd
+
+from process.cube import CUBE_DIMENSIONS, build_cube, combine_cubes, rollup, slice_cube
+from process.rules import SPECIALIZATION, USAGE
+from process.streaming import stream_usage_report
+from test_pipeline import USAGE_CSV, load_samples
+
+
+def sorted_cells(cube):
+    cells = cube.astype({d: object for d in CUBE_DIMENSIONS if d != 'Month'})
+    return cells.sort_values(CUBE_DIMENSIONS, na_position='first').reset_index(drop=True)
+
+
+def sample_cube():
+    usage_df, spec_df = load_samples()
+    return combine_cubes([build_cube(usage_df, USAGE), build_cube(spec_df, SPECIALIZATION)])
+
+
+def test_cube_counts_completions_per_cell():
+    cube = sample_cube()
+
+    # Completed rows with a completion time: three usage rows and three specialization rows
+    assert cube['Completions'].sum() == 6
+    assert rollup(cube, 'Report').to_dict() == {USAGE: 3, SPECIALIZATION: 3}
+    by_month = rollup(cube, 'Month')
+    assert by_month[pd.Timestamp('2025-02-01')] == 1 and by_month[pd.Timestamp('2024-11-01')] == 1
+    # The specialization sample has no Location City column: its cells are blank there
+    assert rollup(cube, ['Report', 'Location City'])[SPECIALIZATION].index.isna().all()
+
+
+def test_cube_slices_answer_filters():
+    cube = sample_cube()
+
+    selected = slice_cube(cube, {'Report': [SPECIALIZATION], 'Course/Specs': [], 'University': ['Google']})
+
+    assert rollup(selected, 'Course/Specs').to_dict() == {
+        'Google Data Analytics': 1, 'Google Project Management': 1, 'Google UX Design': 1,
+    }
+
+
+def test_cubes_are_additive_across_chunks():
+    usage_df, _ = load_samples()
+    whole = build_cube(usage_df, USAGE)
+
+    parts = combine_cubes([build_cube(usage_df.iloc[i:i + 1], USAGE) for i in range(len(usage_df))])
+    streamed = stream_usage_report(io.StringIO(USAGE_CSV), chunksize=1)["cube"]
+
+    pd.testing.assert_frame_equal(sorted_cells(parts), sorted_cells(whole))
+    pd.testing.assert_frame_equal(sorted_cells(streamed), sorted_cells(whole))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunked table exports
+"""
+
+import io
+import zipfile
+
+import pandas as pd
+import pytest
+
+from process.export import export_csv, export_parquet, export_xlsx
+from process.pipeline import analyze
+from process.timestamps import to_utc
+from test_pipeline import load_samples
+
+
+def sample_tables():
+    result = analyze(*load_samples())
+    return result["table3"], result["table4"]
+
+
+def test_csv_export_is_chunked_and_round_trips():
+    table3, table4 = sample_tables()
+
+    data = export_csv(table3, chunksize=2)
+
+    assert data == export_csv(table3)
+    assert data.decode('utf-8').splitlines()[1].endswith(",2025-02-15T14:30:00.000Z")
+    back = pd.read_csv(io.BytesIO(data))
+    assert back["Course/Specs"].tolist() == table3["Course/Specs"].tolist()
+    pd.testing.assert_series_equal(to_utc(back["Completion Time"]), table3["Completion Time"], check_dtype=False)
+    # Multi-line cells stay one record
+    assert pd.read_csv(io.BytesIO(export_csv(table4))).equals(table4)
+
+
+def test_parquet_export_round_trips():
+    pytest.importorskip("pyarrow")
+    table3, _ = sample_tables()
+
+    back = pd.read_parquet(io.BytesIO(export_parquet(table3, chunksize=2)))
+
+    pd.testing.assert_frame_equal(back, table3, check_dtype=False)
+
+
+def test_xlsx_export_continues_on_further_sheets():
+    pytest.importorskip("xlsxwriter")
+    table3, _ = sample_tables()
+
+    # Header plus two rows per sheet: 5 rows need three sheets
+    workbook = zipfile.ZipFile(io.BytesIO(export_xlsx(table3, sheet_name="table3", chunksize=2, max_rows=3)))
+
+    sheets = [name for name in workbook.namelist() if name.startswith("xl/worksheets/sheet")]
+    assert len(sheets) == 3
+    assert 'name="table3 (3)"' in workbook.read("xl/workbook.xml").decode()
+    first = workbook.read("xl/worksheets/sheet1.xml").decode()
+    assert "<t>Course/Specs</t>" in first and "Google AI Essentials (15/02/2025)" in first
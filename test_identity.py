@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for fuzzy learner identity resolution
+"""
+
+import io
+
+import pandas as pd
+
+from process import identity
+from process.identity import name_keys, resolve_identities, spelled_from_name
+from process.pipeline import analyze, analyze_table3, read_specialization_report, read_usage_report
+from test_pipeline import USAGE_CSV
+
+# The John Doe of the usage report, with a personal email and an unaccented name variant
+PERSONAL_SPEC_CSV = """Name,Email,Specialization,University,Enrollment Time,Completed,Specialization Completion Time
+JOHN DOE,johndoe99@gmail.com,Google Data Analytics,Google,2025-01-10T08:00:00.000Z,Yes,2025-06-01T08:00:00.000Z
+Pham Thi Minh Thu,thu@gmail.com,Google UX Design,Google,2025-02-10T08:00:00.000Z,Yes,2025-07-01T08:00:00.000Z
+"""
+
+
+def test_name_keys_ignore_diacritics_case_and_word_order():
+    keys = name_keys(["Phạm Thị Minh Thư", "THU pham thi minh", "Đặng Đức-Minh", None])
+
+    assert keys.tolist() == ["minh pham thi thu", "minh pham thi thu", "dang duc minh", ""]
+    assert spelled_from_name("thupham", "minh pham thi thu")
+    assert spelled_from_name("ptmthu99", "minh pham thi thu")
+    # Initials alone are not enough
+    assert not spelled_from_name("ptmt", "minh pham thi thu")
+
+
+def test_resolve_identities_merges_blocked_matches():
+    table3 = pd.DataFrame({
+        "Name": ["Phạm Thị Minh Thư", "Pham Thi Minh Thu", "Pham Thi Minh Thu", "Nguyễn Văn An", "Nguyen Van An",
+                 "Tran Binh", "Tran Binh"],
+        "Email": ["thu.pham@school.edu.vn", "phamthu99@gmail.com", "phamthu99@gmail.com", "an.nguyen@hcmus.edu.vn",
+                  "an.nguyen@gmail.com", "binh@a.com", "tb2@b.com"],
+        "Course/Specs": list("abcdefg"),
+    })
+
+    resolved, aliases = resolve_identities(table3)
+
+    assert aliases.to_dict() == {
+        "thu.pham@school.edu.vn": "phamthu99@gmail.com",
+        # Tied row counts: the smallest email is kept
+        "an.nguyen@hcmus.edu.vn": "an.nguyen@gmail.com",
+    }
+    assert resolved["Email"].nunique() == 4
+    assert resolved["Course/Specs"].tolist() == table3["Course/Specs"].tolist()
+
+
+def test_student_ids_at_one_school_are_different_learners():
+    ids = ["hat22080256", "hat22080257", "hat22080258", "hat22080268", "hat22080368", "hat22081368"]
+    table3 = pd.DataFrame({
+        "Name": ["Nguyễn Văn An"] * len(ids),
+        "Email": [f"{i}@hsb.edu.vn" for i in ids],
+        "Completion Time": pd.Timestamp("2025-03-01", tz="UTC"),
+    })
+
+    resolved, aliases = resolve_identities(table3)
+
+    assert aliases.empty
+    assert resolved["Email"].nunique() == len(ids)
+    assert analyze_table3(table3, merge_identities=True)["unique_2025_learners"] == len(ids)
+
+
+def test_matches_are_not_chained():
+    # b matches both a and c, but a and c (same school) do not match each other
+    table3 = pd.DataFrame({
+        "Name": ["Le Thi Hoa"] * 4,
+        "Email": ["hoa.le@school.edu.vn", "hoa.le@school.edu.vn", "lehoa@gmail.com", "hoale2@school.edu.vn"],
+    })
+
+    _, aliases = resolve_identities(table3)
+
+    # The Gmail address joins the most frequent email; the second school address stays apart
+    assert aliases.to_dict() == {"lehoa@gmail.com": "hoa.le@school.edu.vn"}
+
+
+def test_oversized_blocks_are_not_compared(monkeypatch):
+    table3 = pd.DataFrame({"Name": ["An Le", "An Le", "An Le"], "Email": ["anle@a.vn", "anle@b.vn", "le.an@c.vn"]})
+    monkeypatch.setattr(identity, "MAX_BLOCK_SIZE", 2)
+
+    _, aliases = resolve_identities(table3)
+
+    # The name block (3 learners) is skipped; the local-part block 'anle' is still compared
+    assert aliases.to_dict() == {"anle@b.vn": "anle@a.vn"}
+
+
+def test_analyze_counts_merged_learners_once():
+    usage_df = read_usage_report(io.StringIO(USAGE_CSV))
+    spec_df = read_specialization_report(io.StringIO(PERSONAL_SPEC_CSV))
+
+    plain = analyze(usage_df, spec_df)
+    merged = analyze(usage_df, spec_df, merge_identities=True)
+
+    assert plain["unique_2025_learners"] == 3
+    assert merged["unique_2025_learners"] == 2
+    assert merged["aliases"].to_dict() == {"johndoe99@gmail.com": "john.doe@example.com"}
+    top = merged["table4"].iloc[0]
+    assert (top["Email"], top["Total course/spec number"]) == ("john.doe@example.com", 2)
+    # Table 3 keeps the emails as reported
+    assert merged["table3"]["Email"].tolist() == plain["table3"]["Email"].tolist()
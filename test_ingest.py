@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the typed, column-pruned report ingestion
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from process.ingest import CSV_ENGINE, USAGE_REPORT_COLUMNS, read_report
+from process.timestamps import to_utc
+
+# UTF-8 BOM, columns the pipeline never reads, quoted fields with commas and line
+# breaks, padded and mixed-case emails and a missing completion time
+USAGE_EXPORT = (
+    "\ufeffName,Email,User ID,Course,University,Notes,Enrollment Time,Completed,Program Name,"
+    "Completion Time,Location City\n"
+    'John Doe, John.Doe@Example.com ,1,Google AI Essentials,"Google, Inc.","first line\nsecond line",'
+    "2025-01-15T10:30:00.000Z,Yes,Google AI Program 2025,2025-02-15T14:30:00.000Z,San Francisco\n"
+    '"Smith,\nJane",jane.smith@example.com,2,Google AI Essentials,Google,,2024-12-20T09:15:00.000Z,Yes,'
+    "Google AI Program 2025,2024-12-28T16:45:00.000Z,New York\n"
+    "Mike Johnson,MIKE.J@example.com,3,Foundations of Digital Marketing and E-commerce,Google,note,"
+    '2025-03-01T11:20:00.000Z,No,"Google x NIC x HUFLIT",,"Ho Chi Minh\nCity"\n'
+).encode("utf-8")
+
+
+def baseline(data):
+    # The reader the pipeline used before the ingestion layer
+    df = pd.read_csv(io.BytesIO(data), encoding="utf-8")
+    df["Email"] = df["Email"].astype(str).str.strip().str.lower()
+    return df
+
+
+@pytest.mark.parametrize("engine", sorted({"c", CSV_ENGINE}))
+def test_typed_read_matches_baseline(engine):
+    df = read_report(io.BytesIO(USAGE_EXPORT), USAGE_REPORT_COLUMNS, engine)
+    expected = baseline(USAGE_EXPORT)
+
+    # Only the pipeline's columns, in canonical order
+    assert df.columns.tolist() == USAGE_REPORT_COLUMNS
+    assert "User ID" not in df.columns and "Notes" not in df.columns
+
+    for column in ("Course", "Program Name", "University", "Location City"):
+        assert isinstance(df[column].dtype, pd.CategoricalDtype)
+        assert df[column].astype(object).tolist() == expected[column].tolist()
+    assert df["Completed"].dtype == bool
+    assert df["Completed"].tolist() == (expected["Completed"] == "Yes").tolist()
+    for column in ("Name", "Email"):
+        assert df[column].dtype == object
+        assert df[column].tolist() == expected[column].tolist()
+    for column in ("Enrollment Time", "Completion Time"):
+        pd.testing.assert_series_equal(df[column], to_utc(expected[column]))
+
+    assert df["Name"].iat[1] == "Smith,\nJane"
+    assert df["Email"].tolist() == ["john.doe@example.com", "jane.smith@example.com", "mike.j@example.com"]
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for background jobs and their progress reporting
+"""
+
+import threading
+
+import pytest
+
+from process.ai_essential import load_gcc_usage_report
+from process.cache import parsed_cache
+from process.jobs import Job, JobCancelled
+from process.parallel import USAGE_REPORT, read_reports
+from process.streaming import stream_usage_report
+from process.synthetic import write_reports
+from test_parallel import split_csv
+from test_pipeline import USAGE_CSV
+
+
+def test_jobs_run_concurrently():
+    # Each job only finishes once the other one has started
+    barrier = threading.Barrier(2, timeout=5)
+
+    def work(name, progress):
+        progress(0.5, "waiting")
+        barrier.wait()
+        return name
+
+    jobs = [Job(name, work, name) for name in ("usage", "spec")]
+
+    assert [job.result(timeout=5) for job in jobs] == ["usage", "spec"]
+    assert all(job.fraction == 0.5 and job.message == "waiting" for job in jobs)
+
+
+def test_cancelled_job_stops_at_next_progress_report():
+    started = threading.Event()
+    release = threading.Event()
+    steps = []
+
+    def work(progress):
+        progress(0.0, "started")
+        started.set()
+        release.wait(5)
+        for i in range(3):
+            progress(i / 3)
+            steps.append(i)
+
+    job = Job("key", work)
+    assert started.wait(5)
+    job.cancel()
+    release.set()
+
+    with pytest.raises(JobCancelled):
+        job.result(timeout=5)
+    assert job.cancelled
+    assert steps == []
+
+
+def test_readers_report_progress(tmp_path):
+    paths = split_csv(USAGE_CSV, tmp_path, "usage")
+    parsed_cache.clear()
+    reported = []
+
+    report = read_reports(USAGE_REPORT, paths, use_disk_cache=False, parallel=False,
+                          progress=lambda fraction, message: reported.append((fraction, message)))
+
+    # Each file reports while it is read and once it is parsed
+    assert reported[0] == (0.0, "Parsing 2 of 2 files")
+    assert [fraction for fraction, message in reported if message.startswith("Parsed")] == [0.5, 1.0]
+    assert {message for _, message in reported[1:]} == {f"{verb} {path}" for verb in ("Parsing", "Parsed") for path in paths}
+    assert [fraction for fraction, _ in reported] == sorted(fraction for fraction, _ in reported)
+    assert reported[-1][1] == f"Parsed {paths[1]}"
+    assert len(report["df"]) == 4
+
+    streamed = []
+    stream_usage_report([str(p) for p in paths], chunksize=1, progress=lambda *args: streamed.append(args))
+    assert streamed[-1] == (0.5, "4 rows read")
+
+
+def test_cancelled_read_keeps_parsed_files(tmp_path):
+    paths = split_csv(USAGE_CSV, tmp_path, "usage")
+    parsed_cache.clear()
+
+    def cancel_after_first_file(fraction, message):
+        if message.startswith("Parsed"):
+            raise JobCancelled()
+
+    with pytest.raises(JobCancelled):
+        read_reports(USAGE_REPORT, paths, use_disk_cache=False, parallel=False, progress=cancel_after_first_file)
+
+    # Only the second file is parsed again
+    reported = []
+    read_reports(USAGE_REPORT, paths, use_disk_cache=False, parallel=False,
+                 progress=lambda fraction, message: reported.append((fraction, message)))
+    assert reported[0] == (0.5, "Parsing 1 of 2 files")
+    assert {message for _, message in reported[1:]} == {f"Parsing {paths[1]}", f"Parsed {paths[1]}"}
+
+
+def test_one_file_job_is_cancelled_while_it_is_read(tmp_path):
+    usage_path, _ = write_reports(tmp_path, 30_000, 10, 0.8, 0.3)
+    parsed_cache.clear()
+    fractions = []
+    jobs = []
+    submitted = threading.Event()
+
+    def read_and_cancel(progress):
+        submitted.wait(5)
+
+        def report(fraction, message=None):
+            progress(fraction, message)
+            fractions.append(fraction)
+            # Cancelled partway through the only file
+            if 0 < fraction < 1:
+                jobs[0].cancel()
+        return read_reports(USAGE_REPORT, [usage_path], use_disk_cache=False, progress=report)
+
+    jobs.append(Job("key", read_and_cancel))
+    submitted.set()
+
+    with pytest.raises(JobCancelled):
+        jobs[0].result(timeout=30)
+    assert fractions[0] == 0.0 and 0 < fractions[-1] < 1
+    assert len(parsed_cache) == 0
+
+
+def test_job_stages_record_memory_peaks_when_tracing(tmp_path):
+    paths = split_csv(USAGE_CSV, tmp_path, "usage")
+    parsed_cache.clear()
+
+    traced = Job("traced", load_gcc_usage_report, paths, trace_memory=True)
+    traced.result(timeout=30)
+    untraced = Job("untraced", load_gcc_usage_report, paths)
+    untraced.result(timeout=30)
+
+    assert [record["stage"] for record in traced.profiler.records] == ["read_usage"]
+    assert all(record["peak_bytes"] > 0 for record in traced.profiler.records)
+    assert not any("peak_bytes" in record for record in untraced.profiler.records)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the lazy Polars engine against the pandas reference pipeline
+"""
+
+import pandas as pd
+import pytest
+
+from process import cli
+from process.cube import CUBE_DIMENSIONS, build_cube, combine_cubes
+from process.parallel import SPECIALIZATION_REPORT, USAGE_REPORT
+from process.pipeline import analyze, certificate_counts
+from process.rules import SPECIALIZATION, USAGE
+from process.synthetic import write_reports
+from test_pipeline import SPEC_CSV, USAGE_CSV
+
+pytest.importorskip("polars")
+
+from process.lazy import analyze_csv  # noqa: E402
+
+# Missing emails and names, a Z-less offset, an ISO date without a time, an unparsable
+# time and a learner whose only completion is before the cutoff
+EXTRA_USAGE_CSV = """Name,Email,Course,Enrollment Time,Completed,Completion Time,Program Name
+,,Google AI Essentials,2025-01-15T10:30:00.000Z,Yes,2025-02-15T14:30:00.000Z,P1
+Ann Lee, ANN@x.com,Google AI Essentials,2025-01-15T10:30:00.000+07:00,Yes,2025-03-01T01:00:00.000+07:00,P1
+Ann Lee,ann@x.com,Google AI Essentials,2025-01-15,Yes,2025-04-01,P2
+Old Timer,old@x.com,Google AI Essentials,2024-01-15T10:30:00.000Z,Yes,2024-02-15T14:30:00.000Z,
+Bad Time,bad@x.com,Google AI Essentials,2025-01-15T10:30:00.000Z,Yes,not a time,P1
+"""
+
+
+def reference(usage_paths, spec_paths):
+    usage_df = cli.read_input(usage_paths, USAGE_REPORT)
+    spec_df = cli.read_input(spec_paths, SPECIALIZATION_REPORT)
+    result = analyze(usage_df, spec_df)
+    result["counts"] = {**certificate_counts(usage_df, USAGE), **certificate_counts(spec_df, SPECIALIZATION)}
+    result["cube"] = combine_cubes([build_cube(usage_df, USAGE), build_cube(spec_df, SPECIALIZATION)])
+    return result
+
+
+def cube_cells(cube):
+    # Dimension values as plain strings, '' for missing ones
+    labels = [c for c in CUBE_DIMENSIONS if c != "Month"]
+    return cube.astype({c: object for c in labels}).fillna({c: "" for c in labels})
+
+
+def assert_same_analysis(expected, lazy):
+    assert lazy["counts"] == expected["counts"]
+    assert lazy["total_2025_certificates"] == expected["total_2025_certificates"]
+    assert lazy["unique_2025_learners"] == expected["unique_2025_learners"]
+    table3 = expected["table3"].astype({"Course/Specs": object})
+    pd.testing.assert_frame_equal(lazy["table3"], table3, check_dtype=False)
+    pd.testing.assert_frame_equal(lazy["table4"], expected["table4"], check_dtype=False)
+    pd.testing.assert_frame_equal(cube_cells(lazy["cube"]), cube_cells(expected["cube"]), check_dtype=False)
+
+
+def test_lazy_engine_matches_pandas_on_samples(tmp_path):
+    paths = {}
+    for name, text in [("usage", USAGE_CSV), ("extra", EXTRA_USAGE_CSV), ("spec", SPEC_CSV)]:
+        paths[name] = tmp_path / f"{name}.csv"
+        paths[name].write_text(text, encoding="utf-8")
+    # Two usage files with different columns
+    usage_paths = [paths["usage"], paths["extra"]]
+
+    assert_same_analysis(reference(usage_paths, [paths["spec"]]), analyze_csv(usage_paths, [paths["spec"]]))
+    assert_same_analysis(reference([paths["extra"]], None), analyze_csv([paths["extra"]], None))
+
+
+def test_lazy_engine_matches_pandas_on_synthetic_reports(tmp_path):
+    usage_path, spec_path = write_reports(tmp_path, 3000, 300, 0.8, 0.3)
+
+    assert_same_analysis(reference([usage_path], [spec_path]), analyze_csv([usage_path], [spec_path]))
+
+
+def test_cli_engines_write_the_same_files(tmp_path):
+    usage_path, spec_path = write_reports(tmp_path, 500, 50, 0.8, 0.3)
+
+    for engine in ("pandas", "polars"):
+        args = ["--usage", str(usage_path), "--spec", str(spec_path), "-o", str(tmp_path / engine), "--engine", engine]
+        assert cli.main(args) == 0
+    for name in ("metrics.json", "table3.csv", "table4.csv", "cube.csv"):
+        assert (tmp_path / "polars" / name).read_bytes() == (tmp_path / "pandas" / name).read_bytes()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Memory regression test: peak traced memory of the pipeline on a synthetic large usage report
+"""
+
+import tracemalloc
+
+from process.pipeline import analyze, read_usage_report
+from process.synthetic import generate_usage_report
+
+ROWS = 100_000
+
+
+def traced_peak(fn):
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_pipeline_peak_memory(tmp_path):
+    path = tmp_path / "usage.csv"
+    generate_usage_report(ROWS).to_csv(path, index=False)
+    raw_bytes = path.stat().st_size
+
+    usage_df, read_peak = traced_peak(lambda: read_usage_report(path))
+    frame_bytes = usage_df.memory_usage(deep=True).sum()
+    # Column buffers only (pointers for strings): what a DataFrame copy duplicates
+    buffer_bytes = usage_df.memory_usage(deep=False).sum()
+    result, analyze_peak = traced_peak(lambda: analyze(usage_df, None))
+
+    assert result["table4"] is not None
+    # Only the used columns are loaded, so the frame is much smaller than the raw CSV
+    assert frame_bytes < raw_bytes / 2
+    assert read_peak < 1.5 * frame_bytes
+    # The analysis materializes its output tables only, never a copy of the input frame
+    assert analyze_peak < 2 * buffer_bytes
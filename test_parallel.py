@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-file reports and parallel parsing
+"""
+
+import io
+import json
+import threading
+
+import pandas as pd
+
+from process import cli, parallel
+from process.cache import LRUCache, parsed_cache
+from process.ingest import concat_reports
+from process.parallel import SPECIALIZATION_REPORT, USAGE_REPORT, read_reports
+from process.pipeline import analyze, read_usage_report
+from process.timestamps import NORMALIZED_ATTR
+from test_pipeline import SPEC_CSV, USAGE_CSV, load_samples
+
+
+def split_csv(text, tmp_path, stem):
+    """
+    Write the rows of a report CSV into two files with the same header
+    """
+    header, *rows = text.strip().split("\n")
+    paths = []
+    for i, part in enumerate([rows[:2], rows[2:]]):
+        path = tmp_path / f"{stem}_{i}.csv"
+        path.write_text("\n".join([header, *part]) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def test_concat_reports_keeps_categoricals():
+    first = read_usage_report(io.StringIO(USAGE_CSV))
+    second = first.iloc[3:].assign(Course=pd.Categorical(["Google Cybersecurity"]))
+
+    df = concat_reports([first, second])
+
+    assert isinstance(df["Course"].dtype, pd.CategoricalDtype)
+    assert df["Course"].tolist() == first["Course"].tolist() + ["Google Cybersecurity"]
+    assert df.attrs[NORMALIZED_ATTR]
+
+
+def test_read_reports_matches_single_file(tmp_path, monkeypatch):
+    usage_df, spec_df = load_samples()
+    expected = analyze(usage_df, spec_df)
+    usage_paths = split_csv(USAGE_CSV, tmp_path, "usage")
+    spec_paths = split_csv(SPEC_CSV, tmp_path, "spec")
+
+    sequential = analyze(
+        read_reports(USAGE_REPORT, usage_paths, use_disk_cache=False, parallel=False)["df"],
+        read_reports(SPECIALIZATION_REPORT, spec_paths, use_disk_cache=False, parallel=False)["df"],
+    )
+    pd.testing.assert_frame_equal(sequential["table4"], expected["table4"])
+    assert sequential["total_2025_certificates"] == expected["total_2025_certificates"]
+
+    # Same files through a two-worker pool, bypassing the cached results
+    parsed_cache.clear()
+    monkeypatch.setattr(parallel, "WORKERS", 2)
+    try:
+        result = read_reports(USAGE_REPORT, usage_paths, use_disk_cache=False)
+    finally:
+        parallel._reset_executor()
+    assert result["files"] == 2
+    assert len(result["filtered"]) == 1
+    pd.testing.assert_frame_equal(analyze(result["df"], spec_df)["table4"], expected["table4"])
+
+
+def test_get_or_compute_is_single_flight():
+    cache = LRUCache()
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        finish.wait()
+        return "value"
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute)))
+    owner.start()
+    started.wait()
+    waiters = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute))) for _ in range(3)]
+    for thread in waiters:
+        thread.start()
+    finish.set()
+    for thread in [owner, *waiters]:
+        thread.join()
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+
+
+def test_waiters_compute_when_the_owner_fails():
+    cache = LRUCache()
+    started, finish = threading.Event(), threading.Event()
+    errors, results = [], []
+
+    def failing():
+        started.set()
+        finish.wait()
+        raise ValueError("bad upload")
+
+    def owner():
+        try:
+            cache.get_or_compute("key", failing)
+        except ValueError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=owner)
+    first.start()
+    started.wait()
+    second = threading.Thread(target=lambda: results.append(cache.get_or_compute("key", lambda: "value")))
+    second.start()
+    finish.set()
+    for thread in (first, second):
+        thread.join()
+
+    assert len(errors) == 1 and results == ["value"]
+    assert cache.get("key") == "value"
+
+
+def test_concurrent_sessions_parse_each_file_once(tmp_path, monkeypatch):
+    usage_paths = split_csv(USAGE_CSV, tmp_path, "usage")
+    parsed = []
+    parse_report = parallel.parse_report
+
+    def counting_parse(kind, source, name, cache_key, use_disk_cache=True, progress=None):
+        parsed.append(name)
+        return parse_report(kind, source, name, cache_key, use_disk_cache, progress)
+
+    parsed_cache.clear()
+    monkeypatch.setattr(parallel, "parse_report", counting_parse)
+    results = []
+    sessions = [
+        threading.Thread(target=lambda: results.append(read_reports(USAGE_REPORT, usage_paths, use_disk_cache=False)))
+        for _ in range(4)
+    ]
+    for thread in sessions:
+        thread.start()
+    for thread in sessions:
+        thread.join()
+
+    assert sorted(parsed) == sorted(str(path) for path in usage_paths)
+    assert all(result["df"] is results[0]["df"] for result in results)
+
+
+def test_cli_accepts_several_files(tmp_path):
+    spec_path = tmp_path / "spec.csv"
+    spec_path.write_text(SPEC_CSV, encoding="utf-8")
+    usage_paths = [str(p) for p in split_csv(USAGE_CSV, tmp_path, "usage")]
+    out = tmp_path / "out"
+
+    assert cli.main(["--usage", *usage_paths, "--spec", str(spec_path), "-o", str(out)]) == 0
+
+    metrics = json.loads((out / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["ai_essentials_certificates"] == 1
+    assert metrics["total_2025_certificates"] == 3
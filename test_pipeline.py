@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Tests for the Streamlit-free pipeline core and the headless CLI
+"""
+
+import io
+import json
+import subprocess
+import sys
+import tracemalloc
+
+import pandas as pd
+
+from process import cli
+from process.cache import estimate_size
+from process.pipeline import (
+    analyze,
+    build_specialization_table,
+    certificate_counts,
+    build_top_learner_list,
+    read_specialization_report,
+    read_usage_report,
+)
+from process.profiling import Profiler
+from process.render import page_slice, search_rows
+from process.rules import USAGE
+from process.streaming import stream_usage_report
+from process.timestamps import NORMALIZED_ATTR, normalize_timestamps, to_utc
+
+USAGE_CSV = """Name,Email,Course,University,Enrollment Time,Completed,Program Name,Completion Time,Location City
+John Doe,John.Doe@Example.com ,Google AI Essentials,Google,2025-01-15T10:30:00.000Z,Yes,Google AI Program 2025,2025-02-15T14:30:00.000Z,San Francisco
+Jane Smith,jane.smith@example.com,Google AI Essentials,Google,2024-12-20T09:15:00.000Z,Yes,Google AI Program 2025,2024-12-28T16:45:00.000Z,New York
+Mike Johnson,mike.j@example.com,Google AI Essentials,Google,2025-03-01T11:20:00.000Z,No,Google AI Program 2025,,Seattle
+Phạm Thị Minh Thư,thu@gmail.com,Foundations of Digital Marketing and E-commerce,Google,2025-04-25T15:24:27.000Z,Yes,Google x NIC x HUFLIT,2025-05-12T15:08:27.000Z,TP.HCM
+"""
+
+SPEC_CSV = """Name,Email,Specialization,University,Enrollment Time,Completed,Specialization Completion Time
+John Doe,john.doe@example.com,Google Data Analytics,Google,2025-01-10T08:00:00.000Z,Yes,2025-06-01T08:00:00.000Z
+J. Doe,john.doe@example.com,Google Project Management,Google,2025-02-10T08:00:00.000Z,Yes,2025-07-01T08:00:00.000Z
+Jane Smith,jane.smith@example.com,Google UX Design,Google,2024-05-10T08:00:00.000Z,Yes,2024-11-01T08:00:00.000Z
+Mike Johnson,mike.j@example.com,Google Cybersecurity,Google,2025-02-10T08:00:00.000Z,No,
+"""
+
+
+def load_samples():
+    usage_df = read_usage_report(io.StringIO(USAGE_CSV))
+    spec_df = read_specialization_report(io.StringIO(SPEC_CSV))
+    return usage_df, spec_df
+
+
+def test_analyze_sample_reports():
+    usage_df, spec_df = load_samples()
+    result = analyze(usage_df, spec_df)
+
+    assert len(result["table3"]) == 5
+    assert result["total_2025_certificates"] == 3
+    assert result["unique_2025_learners"] == 1
+
+    table4 = result["table4"]
+    assert table4["Email"].tolist() == ["john.doe@example.com"]
+    assert table4["Name"].iat[0] == "John Doe"
+    assert table4["Total course/spec number"].iat[0] == 3
+    assert table4["Courses/Specs list"].iat[0].split("\n") == [
+        "Google AI Essentials (15/02/2025)",
+        "Google Data Analytics (01/06/2025)",
+        "Google Project Management (01/07/2025)",
+    ]
+
+
+def reference_top_learner_list(t4):
+    """Original per-group lambda implementation of Table 4, kept as the reference"""
+    name_per_email = (
+        t4.groupby('Email')['Name']
+        .agg(lambda s: s.mode().iat[0] if not s.mode().empty else s.dropna().iat[0] if not s.dropna().empty else None)
+        .reset_index()
+    )
+    counts = t4.groupby(["Email"], dropna=False).size().reset_index(name="Total course/spec number")
+    courses_per_email = (
+        t4.groupby('Email')['Course/Specs']
+        .agg(lambda s: '\n'.join(list(dict.fromkeys([str(x) for x in s.dropna().tolist()]))))
+        .reset_index()
+        .rename(columns={"Course/Specs": "Courses/Specs list"})
+    )
+    return (
+        counts
+        .merge(name_per_email, on='Email', how='left')
+        .merge(courses_per_email, on='Email', how='left')
+        [["Name", "Email", "Total course/spec number", "Courses/Specs list"]]
+        .sort_values(by="Total course/spec number", ascending=False)
+        .reset_index(drop=True)
+    )
+
+
+def test_top_learner_list_matches_reference():
+    t3 = pd.DataFrame({
+        "Name": ["Bo", "An", "An", "Bo", None, "Chi", None, "Dung", "Em", "Em"],
+        "Email": ["b@x", "b@x", "a@x", "a@x", "c@x", "d@x", "d@x", "e@x", "f@x", "f@x"],
+        "Course/Specs": ["X (01/02/2025)", "Y", "Y", "X (01/02/2025)", "Z", None, "X (01/02/2025)", "Y", "Y", "Y"],
+    })
+    expected = reference_top_learner_list(t3)
+    actual = build_top_learner_list(t3, set())
+    pd.testing.assert_frame_equal(actual, expected)
+    # Name ties go to the smallest name, as Series.mode() does
+    assert actual.set_index("Email").loc["b@x", "Name"] == "An"
+    assert actual.set_index("Email").loc["f@x", "Courses/Specs list"] == "Y"
+    # Interned labels (as built for Table 3) give the same list
+    categorical = t3.astype({"Course/Specs": "category"})
+    pd.testing.assert_frame_equal(build_top_learner_list(categorical, set()), expected)
+
+
+def test_course_labels_are_interned_per_course_and_day():
+    table3 = analyze(*load_samples())["table3"]
+    labels = table3["Course/Specs"]
+
+    assert isinstance(labels.dtype, pd.CategoricalDtype)
+    assert labels.cat.categories.is_unique
+    assert labels.astype(str).tolist() == [
+        "Google AI Essentials (15/02/2025)",
+        "Google AI Essentials (28/12/2024)",
+        "Google Data Analytics (01/06/2025)",
+        "Google Project Management (01/07/2025)",
+        "Google UX Design (01/11/2024)",
+    ]
+
+
+def test_to_utc_fast_path_and_iso_fallback():
+    gcc = pd.Series(["2025-01-15T10:30:00.000Z", "2025-01-15T17:30:00.000+07:00"])
+    # Exact GCC layout: parsed by the fast path, the same instants as ISO 8601 inference
+    parsed = to_utc(gcc)
+    assert str(parsed.dtype) == "datetime64[ns, UTC]"
+    assert parsed.tolist() == [pd.Timestamp("2025-01-15T10:30:00Z")] * 2
+    pd.testing.assert_series_equal(parsed, pd.to_datetime(gcc, format="ISO8601", utc=True))
+
+    # Not the GCC layout (no milliseconds, a space, a bare date): the ISO 8601 fallback
+    other = pd.Series(["2025-01-15T10:30:00Z", "2025-01-15 10:30:00", "2025-01-15"])
+    assert to_utc(other).tolist() == [
+        pd.Timestamp("2025-01-15T10:30:00Z"), pd.Timestamp("2025-01-15T10:30:00Z"), pd.Timestamp("2025-01-15T00:00:00Z"),
+    ]
+
+
+def test_to_utc_mixed_offsets_and_invalid_values():
+    values = pd.Series([
+        "2025-02-15T21:30:00.000+07:00", "2025-02-15T14:30:00.000Z", "2025-02-15T14:30:00", "not a time", "", None,
+    ])
+    parsed = to_utc(values)
+
+    assert str(parsed.dtype) == "datetime64[ns, UTC]"
+    # +07:00 is converted, Z and naive values are taken as UTC
+    assert parsed.iloc[:3].tolist() == [pd.Timestamp("2025-02-15T14:30:00Z")] * 3
+    assert parsed.iloc[3:].isna().all()
+
+
+def test_mixed_offsets_are_counted_as_certificates():
+    # Mixed offsets in one column used to make the certificate counts fail and return 0
+    csv = USAGE_CSV.replace("2025-01-15T10:30:00.000Z", "2025-01-15T17:30:00.000+07:00")
+    usage_df = read_usage_report(io.StringIO(csv))
+
+    assert str(usage_df["Enrollment Time"].dtype) == "datetime64[ns, UTC]"
+    assert certificate_counts(usage_df, USAGE) == certificate_counts(load_samples()[0], USAGE)
+    assert certificate_counts(usage_df, USAGE)["ai_essentials"] == 1
+
+
+def test_normalized_frames_are_not_converted_again():
+    df = pd.DataFrame({"Completion Time": ["2025-02-15T14:30:00.000Z"], "Enrollment Time": ["garbage"]})
+    normalize_timestamps(df)
+    assert df.attrs[NORMALIZED_ATTR]
+    normalized = df["Completion Time"]
+    # Already-UTC columns pass through to_utc untouched
+    assert to_utc(normalized) is normalized
+
+    # The marker skips the conversion, even of columns that are still text
+    marked = pd.DataFrame({"Completion Time": ["2025-02-15T14:30:00.000Z"]})
+    marked.attrs[NORMALIZED_ATTR] = True
+    normalize_timestamps(marked)
+    assert marked["Completion Time"].dtype == object
+
+
+def test_streaming_matches_eager_analysis():
+    usage_df, spec_df = load_samples()
+    expected = analyze(usage_df, spec_df)
+
+    streamed = stream_usage_report(io.StringIO(USAGE_CSV), chunksize=1)
+    aggregator = streamed["aggregator"].update(build_specialization_table(spec_df))
+
+    assert streamed["rows"] == 4
+    assert streamed["count"] == 1
+    assert aggregator.total_2025_certificates == expected["total_2025_certificates"]
+    assert aggregator.unique_2025_learners == expected["unique_2025_learners"]
+    pd.testing.assert_frame_equal(aggregator.top_learner_list(), expected["table4"])
+
+
+def test_streamed_results_are_sized_by_their_aggregates():
+    streamed = stream_usage_report(io.StringIO(USAGE_CSV), chunksize=1)
+    aggregator = streamed["aggregator"]
+
+    held = sum(
+        estimate_size(frame)
+        for frame in (aggregator.counts, aggregator.max_completion, aggregator.name_counts, aggregator.courses)
+    )
+    assert aggregator.memory_usage() >= held > 0
+    assert estimate_size(streamed) >= aggregator.memory_usage()
+
+
+def test_cli_writes_outputs(tmp_path):
+    usage_path = tmp_path / "usage.csv"
+    spec_path = tmp_path / "spec.csv"
+    usage_path.write_text(USAGE_CSV, encoding="utf-8")
+    spec_path.write_text(SPEC_CSV, encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert cli.main(["--usage", str(usage_path), "--spec", str(spec_path), "-o", str(out)]) == 0
+
+    metrics = json.loads((out / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics == {
+        "ai_essentials_certificates": 1,
+        "specialization_certificates": 2,
+        "certificates": {"ai_essentials": 1, "specializations": 2},
+        "total_2025_certificates": 3,
+        "unique_2025_learners": 1,
+    }
+    assert (out / "table3.csv").exists()
+    assert (out / "table4.csv").exists()
+
+
+def test_search_and_page_slice():
+    table4 = analyze(*load_samples())["table4"]
+
+    matches = search_rows(table4, "  data ANALYTICS ", ["Name", "Email", "Courses/Specs list"])
+    assert matches["Email"].tolist() == ["john.doe@example.com"]
+    assert search_rows(table4, "", ["Email"]) is table4
+    assert search_rows(table4, "no such learner", ["Email"]).empty
+
+    assert len(page_slice(table4, 1, 1)) == 1
+    # Pages past the end are clamped to the last page
+    pd.testing.assert_frame_equal(page_slice(table4, 99, 1), table4.iloc[-1:])
+
+
+def test_profiler_records_pipeline_stages():
+    usage_df, spec_df = load_samples()
+    profiler = Profiler(trace_memory=True, emit_logs=False)
+    with profiler.activate():
+        analyze(usage_df, spec_df)
+    # Outside activate() stages are not recorded
+    analyze(usage_df, spec_df)
+
+    assert [record["stage"] for record in profiler.records] == ["join", "metrics", "table4"]
+    assert all(record["seconds"] >= 0 and record["peak_bytes"] >= 0 for record in profiler.records)
+
+
+def test_only_one_profiler_traces_memory():
+    usage_df, spec_df = load_samples()
+    owner = Profiler(trace_memory=True, emit_logs=False)
+    other = Profiler(trace_memory=True, emit_logs=False)
+    with owner.activate(), owner.stage("outer"):
+        with other.activate():
+            analyze(usage_df, spec_df)
+        # The other profiler neither reset the owner's peaks nor stopped tracing
+        assert tracemalloc.is_tracing()
+        analyze(usage_df, spec_df)
+    assert not tracemalloc.is_tracing()
+
+    assert other.memory_busy and not any("peak_bytes" in record for record in other.records)
+    assert not owner.memory_busy and all("peak_bytes" in record for record in owner.records)
+
+    # Once the owner's stage ends, the other profiler traces its own stages
+    with other.activate():
+        analyze(usage_df, spec_df)
+    assert all("peak_bytes" in record for record in other.records[-3:])
+
+
+def test_cli_does_not_import_streamlit():
+    code = "import sys, process.cli; print('streamlit' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_cli_does_not_import_polars():
+    code = "import sys, process.cli; print('polars' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative certificate rules
+"""
+
+import io
+import tomllib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from process.pipeline import read_specialization_report, read_usage_report
+from process.rules import DEFAULT_RULES_PATH, SPECIALIZATION, USAGE, RuleSet, load_rules
+from test_pipeline import USAGE_CSV
+
+RULES_TOML = """
+[metrics]
+completed_from = 2025-01-01
+
+[defaults]
+enrolled_from = 2025-01-01
+completed = true
+
+[[certificate]]
+name = "ai_essentials"
+report = "usage"
+courses = ["Google AI Essentials"]
+
+# The 2025 program also counts enrollments from December 2024
+[[certificate.program]]
+programs = ["Google AI Program 2025"]
+enrolled_from = 2024-12-01
+
+[[certificate]]
+name = "digital_marketing"
+report = "usage"
+courses = ["Foundations of Digital Marketing and E-commerce"]
+completed_before = 2025-06-01T00:00:00+07:00
+
+[[certificate]]
+name = "in_progress"
+report = "usage"
+completed = false
+"""
+
+
+def test_masks_match_pandas_filters():
+    rules = RuleSet(tomllib.loads(RULES_TOML))
+    df = read_usage_report(io.StringIO(USAGE_CSV))
+
+    masks = rules.masks(df, USAGE)
+
+    course = df['Course'].astype(str)
+    enrolled = df['Enrollment Time']
+    in_program = df['Program Name'] == 'Google AI Program 2025'
+    expected_ai = (
+        (course == 'Google AI Essentials')
+        & df['Completed']
+        & ((in_program & (enrolled >= '2024-12-01')) | (~in_program & (enrolled >= '2025-01-01')))
+    )
+    np.testing.assert_array_equal(masks['ai_essentials'], expected_ai.to_numpy())
+    assert df['Email'][masks['ai_essentials']].tolist() == ['john.doe@example.com', 'jane.smith@example.com']
+    assert df['Email'][masks['digital_marketing']].tolist() == ['thu@gmail.com']
+    assert df['Email'][masks['in_progress']].tolist() == ['mike.j@example.com']
+
+    assert rules.required_columns('ai_essentials') == ['Course', 'Program Name', 'Enrollment Time', 'Completed']
+    assert rules.describe('ai_essentials') == [
+        "Course in Google AI Essentials, Enrollment Time >= 2025-01-01, Completed = Yes, "
+        "Program Name not in Google AI Program 2025",
+        "Course in Google AI Essentials, Program Name in Google AI Program 2025, "
+        "Enrollment Time >= 2024-12-01, Completed = Yes",
+    ]
+    assert rules.courses(USAGE) is None
+    assert rules.completion_cutoff == pd.Timestamp('2025-01-01', tz='UTC')
+
+
+@pytest.mark.parametrize("toml, message", [
+    ('[[certificate]]\nname = "a"\nreport = "usage"\ncourse = ["x"]', "Unknown condition 'course'"),
+    ('[[certificate]]\nname = "a"\nreport = "other"', "unknown report"),
+    ('[[certificate]]\nname = "a"\nreport = "usage"\nenrolled_from = 2025', "must be a date"),
+    ('[[certificate]]\nname = "a"\nreport = "usage"\n[[certificate.program]]\ncompleted = true', "lists no programs"),
+])
+def test_invalid_rules_are_rejected(toml, message):
+    with pytest.raises(ValueError, match=message):
+        RuleSet(tomllib.loads(toml))
+
+
+def test_specialization_rules_per_program():
+    rules = RuleSet(tomllib.loads("""
+[[certificate]]
+name = "specializations"
+report = "specialization"
+enrolled_from = 2025-01-01
+completed = true
+
+[[certificate.program]]
+programs = ["Google Career Certificates 2024"]
+enrolled_from = 2024-06-01
+"""))
+    df = read_specialization_report(io.StringIO(
+        "Name,Email,Specialization,Program Name,Enrollment Time,Completed,Specialization Completion Time\n"
+        "A,a@x.com,Google UX Design,Google Career Certificates 2024,2024-07-01T00:00:00.000Z,Yes,2024-12-01T00:00:00.000Z\n"
+        "B,b@x.com,Google UX Design,Other Program,2024-07-01T00:00:00.000Z,Yes,2024-12-01T00:00:00.000Z\n"
+        "C,c@x.com,Google UX Design,Other Program,2025-02-01T00:00:00.000Z,Yes,2025-03-01T00:00:00.000Z\n"
+    ))
+
+    assert df['Email'][rules.mask(df, 'specializations')].tolist() == ['a@x.com', 'c@x.com']
+    assert rules.required_columns('specializations') == ['Program Name', 'Enrollment Time', 'Completed']
+    assert rules.names(SPECIALIZATION) == ['specializations']
+
+
+def test_rules_files_must_define_the_certificates_the_app_shows(tmp_path):
+    path = tmp_path / "rules.toml"
+    path.write_text(RULES_TOML, encoding="utf-8")
+    with pytest.raises(ValueError, match="lacks the certificates specializations"):
+        load_rules(path)
+
+    path.write_text(RULES_TOML + '\n[[certificate]]\nname = "specializations"\nreport = "usage"\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="'specializations' .* specialization report"):
+        load_rules(path)
+
+    assert load_rules(DEFAULT_RULES_PATH).names(USAGE)
@@ -3,9 +3,10 @@
 Test script for AI Essentials certificate filtering with sample data
 """
 
-import pandas as pd
 import io
 
+from process.pipeline import AI_ESSENTIALS, RULES, filter_ai_essentials_certificates, read_usage_report
+
 def test_ai_essentials_filter():
     """Test the AI Essentials filtering logic with sample data"""
     
@@ -17,29 +18,15 @@ John Doe,john.doe@example.com,103,Google AI Essentials,ai-essentials-123,google-
 Jane Smith,jane.smith@example.com,104,Google AI Essentials,ai-essentials-124,google-ai-essentials,Google,2024-12-20T09:15:00.000Z,2025-01-05T07:00:00.000Z,2025-02-10T06:59:59.000Z,2025-02-08T16:45:00.000Z,100.0,18.5,Yes,No,ai-program-2025,Google AI Program 2025,GCC,2025-02-08T16:45:00.000Z,88.2,https://coursera.org/certificate/ai124,Course,Data Scientist,Technology,Research,AI Lab,New York
 Mike Johnson,mike.j@example.com,105,Google AI Essentials,ai-essentials-125,google-ai-essentials,Google,2025-03-01T11:20:00.000Z,2025-03-05T07:00:00.000Z,2025-04-15T06:59:59.000Z,2025-04-10T13:20:00.000Z,85.0,15.2,No,No,ai-program-2025,Google AI Program 2025,GCC,,75.0,,Course,Product Manager,Business,Product,AI Strategy,Seattle"""
     
-    # Read sample data into DataFrame
-    df = pd.read_csv(io.StringIO(sample_data))
+    # Read sample data through the package's ingestion layer
+    df = read_usage_report(io.StringIO(sample_data))
     
     print("=== AI Essentials Certificate Filter Test ===\n")
     print(f"Original data: {len(df)} total rows")
     
-    # Filter 1: Course = "Google AI Essentials"
-    course_filter = df['Course'] == 'Google AI Essentials'
-    filtered_df = df[course_filter].copy()  # Use .copy() to avoid SettingWithCopyWarning
-    print(f"After Course filter: {len(filtered_df)} rows (Course = 'Google AI Essentials')")
-    
-    # Filter 2: Enrollment Time >= Jan 01 2025
-    filtered_df['Enrollment Time'] = pd.to_datetime(filtered_df['Enrollment Time'], errors='coerce')
-    # Convert cutoff_date to UTC timezone to match the data
-    cutoff_date = pd.Timestamp('2025-01-01', tz='UTC')
-    date_filter = filtered_df['Enrollment Time'] >= cutoff_date
-    filtered_df = filtered_df[date_filter]
-    print(f"After Date filter: {len(filtered_df)} rows (Enrollment Time >= Jan 01, 2025)")
-    
-    # Filter 3: Completed = "Yes"
-    completed_filter = filtered_df['Completed'] == 'Yes'
-    filtered_df = filtered_df[completed_filter]
-    print(f"After Completed filter: {len(filtered_df)} rows (Completed = 'Yes')")
+    # Course = "Google AI Essentials", Enrollment Time >= 2025-01-01, Completed = "Yes"
+    filtered_df = filter_ai_essentials_certificates(df)
+    print(f"After filters: {len(filtered_df)} rows ({'; '.join(RULES.describe(AI_ESSENTIALS))})")
     
     # Final count
     total_certificates = len(filtered_df)
@@ -51,7 +38,8 @@ Mike Johnson,mike.j@example.com,105,Google AI Essentials,ai-essentials-125,googl
         available_columns = [col for col in display_columns if col in filtered_df.columns]
         print(filtered_df[available_columns].to_string(index=False))
     
-    return total_certificates
+    # Jane Smith enrolled in December 2024, before the enrollment cutoff
+    assert filtered_df['Email'].tolist() == ['john.doe@example.com']
 
 if __name__ == "__main__":
     test_ai_essentials_filter()
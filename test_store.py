@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental snapshot store
+"""
+
+import json
+
+import pandas as pd
+
+from process import cli
+from process.pipeline import analyze, read_specialization_report, read_usage_report
+from process.rules import SPECIALIZATION, USAGE
+from process.store import SnapshotStore
+from process.synthetic import generate_specialization_report, generate_usage_report
+from test_pipeline import SPEC_CSV, USAGE_CSV, load_samples
+
+
+def assert_matches_analysis(store, usage_df, spec_df):
+    expected = analyze(usage_df, spec_df)
+    assert store.metrics() == {
+        "total_2025_certificates": expected["total_2025_certificates"],
+        "unique_2025_learners": expected["unique_2025_learners"],
+    }
+    pd.testing.assert_frame_equal(store.top_learner_list(), expected["table4"])
+
+
+def test_store_matches_eager_analysis(tmp_path):
+    usage_df, spec_df = load_samples()
+    with SnapshotStore(tmp_path / "store.sqlite") as store:
+        store.upsert_report(USAGE, usage_df)
+        store.upsert_report(SPECIALIZATION, spec_df)
+        assert_matches_analysis(store, usage_df, spec_df)
+
+
+def test_successive_snapshots_only_write_changes(tmp_path):
+    usage_path = tmp_path / "usage.csv"
+    spec_path = tmp_path / "spec.csv"
+    generate_usage_report(2000, timezone_mix=0.2).to_csv(usage_path, index=False)
+    generate_specialization_report(300).to_csv(spec_path, index=False)
+    usage_df = read_usage_report(usage_path)
+    spec_df = read_specialization_report(spec_path)
+
+    # Last week's snapshot: fewer rows, and one completion that has since been recorded
+    previous = usage_df.iloc[:1500].copy()
+    changed_row = previous.index[previous['Completed']][0]
+    previous.loc[changed_row, 'Completion Time'] = pd.NaT
+
+    with SnapshotStore(tmp_path / "store.sqlite") as store:
+        store.upsert_report(USAGE, previous)
+        store.upsert_report(SPECIALIZATION, spec_df)
+
+        summary = store.upsert_report(USAGE, usage_df)
+        assert summary["inserted"] == 500
+        assert summary["updated"] == 1
+        assert 0 < summary["learners"] < usage_df['Email'].nunique()
+        assert_matches_analysis(store, usage_df, spec_df)
+
+        # Re-uploading the same snapshot changes nothing
+        assert store.upsert_report(USAGE, usage_df) == {"rows": 2000, "inserted": 0, "updated": 0, "learners": 0}
+
+
+def test_stores_remember_the_uploads_they_merged(tmp_path):
+    usage_df, spec_df = load_samples()
+    with SnapshotStore(tmp_path / "store.sqlite") as store:
+        assert not store.merged(USAGE, "usage-key")
+        store.upsert_report(USAGE, usage_df, "usage-key")
+        assert store.merged(USAGE, "usage-key") and not store.merged(SPECIALIZATION, "usage-key")
+
+    # A new (or reset) store has merged nothing, so the same upload is written again
+    with SnapshotStore(tmp_path / "reset.sqlite") as store:
+        assert not store.merged(USAGE, "usage-key")
+        assert store.upsert_report(USAGE, usage_df, "usage-key")["inserted"] > 0
+
+
+def test_cli_store_accumulates_snapshots(tmp_path):
+    usage_path = tmp_path / "usage.csv"
+    spec_path = tmp_path / "spec.csv"
+    usage_path.write_text(USAGE_CSV, encoding="utf-8")
+    spec_path.write_text(SPEC_CSV, encoding="utf-8")
+    store = tmp_path / "store.sqlite"
+    out = tmp_path / "out"
+
+    # The specialization report arrives first, the usage report in a later run
+    assert cli.main(["--spec", str(spec_path), "--store", str(store), "-o", str(out)]) == 0
+    assert cli.main(["--usage", str(usage_path), "--store", str(store), "-o", str(out)]) == 0
+
+    metrics = json.loads((out / "metrics.json").read_text(encoding="utf-8"))
+    assert metrics["total_2025_certificates"] == 3
+    assert metrics["unique_2025_learners"] == 1
+    table4 = pd.read_csv(out / "table4.csv")
+    assert table4["Total course/spec number"].tolist() == [3]